@@ -2,25 +2,34 @@ import gradio as gr
 import threading
 import asyncio
 import logging
-import time
-import os
+from collections import deque
+from datetime import datetime, timedelta
 from db import db_manager
 from orchestrator import ScraperOrchestrator
-from config import MAIN_TO_SUB, LOGGING_CONFIG
+from config import LOGGING_CONFIG, LOG_STREAM_CONFIG
+from taxonomy import taxonomy
+from queries import tender_queries, TenderFilters
+from search import tender_search
+from cache import query_cache
 from utils import setup_logger
+from log_stream import FileCursor, get_log_buffer, read_file_since, format_entries, afollow, afollow_file
 
 # Setup logging
 logging.config.dictConfig(LOGGING_CONFIG)
 logger = setup_logger("etimad.gui")
 
+LOG_FILE = LOGGING_CONFIG["handlers"]["file"]["filename"]
+
 # Global state
 scraping_in_progress = False
-last_log_position = 0
+scraper_started_here = False    # Once set, this process's log buffer carries the pipeline's records
+TENDER_PAGE_SIZE = 100
 
 def run_scraper():
     """Run the scraper in a background thread"""
-    global scraping_in_progress
+    global scraping_in_progress, scraper_started_here
     scraping_in_progress = True
+    scraper_started_here = True
     try:
         logger.info("Starting scraping process")
         orchestrator = ScraperOrchestrator()
@@ -42,93 +51,179 @@ def start_scraper():
     thread.start()
     return "Scraping started in the background. Check the logs below for progress."
 
-def get_logs():
-    """Get the latest logs from the log file"""
-    global last_log_position
-    log_file = "etimad_scraper.log"
-    
-    if not os.path.exists(log_file):
-        return "Log file not found. Scraping hasn't started yet."
-    
+async def follow_logs(current_text=None, cursor=None):
+    """Stream this session's log view: recent lines first, then new records as they are logged.
+
+    Each session keeps its own cursor (gr.State), so refreshing only adds what it
+    hasn't seen; the view is capped at LOG_STREAM_CONFIG["display_lines"] lines.
+    While the scraper runs in this process its records come from the in-memory
+    buffer; otherwise (main.py, Airflow) the session follows the log file by byte offset.
+    """
+    limit = LOG_STREAM_CONFIG["display_lines"]
+    max_bytes = LOG_STREAM_CONFIG["initial_tail_bytes"]
+    lines = deque((current_text or "").splitlines() if cursor is not None else (), maxlen=limit)
+    buffer = get_log_buffer(LOG_FILE) if scraper_started_here else None
+
+    if buffer is None or isinstance(cursor, FileCursor):
+        if not isinstance(cursor, FileCursor):
+            lines.clear()
+            cursor = None
+        text, cursor = read_file_since(LOG_FILE, cursor, max_bytes)
+        lines.extend(text.splitlines())
+        yield "\n".join(lines) or "No logs yet.", cursor
+        async for text, cursor in afollow_file(LOG_FILE, cursor, LOG_STREAM_CONFIG["follow_seconds"],
+                                               LOG_STREAM_CONFIG["poll_interval"], max_bytes):
+            lines.extend(text.splitlines())
+            yield "\n".join(lines), cursor
+        return
+
+    if cursor is None:
+        entries, cursor = buffer.latest(limit)
+        lines.extend(format_entries(entries).splitlines())
+    else:
+        # Skip straight to the newest `limit` records if this session fell further behind
+        entries, cursor = buffer.tail(max(cursor, buffer.seq - limit), limit)
+        lines.extend(format_entries(entries).splitlines())
+    yield "\n".join(lines), cursor
+
+    async for entries, cursor in afollow(buffer, cursor, LOG_STREAM_CONFIG["follow_seconds"],
+                                         LOG_STREAM_CONFIG["poll_interval"], limit):
+        lines.extend(format_entries(entries).splitlines())
+        yield "\n".join(lines), cursor
+
+TENDER_TABLE_COLUMNS = [
+    ("tender_name", "Tender Name", "str"),
+    ("tender_number", "Tender Number", "str"),
+    ("government_entity", "Government Entity", "str"),
+    ("status", "Status", "str"),
+    ("document_value", "Document Value", "number"),
+    ("last_submission_date", "Submission Deadline", "date"),
+    ("opening_date", "Opening Date", "date"),
+    ("last_seen_at", "Last Seen", "date"),
+    ("link", "Link", "str"),
+]
+
+HISTORY_TABLE_COLUMNS = [
+    ("id", "ID", "number"),
+    ("classification", "Category", "str"),
+    ("keyword", "Subcategory", "str"),
+    ("tender_count", "Tender Count", "number"),
+    ("fetched_count", "Fetched", "number"),
+    ("skipped_count", "Skipped", "number"),
+    ("status", "Status", "str"),
+    ("error_message", "Error Message", "str"),
+    ("created_at", "Timestamp", "date"),
+]
+
+
+def _table(rows, columns):
+    """Typed query rows -> Dataframe rows in display column order"""
+    return [[getattr(row, field) for field, _, _ in columns] for row in rows]
+
+
+def _parse_date(value):
+    value = (value or "").strip()
+    return datetime.strptime(value, "%Y-%m-%d") if value else None
+
+
+def _tender_filters(entity, status, deadline_from, deadline_to, category, subcategory):
+    index = taxonomy.load()
+    classification_id = next((e.classification_id for e in index.entries
+                              if category and e.classification_name_ar == category), None)
+    keyword = index.lookup(subcategory) if subcategory else None
+    deadline_to = _parse_date(deadline_to)
+    return TenderFilters(
+        government_entity=entity or None,
+        status=status or None,
+        deadline_from=_parse_date(deadline_from),
+        # Inclusive end date from the UI, exclusive bound in SQL
+        deadline_to=deadline_to + timedelta(days=1) if deadline_to else None,
+        classification_id=classification_id,
+        keyword_id=keyword.keyword_id if keyword else None,
+    )
+
+
+@query_cache.cached
+def _tender_page(filters, order, cursor):
+    return tender_queries.tenders(filters, order=order, after=cursor, limit=TENDER_PAGE_SIZE)
+
+
+@query_cache.cached
+def _history_page():
+    return tender_queries.scraping_history(limit=50)
+
+
+@query_cache.cached
+def _distinct_values(column):
+    return tender_queries.distinct_values(column)
+
+
+@query_cache.cached
+def _search_hits(text, filters):
+    return tender_search.search(text, filters)
+
+
+def get_tenders(entity=None, status=None, deadline_from=None, deadline_to=None,
+                category=None, subcategory=None, order="latest", cursor=None):
+    """One page of tenders for the current filters; returns (rows, next cursor, page info)"""
     try:
-        with open(log_file, "r", encoding="utf-8") as f:
-            # Handle log rotation
-            current_size = os.path.getsize(log_file)
-            if current_size < last_log_position:
-                last_log_position = 0  # Log file was reset
-                
-            f.seek(last_log_position)
-            new_content = f.read()
-            last_log_position = f.tell()
-            return new_content
+        filters = _tender_filters(entity, status, deadline_from, deadline_to, category, subcategory)
+        page = _tender_page(filters, order or "latest", cursor)
+        info = f"{len(page.rows)} tenders" + (" (more available)" if page.next_cursor else "")
+        return _table(page.rows, TENDER_TABLE_COLUMNS), page.next_cursor, info
+    except ValueError as e:
+        return [], None, f"Invalid filter: {e}"
     except Exception as e:
-        return f"Error reading logs: {str(e)}"
+        logger.error(f"Error fetching tenders: {e}")
+        return [], None, "Error fetching tenders"
+
+
+def get_next_tenders(entity, status, deadline_from, deadline_to, category, subcategory, order, cursor):
+    if cursor is None:
+        return gr.update(), None, "No more tenders"
+    return get_tenders(entity, status, deadline_from, deadline_to, category, subcategory, order, cursor)
 
-def get_tenders():
-    """Fetch tenders from the database"""
-    conn = None
+
+def get_filter_options():
+    """Distinct status / entity values for the filter dropdowns"""
     try:
-        conn = db_manager.get_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        # Only fetch essential columns for display
-        cursor.execute("""
-            SELECT 
-                `Link`, 
-                `اسم_المنافسة` AS TenderName,
-                `رقم_المنافسة` AS TenderNumber,
-                `الجهة_الحكوميه` AS GovernmentEntity,
-                `حالة_المنافسة` AS Status,
-                `آخر_موعد_لتقديم_العروض` AS SubmissionDeadline,
-                `updated_at` AS LastUpdated
-            FROM tenders 
-            ORDER BY updated_at DESC
-            LIMIT 100
-        """)
-        
-        tenders = cursor.fetchall()
-        return tenders if tenders else []
+        return (gr.update(choices=_distinct_values("status")),
+                gr.update(choices=_distinct_values("government_entity")))
     except Exception as e:
-        logger.error(f"Error fetching tenders: {e}")
-        return []
-    finally:
-        if conn:
-            conn.close()
+        logger.error(f"Error loading filter options: {e}")
+        return gr.update(), gr.update()
+
+
+def search_tenders(text, category=None):
+    """Ranked full-text matches on tender name / purpose"""
+    if not (text or "").strip():
+        return [], ""
+    try:
+        filters = _tender_filters(None, None, None, None, category, None)
+        hits = _search_hits(text.strip(), filters)
+        rows = [[round(hit.score, 3)] + _table([hit.tender], TENDER_TABLE_COLUMNS)[0] for hit in hits]
+        return rows, f"{len(hits)} matches"
+    except Exception as e:
+        logger.error(f"Error searching tenders: {e}")
+        return [], "Search failed"
+
 
 def get_scraping_history():
     """Get scraping history from database"""
-    conn = None
     try:
-        conn = db_manager.get_connection()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT 
-                id, 
-                category, 
-                subcategory, 
-                tender_count, 
-                status, 
-                error_message,
-                timestamp
-            FROM scraping_logs 
-            ORDER BY timestamp DESC
-            LIMIT 50
-        """)
-        return cursor.fetchall()
+        page = _history_page()
+        return _table(page.rows, HISTORY_TABLE_COLUMNS)
     except Exception as e:
         logger.error(f"Error fetching scraping history: {e}")
         return []
-    finally:
-        if conn:
-            conn.close()
 
 def get_category_options():
     """Get category options for the dropdown"""
-    return list(MAIN_TO_SUB.keys())
+    return list(taxonomy.main_to_sub().keys())
 
 def get_subcategory_options(category):
     """Get subcategory options based on selected category"""
-    return MAIN_TO_SUB.get(category, [])
+    return taxonomy.main_to_sub().get(category, [])
 
 # Create Gradio interface
 with gr.Blocks(title="Etimad Tenders Scraper", theme=gr.themes.Soft()) as app:
@@ -147,26 +242,60 @@ with gr.Blocks(title="Etimad Tenders Scraper", theme=gr.themes.Soft()) as app:
             max_lines=50
         )
         
-        # Refresh button for logs
+        # Per-session position in the log stream
+        log_cursor = gr.State(None)
+        
+        # Restarts following after the stream's time limit
         log_refresh_btn = gr.Button("🔄 Refresh Logs")
         
     with gr.Tab("View Tenders"):
         gr.Markdown("### Latest Tenders")
+        with gr.Row():
+            entity_filter = gr.Dropdown(label="Government Entity", choices=[], allow_custom_value=True)
+            status_filter = gr.Dropdown(label="Status", choices=[], allow_custom_value=True)
+            order_filter = gr.Radio(label="Order", choices=["latest", "deadline"], value="latest")
+        with gr.Row():
+            deadline_from = gr.Textbox(label="Deadline from (YYYY-MM-DD)")
+            deadline_to = gr.Textbox(label="Deadline to (YYYY-MM-DD)")
+            category_filter = gr.Dropdown(label="Category", choices=get_category_options())
+            subcategory_filter = gr.Dropdown(label="Subcategory", choices=[])
         tender_table = gr.Dataframe(
-            headers=["Link", "Tender Name", "Tender Number", "Government Entity", 
-                     "Status", "Submission Deadline", "Last Updated"],
-            datatype=["str", "str", "str", "str", "str", "str", "str"],
+            headers=[label for _, label, _ in TENDER_TABLE_COLUMNS],
+            datatype=[kind for _, _, kind in TENDER_TABLE_COLUMNS],
             interactive=False,
             wrap=True
         )
-        refresh_btn = gr.Button("🔄 Refresh Tenders")
+        tender_page_info = gr.Markdown()
+        tender_cursor = gr.State(None)
+        with gr.Row():
+            refresh_btn = gr.Button("🔄 Search / First Page")
+            next_page_btn = gr.Button("Next Page ▶")
+
+        category_filter.change(
+            lambda category: gr.update(choices=get_subcategory_options(category), value=None),
+            inputs=category_filter,
+            outputs=subcategory_filter
+        )
+    
+    with gr.Tab("Search"):
+        gr.Markdown("### Search Tender Names and Purposes")
+        with gr.Row():
+            search_box = gr.Textbox(label="Search", placeholder="مثال: صيانة المستشفيات")
+            search_category = gr.Dropdown(label="Category", choices=get_category_options())
+        search_table = gr.Dataframe(
+            headers=["Score"] + [label for _, label, _ in TENDER_TABLE_COLUMNS],
+            datatype=["number"] + [kind for _, _, kind in TENDER_TABLE_COLUMNS],
+            interactive=False,
+            wrap=True
+        )
+        search_info = gr.Markdown()
+        search_btn = gr.Button("🔎 Search", variant="primary")
     
     with gr.Tab("Scraping History"):
         gr.Markdown("### Recent Scraping Sessions")
         history_table = gr.Dataframe(
-            headers=["ID", "Category", "Subcategory", "Tender Count", 
-                     "Status", "Error Message", "Timestamp"],
-            datatype=["number", "str", "str", "number", "str", "str", "str"],
+            headers=[label for _, label, _ in HISTORY_TABLE_COLUMNS],
+            datatype=[kind for _, _, kind in HISTORY_TABLE_COLUMNS],
             interactive=False
         )
         history_refresh = gr.Button("🔄 Refresh History")
@@ -206,17 +335,47 @@ with gr.Blocks(title="Etimad Tenders Scraper", theme=gr.themes.Soft()) as app:
         status_text
     )
     
+    # Log streams are async generators that idle between records; don't queue sessions behind each other
+    log_follow = app.load(
+        follow_logs,
+        [log_display, log_cursor],
+        [log_display, log_cursor],
+        concurrency_limit=None
+    )
+    
     # Refresh actions
     log_refresh_btn.click(
-        get_logs,
-        None,
-        log_display
+        follow_logs,
+        [log_display, log_cursor],
+        [log_display, log_cursor],
+        cancels=[log_follow],
+        concurrency_limit=None
     )
     
+    tender_filters = [entity_filter, status_filter, deadline_from, deadline_to,
+                      category_filter, subcategory_filter, order_filter]
     refresh_btn.click(
         get_tenders,
-        None,
-        tender_table
+        tender_filters,
+        [tender_table, tender_cursor, tender_page_info]
+    )
+    
+    next_page_btn.click(
+        get_next_tenders,
+        tender_filters + [tender_cursor],
+        [tender_table, tender_cursor, tender_page_info]
+    )
+    
+    search_btn.click(
+        search_tenders,
+        [search_box, search_category],
+        [search_table, search_info]
+    )
+    
+    search_box.submit(
+        search_tenders,
+        [search_box, search_category],
+        [search_table, search_info]
     )
     
     history_refresh.click(
@@ -226,8 +385,8 @@ with gr.Blocks(title="Etimad Tenders Scraper", theme=gr.themes.Soft()) as app:
     )
     
     # Load initial data
-    app.load(get_logs, None, log_display)
-    app.load(get_tenders, None, tender_table)
+    app.load(get_tenders, None, [tender_table, tender_cursor, tender_page_info])
+    app.load(get_filter_options, None, [status_filter, entity_filter])
     app.load(get_scraping_history, None, history_table)
 
 # Launch the app
@@ -0,0 +1,60 @@
+import re
+from functools import lru_cache
+from typing import List, Optional
+
+# Harakat, Quranic marks, superscript alef and tatweel
+_DIACRITICS_RE = re.compile("[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u0640]")
+
+# Spelling variants that users and Etimad entry forms mix freely
+_FOLD = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ى": "ي", "ئ": "ي", "ؤ": "و",
+    "ة": "ه",
+    "٠": "0", "١": "1", "٢": "2", "٣": "3", "٤": "4",
+    "٥": "5", "٦": "6", "٧": "7", "٨": "8", "٩": "9",
+})
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+# Light10-style affixes (after folding, so taa marbuta is already ه); longest first
+_PREFIXES = ("وال", "بال", "كال", "فال", "لل", "ال")
+_SUFFIXES = ("ها", "ان", "ات", "ون", "ين", "يه", "ه", "ي")
+_MIN_STEM = 2
+# Suffix stripping keeps three letters, so a folded article or a two-letter root is never cut
+# down further (الآلي -> الي, not ال)
+_MIN_SUFFIX_STEM = 3
+
+
+def normalize(text: Optional[str]) -> str:
+    """Fold alef/yaa/taa-marbuta variants and Arabic-Indic digits, strip diacritics, lowercase Latin."""
+    if not text:
+        return ""
+    return _DIACRITICS_RE.sub("", text).translate(_FOLD).lower()
+
+
+@lru_cache(maxsize=65536)
+def light_stem(token: str) -> str:
+    """Strip one leading conjunction/article and common plural/feminine/possessive suffixes."""
+    if len(token) > 3 and token[0] == "و":
+        token = token[1:]
+    for prefix in _PREFIXES:
+        if token.startswith(prefix) and len(token) - len(prefix) >= _MIN_STEM:
+            token = token[len(prefix):]
+            break
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= _MIN_SUFFIX_STEM:
+            token = token[:-len(suffix)]
+    return token
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Normalized, stemmed word tokens; Latin words and numbers pass through unstemmed."""
+    tokens = []
+    for token in _TOKEN_RE.findall(normalize(text)):
+        tokens.append(light_stem(token) if "\u0600" <= token[0] <= "\u06FF" else token)
+    return tokens
+
+
+def search_document(*texts: Optional[str]) -> str:
+    """The text stored in tenders.search_text: every field tokenized the same way queries are."""
+    return " ".join(token for text in texts for token in tokenize(text))
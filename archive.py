@@ -0,0 +1,204 @@
+"""
+Raw page archive: every fetched search-result and detail page is stored as a
+zstd-compressed blob named by the SHA-256 of its content (identical
+snapshots are stored once), with a compact SQLite index keyed by
+(STenderId, fetched_at, kind). Search-result pages use "keyword#page" in
+place of the STenderId.
+
+Replay re-parses the latest archived detail page of every tender and upserts
+it, at disk speed and without a browser:
+
+    python archive.py replay [--since 2025-08-01] [--workers 8] [--dry-run]
+    python archive.py stats
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import logging.config
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+import zstandard
+from config import ARCHIVE_CONFIG, LOGGING_CONFIG
+
+logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger("etimad.archive")
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    tender_id TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    url TEXT,
+    sha256 TEXT NOT NULL,
+    PRIMARY KEY (tender_id, fetched_at, kind)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 TEXT PRIMARY KEY,
+    raw_size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_snapshots_kind_fetched ON snapshots (kind, fetched_at);
+"""
+
+# Latest snapshot of the given kind per tender (fetched_at is ISO text, so MAX orders correctly)
+LATEST_SNAPSHOTS_SQL = """
+SELECT s.tender_id, s.fetched_at, s.url, s.sha256
+FROM snapshots s
+JOIN (
+    SELECT tender_id, MAX(fetched_at) AS fetched_at
+    FROM snapshots WHERE kind = ? AND fetched_at >= ?
+    GROUP BY tender_id
+) latest ON latest.tender_id = s.tender_id AND latest.fetched_at = s.fetched_at
+WHERE s.kind = ?
+ORDER BY s.tender_id
+"""
+
+KIND_SEARCH = "search"
+KIND_DETAIL = "detail"
+KIND_TAB_D2 = "tab:d-2"
+
+
+class PageArchive:
+    """Content-addressed, compressed page store. Safe to share between threads."""
+
+    def __init__(self, root: str = None, level: int = None):
+        self.root = Path(root or ARCHIVE_CONFIG["root"])
+        self.blob_dir = self.root / "blobs"
+        self.level = level or ARCHIVE_CONFIG["compression_level"]
+        # Reentrant: the methods below hold it while the lazy `conn` property opens the index
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._local = threading.local()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            with self._lock:
+                if self._conn is None:
+                    self.blob_dir.mkdir(parents=True, exist_ok=True)
+                    conn = sqlite3.connect(self.root / "index.sqlite3", check_same_thread=False)
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.executescript(INDEX_SCHEMA)
+                    self._conn = conn
+        return self._conn
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest[:2] / f"{digest[2:]}.zst"
+
+    def _compressor(self) -> zstandard.ZstdCompressor:
+        # zstd (de)compressors are not thread-safe; keep one per thread
+        if not hasattr(self._local, "compressor"):
+            self._local.compressor = zstandard.ZstdCompressor(level=self.level)
+            self._local.decompressor = zstandard.ZstdDecompressor()
+        return self._local.compressor
+
+    def put(self, kind: str, tender_id: str, url: str, html: str, fetched_at: datetime = None) -> str:
+        """Store one fetched page and index it; returns the content hash."""
+        raw = html.encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        fetched_at = (fetched_at or datetime.now()).isoformat(timespec="microseconds")
+        path = self._blob_path(digest)
+        stored_size = None
+        if not path.exists():
+            compressed = self._compressor().compress(raw)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(compressed)
+            tmp.replace(path)
+            stored_size = len(compressed)
+        with self._lock:
+            if stored_size is not None:
+                self.conn.execute("INSERT OR IGNORE INTO blobs VALUES (?, ?, ?)", (digest, len(raw), stored_size))
+            self.conn.execute("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?)",
+                              (tender_id, fetched_at, kind, url, digest))
+            self.conn.commit()
+        return digest
+
+    async def aput(self, kind: str, tender_id: str, url: str, html: str, fetched_at: datetime = None) -> str:
+        """put() off the event loop (hashing, compression and disk I/O run in a worker thread)."""
+        return await asyncio.to_thread(self.put, kind, tender_id, url, html, fetched_at)
+
+    def get(self, digest: str) -> str:
+        self._compressor()
+        return self._local.decompressor.decompress(self._blob_path(digest).read_bytes()).decode("utf-8")
+
+    def snapshot(self, tender_id: str, kind: str, fetched_at: str) -> Optional[str]:
+        """Content of one (tender, kind) snapshot at exactly `fetched_at`, if archived."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT sha256 FROM snapshots WHERE tender_id = ? AND fetched_at = ? AND kind = ?",
+                (tender_id, fetched_at, kind),
+            ).fetchone()
+        return self.get(row[0]) if row else None
+
+    def latest(self, kind: str = KIND_DETAIL, since: datetime = None) -> Iterator[Tuple[str, str, str, str]]:
+        """(tender_id, fetched_at, url, sha256) of the newest snapshot of `kind` per tender."""
+        since = since.isoformat() if since else ""
+        with self._lock:
+            rows = self.conn.execute(LATEST_SNAPSHOTS_SQL, (kind, since, kind)).fetchall()
+        return iter(rows)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            snapshots = self.conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+            blobs, raw, stored = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(stored_size), 0) FROM blobs"
+            ).fetchone()
+        return {"snapshots": snapshots, "blobs": blobs, "raw_bytes": raw, "stored_bytes": stored}
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+_archive: Optional[PageArchive] = None
+
+
+def get_page_archive() -> Optional[PageArchive]:
+    """The process-wide archive, or None when archiving is disabled."""
+    global _archive
+    if not ARCHIVE_CONFIG["enabled"]:
+        return None
+    if _archive is None:
+        _archive = PageArchive()
+    return _archive
+
+
+def iter_archived_pages(archive: PageArchive, since: datetime = None) -> Iterator[Tuple[str, bytes, Optional[bytes]]]:
+    """Latest detail page per tender (plus its #d-2 partial when that was fetched separately), as backfill input."""
+    for tender_id, fetched_at, url, digest in archive.latest(KIND_DETAIL, since):
+        tab = archive.snapshot(tender_id, KIND_TAB_D2, fetched_at)
+        yield (f"STenderId={tender_id}.html", archive.get(digest).encode("utf-8"),
+               tab.encode("utf-8") if tab is not None else None)
+
+
+def replay(since: datetime = None, workers: int = None, dry_run: bool = False) -> Dict:
+    """Re-parse and upsert the latest archived detail page of every tender."""
+    from backfill import run_pages  # backfill -> http_details -> archive; import late to avoid the cycle
+    archive = PageArchive()
+    logger.info(f"Replaying archive at {archive.root} ({archive.stats()['snapshots']} snapshots)")
+    return run_pages(iter_archived_pages(archive, since), workers=workers, dry_run=dry_run)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    replay_parser = commands.add_parser("replay", help="Re-parse archived detail pages into the database")
+    replay_parser.add_argument("--since", type=datetime.fromisoformat, default=None)
+    replay_parser.add_argument("--workers", type=int, default=None)
+    replay_parser.add_argument("--dry-run", action="store_true")
+    commands.add_parser("stats", help="Print archive size and dedup ratio")
+    args = parser.parse_args()
+
+    if args.command == "replay":
+        replay(args.since, args.workers, args.dry_run)
+    else:
+        stats = PageArchive().stats()
+        print(stats)
+        if stats["raw_bytes"]:
+            print(f"compression ratio: {stats['raw_bytes'] / max(stats['stored_bytes'], 1):.1f}x")
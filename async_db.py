@@ -0,0 +1,239 @@
+import asyncio
+import logging
+import logging.config
+from typing import Dict, Iterable, List, Optional, Tuple
+import aiomysql
+from config import MYSQL_CONFIG, DB_CONFIG, LOGGING_CONFIG
+from db import (db_manager, map_tender, missing_required_columns, split_batch, build_upsert_statement,
+                group_rows_by_columns, build_tender_keywords_statement, LOG_SCRAPING_SQL)
+from metrics import DB_WRITE_SECONDS, DB_ROWS
+
+logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger("etimad.async_db")
+
+
+class AsyncDatabaseManager:
+    """
+    aiomysql-backed counterpart of DatabaseManager for the scraping path, so
+    DB round trips overlap with browser/network I/O instead of blocking the
+    event loop. Shares the row mapping and SQL with db.py.
+    """
+
+    def __init__(self):
+        self.pool: Optional[aiomysql.Pool] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def init_pool(self) -> "AsyncDatabaseManager":
+        try:
+            self.pool = await aiomysql.create_pool(
+                host=MYSQL_CONFIG["host"],
+                port=MYSQL_CONFIG["port"],
+                user=MYSQL_CONFIG["user"],
+                password=MYSQL_CONFIG["password"],
+                db=MYSQL_CONFIG["database"],
+                minsize=1,
+                maxsize=MYSQL_CONFIG["pool_size"],
+                autocommit=True,
+                charset="utf8mb4",
+            )
+            logger.info("Async database connection pool initialized")
+        except aiomysql.Error as e:
+            logger.error(f"Error initializing async connection pool: {e}")
+            raise
+        # Bound to the loop only once the pool exists, so a failed init is retried
+        self.loop = asyncio.get_running_loop()
+        return self
+
+    async def close(self) -> None:
+        if self.pool:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
+
+    async def execute_query(self, query, params=None):
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                try:
+                    await cursor.execute(query, params or ())
+                    return cursor.rowcount
+                except aiomysql.Error as e:
+                    logger.error(f"Error executing query: {e}")
+                    raise
+
+    async def execute_many(self, query, params_list):
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                try:
+                    await conn.begin()
+                    await cursor.executemany(query, params_list)
+                    await conn.commit()
+                    return cursor.rowcount
+                except aiomysql.Error as e:
+                    logger.error(f"Error executing many queries: {e}")
+                    await conn.rollback()
+                    raise
+
+    async def fetch_all(self, query, params=None, dictionary=False):
+        cursor_class = aiomysql.DictCursor if dictionary else aiomysql.Cursor
+        async with self.pool.acquire() as conn:
+            async with conn.cursor(cursor_class) as cursor:
+                try:
+                    await cursor.execute(query, params or ())
+                    return await cursor.fetchall()
+                except aiomysql.Error as e:
+                    logger.error(f"Error fetching data: {e}")
+                    raise
+
+    async def bulk_upsert_tenders(self, tenders: Iterable[Dict], batch_size: int = 500) -> int:
+        written = 0
+        batch = []
+        for tender in tenders:
+            mapped = map_tender(tender)
+            missing = missing_required_columns(mapped)
+            if missing:
+                logger.warning(f"Skipping tender without {', '.join(missing)}: {tender.get('Link', 'Unknown')}")
+                continue
+            batch.append(mapped)
+            if len(batch) >= batch_size:
+                written += await self._write_tender_batch(batch)
+                batch = []
+        if batch:
+            written += await self._write_tender_batch(batch)
+        return written
+
+    async def _write_tender_batch(self, rows: List[Dict]) -> int:
+        """One transaction per batch; a batch with rejected row data is retried in halves (see DatabaseManager)."""
+        try:
+            return await self._upsert_batch(rows)
+        except (aiomysql.DataError, aiomysql.IntegrityError) as e:
+            if len(rows) == 1:
+                logger.error(f"Rejected tender {rows[0].get('tender_number')} ({rows[0].get('link')}): {e}")
+                return 0
+            logger.warning(f"Batch of {len(rows)} tenders failed, retrying in halves: {e}")
+            written = 0
+            for half in split_batch(rows):
+                written += await self._write_tender_batch(half)
+            return written
+
+    async def _upsert_batch(self, rows: List[Dict]) -> int:
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                try:
+                    with DB_WRITE_SECONDS.time(backend="aiomysql"):
+                        await conn.begin()
+                        for columns, group in group_rows_by_columns(rows).items():
+                            values = [row[k] for row in group for k in columns]
+                            await cursor.execute(build_upsert_statement(columns, len(group)), values)
+                        await conn.commit()
+                    DB_ROWS.inc(len(rows), backend="aiomysql")
+                    logger.debug(f"Upserted batch of {len(rows)} tenders")
+                    return len(rows)
+                except aiomysql.Error:
+                    await conn.rollback()
+                    raise
+
+    async def upsert_tender(self, tender):
+        await self.bulk_upsert_tenders([tender])
+
+    async def bulk_link_tender_keywords(self, pairs: List[Tuple[str, int]], batch_size: int = 500) -> int:
+        if not pairs:
+            return 0
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                try:
+                    await conn.begin()
+                    for i in range(0, len(pairs), batch_size):
+                        chunk = pairs[i:i + batch_size]
+                        await cursor.execute(build_tender_keywords_statement(len(chunk)),
+                                             [value for pair in chunk for value in pair])
+                    await conn.commit()
+                    return len(pairs)
+                except aiomysql.Error as e:
+                    logger.error(f"Error linking tender keywords: {e}")
+                    await conn.rollback()
+                    raise
+
+    async def log_scraping(self, key_word_id=None, classification_id=None, count=0, status="unknown",
+                           error=None, note=None, page_count=None, fetched_count=None, skipped_count=None):
+        try:
+            await self.execute_query(
+                LOG_SCRAPING_SQL,
+                (key_word_id, classification_id, count, page_count, fetched_count, skipped_count,
+                 status, error or note)
+            )
+        except aiomysql.Error as e:
+            logger.error(f"Error logging scraping: {e}")
+
+
+class ThreadedDatabaseManager:
+    """Same awaitable surface over the blocking DatabaseManager, run in worker threads."""
+
+    def __init__(self, manager=db_manager):
+        self.manager = manager
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def init_pool(self) -> "ThreadedDatabaseManager":
+        self.loop = asyncio.get_running_loop()
+        return self
+
+    async def close(self) -> None:
+        pass
+
+    async def execute_query(self, query, params=None):
+        return await asyncio.to_thread(self.manager.execute_query, query, params)
+
+    async def execute_many(self, query, params_list):
+        return await asyncio.to_thread(self.manager.execute_many, query, params_list)
+
+    async def fetch_all(self, query, params=None, dictionary=False):
+        return await asyncio.to_thread(self.manager.fetch_all, query, params, dictionary)
+
+    async def bulk_upsert_tenders(self, tenders: Iterable[Dict], batch_size: int = 500) -> int:
+        return await asyncio.to_thread(self.manager.bulk_upsert_tenders, list(tenders), batch_size)
+
+    async def upsert_tender(self, tender):
+        await asyncio.to_thread(self.manager.upsert_tender, tender)
+
+    async def bulk_link_tender_keywords(self, pairs: List[Tuple[str, int]], batch_size: int = 500) -> int:
+        return await asyncio.to_thread(self.manager.bulk_link_tender_keywords, pairs, batch_size)
+
+    async def log_scraping(self, **kwargs):
+        await asyncio.to_thread(self.manager.log_scraping, **kwargs)
+
+
+_async_db = None
+_async_db_lock: Optional[asyncio.Lock] = None
+_async_db_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _db_lock() -> asyncio.Lock:
+    # asyncio.Lock binds to the loop it is first used on; each asyncio.run() gets a fresh one
+    global _async_db_lock, _async_db_lock_loop
+    loop = asyncio.get_running_loop()
+    if _async_db_lock is None or _async_db_lock_loop is not loop:
+        _async_db_lock, _async_db_lock_loop = asyncio.Lock(), loop
+    return _async_db_lock
+
+
+async def get_async_db():
+    """Return the async DB manager selected by DB_CONFIG['async_backend'], bound to the running loop."""
+    global _async_db
+    loop = asyncio.get_running_loop()
+    async with _db_lock():
+        if _async_db is None or _async_db.loop is not loop:
+            if DB_CONFIG["async_backend"] == "aiomysql":
+                manager = AsyncDatabaseManager()
+            else:
+                manager = ThreadedDatabaseManager()
+            await manager.init_pool()
+            # Published only once initialised, so concurrent writers never see a manager without a pool
+            _async_db = manager
+        return _async_db
+
+
+async def close_async_db() -> None:
+    global _async_db
+    async with _db_lock():
+        if _async_db is not None:
+            await _async_db.close()
+            _async_db = None
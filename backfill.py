@@ -0,0 +1,169 @@
+"""
+Offline backfill of tenders from saved detail pages.
+
+Reads a directory (or .zip / .tar[.gz] archive) of raw `DetailsForVisitor`
+HTML files named after their STenderId, parses them on a process pool in
+chunks (HTML -> section text -> fields -> typed `tenders` rows) and streams
+the rows to the bulk DB writer in the main process. Parsing is CPU bound,
+so throughput scales with the number of worker processes.
+
+    python backfill.py saved_pages/ --workers 8
+"""
+import argparse
+import gzip
+import logging
+import logging.config
+import os
+import re
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from selectolax.parser import HTMLParser
+from config import BACKFILL_CONFIG, LOGGING_CONFIG
+from db import db_manager, map_tender
+from cache import bump_data_version
+from http_details import section_text
+from parsing import parse_sections, is_valid_tender
+
+logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger("etimad.backfill")
+
+PAGE_SUFFIXES = (".html", ".htm", ".html.gz", ".htm.gz")
+_TENDER_ID_RE = re.compile(r"STenderId=([^&./\\]+)")
+
+
+def tender_id_from_name(name: str) -> str:
+    match = _TENDER_ID_RE.search(name)
+    if match:
+        return match.group(1)
+    base = os.path.basename(name)
+    for suffix in PAGE_SUFFIXES:
+        if base.endswith(suffix):
+            return base[:-len(suffix)]
+    return base
+
+
+def _decode(name: str, data: bytes) -> str:
+    if name.endswith(".gz"):
+        data = gzip.decompress(data)
+    return data.decode("utf-8", errors="replace")
+
+
+def iter_raw_pages(source: str) -> Iterator[Tuple[str, bytes, Optional[bytes]]]:
+    """Yield (name, raw bytes, None) for every saved page in a directory or archive."""
+    path = Path(source)
+    if path.is_dir():
+        for file in sorted(path.rglob("*")):
+            if file.is_file() and file.name.endswith(PAGE_SUFFIXES):
+                yield str(file), file.read_bytes(), None
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.endswith(PAGE_SUFFIXES):
+                    yield info.filename, archive.read(info), None
+    elif tarfile.is_tarfile(path):
+        with tarfile.open(path) as archive:
+            for member in archive:
+                if member.isfile() and member.name.endswith(PAGE_SUFFIXES):
+                    yield member.name, archive.extractfile(member).read(), None
+    else:
+        raise ValueError(f"Not a directory or supported archive: {source}")
+
+
+def parse_page(name: str, data: bytes, tab_data: bytes = None) -> Dict:
+    """
+    One saved page -> typed `tenders` row, or None when it doesn't validate.
+    `tab_data` is the separately fetched #d-2 partial, when the page lacks it.
+    """
+    tree = HTMLParser(_decode(name, data))
+    sections = {"d-1": section_text(tree, "d-1"), "d-2": section_text(tree, "d-2")}
+    if tab_data is not None:
+        sections["d-2"] = section_text(HTMLParser(_decode(name, tab_data)), "d-2")
+    fields = parse_sections(sections)
+    if not is_valid_tender(fields):
+        return None
+    tender = {"Link": BACKFILL_CONFIG["detail_url"].format(tender_id=tender_id_from_name(name)), **fields}
+    return map_tender({k.replace(" ", "_"): v for k, v in tender.items()})
+
+
+def parse_chunk(pages: List[Tuple[str, bytes, Optional[bytes]]]) -> Tuple[List[Dict], int]:
+    """Worker entry point: returns (rows, number of pages that failed to parse)."""
+    rows = []
+    failed = 0
+    for name, data, tab_data in pages:
+        try:
+            row = parse_page(name, data, tab_data)
+        except Exception:
+            row = None
+        if row is None:
+            failed += 1
+        else:
+            rows.append(row)
+    return rows, failed
+
+
+def _chunks(pages: Iterator, size: int) -> Iterator[List]:
+    while True:
+        chunk = list(islice(pages, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_backfill(source: str, workers: int = None, chunk_size: int = None, dry_run: bool = False) -> Dict:
+    logger.info(f"Backfilling from {source}")
+    return run_pages(iter_raw_pages(source), workers, chunk_size, dry_run)
+
+
+def run_pages(pages: Iterator[Tuple[str, bytes, Optional[bytes]]], workers: int = None, chunk_size: int = None,
+              dry_run: bool = False) -> Dict:
+    """Parse `pages` on a process pool and stream the rows to the bulk writer."""
+    workers = workers or BACKFILL_CONFIG["workers"]
+    chunk_size = chunk_size or BACKFILL_CONFIG["chunk_size"]
+    max_pending = workers * BACKFILL_CONFIG["max_pending_chunks"]
+    stats = {"pages": 0, "parsed": 0, "failed": 0, "saved": 0}
+    if not dry_run:
+        db_manager.initialize_table()
+
+    def collect(future) -> None:
+        rows, failed = future.result()
+        stats["parsed"] += len(rows)
+        stats["failed"] += failed
+        if rows and not dry_run:
+            stats["saved"] += db_manager.bulk_write_rows(rows, BACKFILL_CONFIG["db_batch_size"])
+            bump_data_version()
+
+    started = time.perf_counter()
+    logger.info(f"Parsing with {workers} workers, {chunk_size} pages per chunk")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for chunk in _chunks(pages, chunk_size):
+            stats["pages"] += len(chunk)
+            pending.add(executor.submit(parse_chunk, chunk))
+            # Bounded in-flight work: write finished chunks while the rest are parsed
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future)
+        for future in pending:
+            collect(future)
+
+    elapsed = time.perf_counter() - started
+    stats["pages_per_sec"] = round(stats["pages"] / elapsed, 1) if elapsed else 0.0
+    logger.info(f"Backfill done: {stats['pages']} pages, {stats['parsed']} parsed, {stats['failed']} failed, "
+                f"{stats['saved']} saved in {elapsed:.1f}s ({stats['pages_per_sec']} pages/s)")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="Directory or .zip/.tar archive of saved detail pages")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true", help="Parse only, don't write to the database")
+    args = parser.parse_args()
+    run_backfill(args.source, args.workers, args.chunk_size, args.dry_run)
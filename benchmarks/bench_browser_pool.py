@@ -0,0 +1,67 @@
+"""
+Compare detail extraction throughput: one Chromium launch per link (the old
+behaviour) versus pages borrowed from the shared BrowserPool.
+
+    python -m benchmarks.bench_browser_pool --links 60
+"""
+import argparse
+import asyncio
+import time
+from playwright.async_api import async_playwright
+from config import SCRAPER_CONFIG
+from browser_pool import BrowserPool
+from extract_details import extract_single_tender
+from benchmarks.fixture_server import FixtureServer
+
+
+async def run_per_link_launch(links, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def process(link):
+        async with semaphore:
+            async with async_playwright() as p:
+                browser = await p.chromium.launch(headless=True, timeout=SCRAPER_CONFIG["timeout"])
+                context = await browser.new_context()
+                page = await context.new_page()
+                try:
+                    await extract_single_tender(page, link)
+                finally:
+                    await context.close()
+                    await browser.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[process(link) for link in links])
+    return time.perf_counter() - start
+
+
+async def run_pooled(links, browsers: int, contexts: int) -> float:
+    start = time.perf_counter()
+    async with BrowserPool(browsers=browsers, contexts_per_browser=contexts, headless=True) as pool:
+        async def process(link):
+            async with pool.page() as page:
+                await extract_single_tender(page, link)
+
+        await asyncio.gather(*[process(link) for link in links])
+    return time.perf_counter() - start
+
+
+async def main(args):
+    with FixtureServer() as server:
+        links = [server.detail_url(1000 + i) for i in range(args.links)]
+        concurrency = args.browsers * args.contexts
+
+        launch_time = await run_per_link_launch(links, concurrency)
+        pooled_time = await run_pooled(links, args.browsers, args.contexts)
+
+    print(f"links={args.links} concurrency={concurrency}")
+    print(f"per-link launch : {args.links / launch_time:8.2f} links/s ({launch_time:.2f}s)")
+    print(f"browser pool    : {args.links / pooled_time:8.2f} links/s ({pooled_time:.2f}s)")
+    print(f"speedup         : {launch_time / pooled_time:8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--links", type=int, default=60)
+    parser.add_argument("--browsers", type=int, default=2)
+    parser.add_argument("--contexts", type=int, default=3)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,87 @@
+"""
+Rows/sec of DatabaseManager.bulk_upsert_tenders against the configured local
+MySQL/MariaDB (MYSQL_* env vars), compared with a per-row loop over the
+old DELETE + INSERT statement. Benchmark rows use a BENCH- tender_number
+prefix and are removed afterwards.
+
+    python -m benchmarks.bench_bulk_upsert --sizes 1000 10000 100000
+"""
+import argparse
+import time
+from db import db_manager, map_tender, build_upsert_statement
+
+PER_ROW_LIMIT = 10000  # The per-row baseline is too slow to be worth running beyond this
+
+
+def make_tenders(count: int, offset: int = 0):
+    for i in range(offset, offset + count):
+        yield {
+            "Link": f"https://tenders.etimad.sa/Tender/DetailsForVisitor?STenderId=bench{i}",
+            "رقم_المنافسة": f"BENCH-{i:08d}",
+            "اسم_المنافسة": f"منافسة اختبار {i}",
+            "الرقم_المرجعي": f"REF-{i}",
+            "الغرض_من_المنافسة": "توريد خدمات",
+            "قيمة_وثائق_المنافسة": "مجانا" if i % 3 == 0 else "500",
+            "حالة_المنافسة": "معتمدة",
+            "مدة_العقد": "12 شهر",
+            "هل_التأمين_من_متطلبات_المنافسة": "لا",
+            "نوع_المنافسة": "منافسة عامة",
+            "الجهة_الحكوميه": "وزارة الاختبار",
+            "آخر_موعد_لإستلام_الإستفسارات": "10/02/1447 15/08/2025",
+            "آخر_موعد_لتقديم_العروض": "20/02/1447 25/08/2025 10:00 AM",
+            "تاريخ_فتح_العروض": "21/02/1447 26/08/2025 11:00 AM",
+            "تاريخ_فحص_العروض": "لا يوجد",
+        }
+
+
+def per_row_upsert(tenders) -> None:
+    """The pre-bulk behaviour: one connection, DELETE and INSERT per tender."""
+    for tender in tenders:
+        row = map_tender(tender)
+        columns = list(row.keys())
+        conn = db_manager.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM tenders WHERE tender_number = %s", (row["tender_number"],))
+            cursor.execute(build_upsert_statement(tuple(columns), 1), [row[k] for k in columns])
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def cleanup() -> None:
+    db_manager.execute_query("DELETE FROM tenders WHERE tender_number LIKE 'BENCH-%'")
+
+
+def main(args):
+    db_manager.initialize_table()
+    cleanup()
+    try:
+        for size in args.sizes:
+            if size <= PER_ROW_LIMIT:
+                start = time.perf_counter()
+                per_row_upsert(make_tenders(size))
+                elapsed = time.perf_counter() - start
+                print(f"{size:>7} tenders  per-row : {size / elapsed:10.0f} rows/s ({elapsed:.2f}s)")
+                cleanup()
+
+            start = time.perf_counter()
+            db_manager.bulk_upsert_tenders(make_tenders(size), args.batch_size)
+            elapsed = time.perf_counter() - start
+            print(f"{size:>7} tenders  bulk    : {size / elapsed:10.0f} rows/s ({elapsed:.2f}s)")
+
+            # Second pass exercises the ON DUPLICATE KEY UPDATE path
+            start = time.perf_counter()
+            db_manager.bulk_upsert_tenders(make_tenders(size), args.batch_size)
+            elapsed = time.perf_counter() - start
+            print(f"{size:>7} tenders  re-bulk : {size / elapsed:10.0f} rows/s ({elapsed:.2f}s)")
+            cleanup()
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--batch-size", type=int, default=500)
+    main(parser.parse_args())
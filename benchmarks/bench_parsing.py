@@ -0,0 +1,97 @@
+"""
+Tenders/sec for turning raw detail-section text into typed fields: the old
+line scan + per-field regex/strptime versus parsing.parse_sections(typed=True).
+The corpus is a directory of saved section texts (one JSON file per tender,
+{"d-1": text, "d-2": text}); without --corpus the fixture server's detail
+page is used with varying ids and dates.
+
+    python -m benchmarks.bench_parsing --corpus saved_sections/ --repeat 20
+"""
+import argparse
+import json
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from parsing import SECTION_1_FIELDS, SECTION_2_FIELDS, DATE_FIELDS, parse_sections, parse_arabic_datetime
+from benchmarks.fixture_server import render_detail
+from http_details import section_text
+from selectolax.parser import HTMLParser
+
+
+def legacy_extract_fields(raw_text, keys):
+    lines = raw_text.strip().splitlines()
+    result = {}
+    i = 0
+    while i < len(lines):
+        key = lines[i].strip()
+        if key in keys and i + 1 < len(lines):
+            result[key] = lines[i + 1].strip()
+            i += 2
+        else:
+            i += 1
+    return result
+
+
+def legacy_parse_datetime(value):
+    if not value or value.strip() == "لا يوجد":
+        return None
+    match = re.search(r'(\d{2}/\d{2}/\d{4})(?:\s+(\d{1,2}:\d{2}\s*(?:AM|PM)?))?', value)
+    if not match:
+        return None
+    time_part = match.group(2) or "00:00"
+    fmt = "%d/%m/%Y %I:%M %p" if ("AM" in time_part or "PM" in time_part) else "%d/%m/%Y %H:%M"
+    try:
+        return datetime.strptime(f"{match.group(1)} {time_part}", fmt)
+    except ValueError:
+        return None
+
+
+def legacy_parse(sections):
+    fields = legacy_extract_fields(sections["d-1"], SECTION_1_FIELDS)
+    fields.update(legacy_extract_fields(sections["d-2"], SECTION_2_FIELDS))
+    for key in DATE_FIELDS:
+        if key in fields:
+            fields[key] = legacy_parse_datetime(fields[key])
+    value = fields.get("قيمة وثائق المنافسة")
+    if value is not None:
+        cleaned = re.sub(r'[^\d.]', '', value)
+        fields["قيمة وثائق المنافسة"] = float(cleaned) if cleaned else 0.0
+    return fields
+
+
+def load_corpus(path: str, size: int):
+    if path:
+        return [json.loads(p.read_text(encoding="utf-8")) for p in sorted(Path(path).glob("*.json"))]
+    corpus = []
+    for i in range(size):
+        tree = HTMLParser(render_detail(100000 + i))
+        corpus.append({"d-1": section_text(tree, "d-1"), "d-2": section_text(tree, "d-2")})
+    return corpus
+
+
+def measure(parse, corpus, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for sections in corpus:
+            parse(sections)
+    return len(corpus) * repeat / (time.perf_counter() - start)
+
+
+def main(args):
+    corpus = load_corpus(args.corpus, args.size)
+    legacy = measure(legacy_parse, corpus, args.repeat)
+    parse_arabic_datetime.cache_clear()
+    compiled = measure(lambda sections: parse_sections(sections, typed=True), corpus, args.repeat)
+    print(f"corpus={len(corpus)} tenders x {args.repeat}")
+    print(f"legacy line scan : {legacy:10.0f} tenders/s")
+    print(f"parsing module   : {compiled:10.0f} tenders/s ({compiled / legacy:.1f}x)")
+    print(f"date cache       : {parse_arabic_datetime.cache_info()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", help="Directory of saved section JSON files")
+    parser.add_argument("--size", type=int, default=500, help="Synthetic corpus size without --corpus")
+    parser.add_argument("--repeat", type=int, default=20)
+    main(parser.parse_args())
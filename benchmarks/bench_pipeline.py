@@ -0,0 +1,142 @@
+"""
+End-to-end throughput of ScraperOrchestrator.run_pipeline against the local
+fixture site: searches, pagination, detail extraction and bulk writes to the
+configured local MySQL/MariaDB (MYSQL_* env vars). Reports tenders/sec,
+p50/p95 per stage, peak RSS of the process tree and the number of browser
+processes. Benchmark tenders (links on the fixture host) are deleted afterwards.
+
+    python -m benchmarks.bench_pipeline --tenders 1000 --keywords 10 --latency-ms 100 --error-rate 0.01
+    python -m benchmarks.bench_pipeline --tenders 1000 --keywords 50 --discovery local
+"""
+import argparse
+import asyncio
+import os
+import resource
+import time
+from typing import Dict, List, Tuple
+from config import SCRAPER_CONFIG, BROWSER_POOL_CONFIG, INCREMENTAL_CONFIG, DISCOVERY_CONFIG
+from orchestrator import ScraperOrchestrator
+from readiness import step_latency
+from db import db_manager
+from benchmarks.fixture_server import FixtureServer, FixtureDataset
+
+BROWSER_PROCESS_NAMES = ("chrome", "chromium", "headless_shell")
+
+
+def _descendants(pid: int) -> List[int]:
+    """Child pids from /proc (Linux); empty elsewhere."""
+    found = []
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        try:
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as f:
+                    children = [int(child) for child in f.read().split()]
+                found.extend(children)
+                stack.extend(children)
+        except OSError:
+            continue
+    return found
+
+
+def _rss_kib(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def _is_browser_main(pid: int) -> bool:
+    """Browser main processes; renderers/GPU/utility helpers carry a --type= flag."""
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            argv = f.read().split(b"\0")
+    except OSError:
+        return False
+    name = os.path.basename(argv[0].decode(errors="ignore")) if argv else ""
+    return any(n in name for n in BROWSER_PROCESS_NAMES) and not any(a.startswith(b"--type=") for a in argv)
+
+
+def sample_process_tree() -> Tuple[int, int]:
+    """(RSS in KiB of this process and all descendants, browser main processes)."""
+    pids = _descendants(os.getpid())
+    return _rss_kib(os.getpid()) + sum(_rss_kib(pid) for pid in pids), sum(_is_browser_main(pid) for pid in pids)
+
+
+async def monitor(peak: Dict, interval: float = 0.5) -> None:
+    while True:
+        rss, browsers = sample_process_tree()
+        peak["rss_kib"] = max(peak["rss_kib"], rss)
+        peak["browsers"] = max(peak["browsers"], browsers)
+        await asyncio.sleep(interval)
+
+
+def cleanup(base_url: str) -> None:
+    db_manager.execute_query("DELETE FROM tenders WHERE link LIKE %s", (f"{base_url}%",))
+
+
+async def run(server: FixtureServer) -> Tuple[Dict, float, Dict]:
+    peak = {"rss_kib": 0, "browsers": 0}
+    sampler = asyncio.create_task(monitor(peak))
+    start = time.perf_counter()
+    try:
+        stats = await ScraperOrchestrator().run_pipeline(keywords=server.keywords)
+    finally:
+        elapsed = time.perf_counter() - start
+        sampler.cancel()
+        await asyncio.gather(sampler, return_exceptions=True)
+    return stats, elapsed, peak
+
+
+def main(args):
+    dataset = FixtureDataset(args.tenders, args.keywords, args.page_size)
+    # Point the scraper at the fixture site for this process only
+    SCRAPER_CONFIG["detail_fetch_mode"] = args.mode
+    INCREMENTAL_CONFIG["enabled"] = args.incremental
+    DISCOVERY_CONFIG["mode"] = args.discovery
+    BROWSER_POOL_CONFIG["browsers"] = args.browsers
+    BROWSER_POOL_CONFIG["contexts_per_browser"] = args.contexts
+
+    with FixtureServer(dataset=dataset, latency_ms=args.latency_ms, error_rate=args.error_rate,
+                       lazy_tabs=args.lazy_tabs) as server:
+        SCRAPER_CONFIG["base_url"] = server.base_url
+        cleanup(server.base_url)
+        try:
+            stats, elapsed, peak = asyncio.run(run(server))
+        finally:
+            cleanup(server.base_url)
+
+    self_peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"tenders={args.tenders} keywords={args.keywords} page_size={args.page_size} mode={args.mode} "
+          f"latency={args.latency_ms}ms error_rate={args.error_rate} lazy_tabs={args.lazy_tabs} "
+          f"discovery={args.discovery}")
+    print(f"saved           : {stats['saved']}/{len(dataset.tender_ids)} tenders in {elapsed:.1f}s")
+    print(f"throughput      : {stats['saved'] / elapsed:8.2f} tenders/s")
+    print(f"requests        : {server.requests} dynamic ({server.errors} injected errors), "
+          f"{server.bytes_served / 1024 / 1024:.1f} MiB served")
+    print(f"search pages    : {server.searches} result pages fetched for discovery")
+    print(f"peak RSS        : {max(peak['rss_kib'], self_peak_kib) / 1024:.0f} MiB (process tree)")
+    print(f"browsers        : {peak['browsers']} processes (pool: {args.browsers} x {args.contexts} contexts)")
+    print("per stage       :")
+    print(step_latency.summary())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenders", type=int, default=500)
+    parser.add_argument("--keywords", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--lazy-tabs", action="store_true", help="Serve #d-2 as an XHR partial")
+    parser.add_argument("--mode", choices=["http", "browser"], default=SCRAPER_CONFIG["detail_fetch_mode"])
+    parser.add_argument("--browsers", type=int, default=BROWSER_POOL_CONFIG["browsers"])
+    parser.add_argument("--contexts", type=int, default=BROWSER_POOL_CONFIG["contexts_per_browser"])
+    parser.add_argument("--incremental", action="store_true", help="Keep incremental skipping enabled")
+    parser.add_argument("--discovery", choices=["keywords", "local"], default=DISCOVERY_CONFIG["mode"])
+    main(parser.parse_args())
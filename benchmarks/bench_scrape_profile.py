@@ -0,0 +1,58 @@
+"""
+Bytes transferred and page-ready time per tender with a full page load versus
+the lightweight scrape profile (resource blocking, no animations, static
+asset cache), against the local fixture server.
+
+    python -m benchmarks.bench_scrape_profile --links 40
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from browser_pool import BrowserPool
+from scrape_profile import ScrapeProfile
+from extract_details import extract_single_tender
+from benchmarks.fixture_server import FixtureServer
+
+FULL_PAGE = {
+    "blocked_resource_types": [],
+    "blocked_url_patterns": [],
+    "disable_animations": False,
+    "cache_static_assets": False,
+}
+
+
+async def run(server: FixtureServer, profile: ScrapeProfile, links, concurrency: int):
+    ready_times = []
+    async with BrowserPool(browsers=1, contexts_per_browser=concurrency, profile=profile) as pool:
+        async def process(link):
+            async with pool.page() as page:
+                start = time.perf_counter()
+                await extract_single_tender(page, link)
+                ready_times.append(time.perf_counter() - start)
+
+        before = server.bytes_served
+        await asyncio.gather(*[process(link) for link in links])
+        transferred = server.bytes_served - before
+    return transferred / len(links), statistics.median(ready_times)
+
+
+async def main(args):
+    with FixtureServer() as server:
+        links = [server.detail_url(2000 + i) for i in range(args.links)]
+        light = ScrapeProfile({"blocked_url_patterns": ScrapeProfile().blocked_url_patterns + ["/analytics/"]})
+
+        full_bytes, full_ready = await run(server, ScrapeProfile(FULL_PAGE), links, args.concurrency)
+        light_bytes, light_ready = await run(server, light, links, args.concurrency)
+
+    print(f"links={args.links} concurrency={args.concurrency}")
+    print(f"full page     : {full_bytes / 1024:8.1f} KiB/tender, page-ready p50 {full_ready * 1000:7.0f} ms")
+    print(f"scrape profile: {light_bytes / 1024:8.1f} KiB/tender, page-ready p50 {light_ready * 1000:7.0f} ms")
+    print(f"blocked requests: {light.blocked_requests}, static cache hits: {light.asset_cache.hits}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--links", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
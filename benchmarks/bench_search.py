@@ -0,0 +1,88 @@
+"""
+Query latency of search.TenderSearch against the configured local
+MySQL/MariaDB (MYSQL_* env vars) with a synthetic corpus of Arabic tender
+names/purposes, compared with the LIKE '%...%' scan it replaces. Benchmark
+rows use a BENCH-S tender_number prefix and are removed afterwards unless
+--keep is given (reuse them with --skip-seed).
+
+    python -m benchmarks.bench_search --tenders 1000000 --queries 200
+"""
+import argparse
+import random
+import statistics
+import time
+from db import db_manager
+from search import tender_search
+
+SUBJECTS = ["صيانة", "تشغيل", "توريد", "إنشاء", "تأهيل", "نظافة", "تطوير", "إدارة", "ترميم", "تركيب"]
+OBJECTS = ["المستشفيات", "المدارس", "الطرق", "أجهزة الحاسب الآلي", "المباني الإدارية", "شبكات المياه",
+           "الحدائق العامة", "أنظمة المراقبة", "المراكز الصحية", "الجسور", "محطات الكهرباء", "المختبرات"]
+PLACES = ["بمنطقة الرياض", "بمحافظة جدة", "بالمنطقة الشرقية", "بمنطقة القصيم", "بمنطقة عسير", "بمكة المكرمة"]
+QUERIES = ["صيانة المستشفيات", "توريد اجهزة الحاسب", "المدارس", "شبكة مياه", "الجسر", "تأهيل المباني",
+           "مختبر", "انظمة مراقبة الرياض", "نظافه الحدائق", "محطة كهرباء"]
+
+
+def make_tenders(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    for i in range(count):
+        name = f"{rng.choice(SUBJECTS)} {rng.choice(OBJECTS)} {rng.choice(PLACES)}"
+        yield {
+            "Link": f"https://tenders.etimad.sa/Tender/DetailsForVisitor?STenderId=bench-s{i}",
+            "رقم_المنافسة": f"BENCH-S{i:08d}",
+            "اسم_المنافسة": name,
+            "الغرض_من_المنافسة": f"{rng.choice(SUBJECTS)} و{rng.choice(SUBJECTS)} {rng.choice(OBJECTS)}",
+            "حالة_المنافسة": "معتمدة",
+            "الجهة_الحكوميه": "وزارة الاختبار",
+        }
+
+
+def like_scan(text: str, limit: int):
+    pattern = f"%{text}%"
+    return db_manager.fetch_all(
+        "SELECT id FROM tenders WHERE tender_name LIKE %s OR purpose LIKE %s LIMIT %s", (pattern, pattern, limit))
+
+
+def timed(fn, queries, limit):
+    latencies = []
+    for text in queries:
+        start = time.perf_counter()
+        fn(text, limit)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+
+def cleanup() -> None:
+    db_manager.execute_query("DELETE FROM tenders WHERE tender_number LIKE 'BENCH-S%'")
+
+
+def main(args):
+    db_manager.initialize_table()
+    if not args.skip_seed:
+        cleanup()
+        start = time.perf_counter()
+        db_manager.bulk_upsert_tenders(make_tenders(args.tenders), args.batch_size)
+        print(f"seeded {args.tenders} tenders in {time.perf_counter() - start:.1f}s")
+    try:
+        queries = [QUERIES[i % len(QUERIES)] for i in range(args.queries)]
+        fulltext = timed(lambda text, limit: tender_search.search(text, limit=limit), queries, args.limit)
+        print(f"fulltext search : p50 {fulltext[0]:8.1f} ms   p95 {fulltext[1]:8.1f} ms")
+        if not args.skip_like:
+            like = timed(like_scan, queries[:args.like_queries], args.limit)
+            print(f"LIKE '%...%'    : p50 {like[0]:8.1f} ms   p95 {like[1]:8.1f} ms")
+    finally:
+        if not args.keep:
+            cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenders", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--like-queries", type=int, default=20, help="The scan is slow; time fewer queries")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--skip-like", action="store_true")
+    parser.add_argument("--keep", action="store_true")
+    main(parser.parse_args())
@@ -0,0 +1,82 @@
+"""
+Measure `import orchestrator` wall time and the number of MySQL round trips
+it triggers, in a fresh interpreter. Pass --ref to measure another git
+revision (e.g. the commit before lazy loading) in a temporary worktree for
+a before/after comparison.
+
+    python -m benchmarks.bench_startup --runs 5 --ref HEAD~1
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from config import TAXONOMY_CONFIG
+
+PROBE = r"""
+import json, time
+import mysql.connector.connection as _conn
+round_trips = 0
+_original = _conn.MySQLConnection.cmd_query
+def _counting(self, *args, **kwargs):
+    global round_trips
+    round_trips += 1
+    return _original(self, *args, **kwargs)
+_conn.MySQLConnection.cmd_query = _counting
+try:
+    import mysql.connector.connection_cext as _cext
+    _original_c = _cext.CMySQLConnection.cmd_query
+    def _counting_c(self, *args, **kwargs):
+        global round_trips
+        round_trips += 1
+        return _original_c(self, *args, **kwargs)
+    _cext.CMySQLConnection.cmd_query = _counting_c
+except ImportError:
+    pass
+start = time.perf_counter()
+import orchestrator
+elapsed = time.perf_counter() - start
+print(json.dumps({"ms": elapsed * 1000, "round_trips": round_trips}))
+"""
+
+
+def measure(cwd: str, runs: int):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", PROBE], cwd=cwd, capture_output=True,
+                             text=True, encoding="utf-8", check=True)
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return (statistics.median(s["ms"] for s in samples),
+            max(s["round_trips"] for s in samples))
+
+
+def main(args):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    ms, trips = measure(root, args.runs)
+    print(f"current : import orchestrator {ms:8.1f} ms, {trips} DB round trips "
+          f"(budget {TAXONOMY_CONFIG['import_budget_ms']} ms)")
+
+    if args.ref:
+        with tempfile.TemporaryDirectory() as tmp:
+            worktree = os.path.join(tmp, "ref")
+            subprocess.run(["git", "worktree", "add", "--detach", worktree, args.ref], cwd=root,
+                           check=True, capture_output=True)
+            try:
+                ref_ms, ref_trips = measure(worktree, args.runs)
+            finally:
+                subprocess.run(["git", "worktree", "remove", "--force", worktree], cwd=root,
+                               capture_output=True)
+        print(f"{args.ref:<8}: import orchestrator {ref_ms:8.1f} ms, {ref_trips} DB round trips")
+
+    if ms > TAXONOMY_CONFIG["import_budget_ms"]:
+        sys.exit(f"import time {ms:.1f} ms exceeds budget")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--ref", help="git revision to compare against")
+    main(parser.parse_args())
@@ -0,0 +1,354 @@
+"""
+Local stand-in for tenders.etimad.sa used by the benchmarks, so runs never
+touch the live site. It serves:
+
+- `Tender/AllTendersForVisitor`: the search form (collapsed panel, keyword
+  box, status dropdown, #searchBtn) whose results are loaded by XHR into
+  `#cardsresult` as `.tender-card`s with a pager;
+- `Tender/DetailsForVisitor`: the `#d-1` / `#d-2` tab layout, with `#d-2`
+  either inline or lazily loaded from `GetTenderDatesViewComponenet`;
+- static assets and trackers, so resource blocking can be measured.
+
+Dataset size, response latency and error injection are configurable:
+
+    python -m benchmarks.fixture_server --tenders 2000 --keywords 20 --latency-ms 150 --error-rate 0.02
+"""
+import argparse
+import html
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List
+from urllib.parse import urlparse, parse_qs, quote
+
+SECTION_1_TEMPLATE = """<div id="d-1" class="tab-pane active">
+<div>اسم المنافسة</div><div>منافسة توريد خدمات رقم {tender_id}</div>
+<div>رقم المنافسة</div><div>{tender_id}</div>
+<div>الرقم المرجعي</div><div>REF-{tender_id}</div>
+<div>الغرض من المنافسة</div><div>توريد وتشغيل منصة ذكاء الأعمال</div>
+<div>قيمة وثائق المنافسة</div><div>500.00</div>
+<div>حالة المنافسة</div><div>معتمدة</div>
+<div>مدة العقد</div><div>12 شهر</div>
+<div>هل التأمين من متطلبات المنافسة</div><div>لا</div>
+<div>نوع المنافسة</div><div>منافسة عامة</div>
+<div>الجهة الحكوميه</div><div>وزارة الاختبار</div>
+</div>"""
+
+SECTION_2_BODY = """<div>آخر موعد لإستلام الإستفسارات</div><div>10/02/1447 15/08/2025</div>
+<div>آخر موعد لتقديم العروض</div><div>20/02/1447 {deadline} 10:00 AM</div>
+<div>تاريخ فتح العروض</div><div>21/02/1447 26/08/2025 11:00 AM</div>
+<div>تاريخ فحص العروض</div><div>لا يوجد</div>
+<div>فترة التوقف</div><div>5</div>
+<div>التاريخ المتوقع للترسية</div><div>01/09/2025</div>
+<div>تاريخ بدء الأعمال / الخدمات</div><div>15/09/2025</div>
+<div>بداية إرسال الأسئلة و الاستفسارات</div><div>01/08/2025</div>
+<div>اقصى مدة للاجابة على الاستفسارات</div><div>3</div>
+<div>مكان فتح العرض</div><div>الرياض</div>"""
+
+DETAIL_TEMPLATE = """<!DOCTYPE html>
+<html lang="ar" dir="rtl">
+<head><meta charset="utf-8"><title>تفاصيل المنافسة {tender_id}</title>
+<link rel="stylesheet" href="/static/site.css">
+<style>.tab-pane {{ display: none; }} .tab-pane.active {{ display: block; }}</style>
+<script src="/static/app.js"></script>
+<script async src="/analytics/gtag.js"></script>
+</head>
+<body>
+<img src="/static/logo.png?t={tender_id}" alt="">
+<img src="/static/banner.jpg?t={tender_id}" alt="">
+<ul class="nav">
+  <li><a href="#d-1" onclick="showTab('d-1'); return false;">المعلومات الأساسية</a></li>
+  <li><a href="#d-2" onclick="showTab('d-2'); return false;">المواعيد</a></li>
+</ul>
+{section_1}
+<div id="d-2" class="tab-pane" data-loaded="{d2_loaded}">
+{section_2}
+</div>
+<script>
+function showTab(id) {{
+  document.querySelectorAll('.tab-pane').forEach(function (el) {{ el.classList.remove('active'); }});
+  var pane = document.getElementById(id);
+  pane.classList.add('active');
+  if (id === 'd-2' && pane.dataset.loaded !== 'true') {{
+    pane.dataset.loaded = 'true';
+    fetch('/Tender/GetTenderDatesViewComponenet?tenderIdStr={tender_id}')
+      .then(function (r) {{ return r.text(); }})
+      .then(function (body) {{ pane.innerHTML = body; }});
+  }}
+}}
+</script>
+</body>
+</html>
+"""
+
+SEARCH_TEMPLATE = """<!DOCTYPE html>
+<html lang="ar" dir="rtl">
+<head><meta charset="utf-8"><title>المنافسات</title>
+<link rel="stylesheet" href="/static/site.css">
+<style>#searchPanel { display: none; } .dropdown-menu { display: none; } .dropdown-menu.show { display: block; }</style>
+<script src="/static/app.js"></script>
+<script async src="/analytics/gtag.js"></script>
+</head>
+<body>
+<img src="/static/banner.jpg" alt="">
+<button id="searchBtnColaps" onclick="document.getElementById('searchPanel').style.display = 'block'">بحث متقدم</button>
+<div id="searchPanel">
+  <input id="txtMultipleSearch" type="text">
+  <label>حالة المنافسة</label>
+  <div class="dropdown">
+    <button class="dropdown-toggle" onclick="document.getElementById('statusMenu').classList.toggle('show')">الكل</button>
+    <div id="statusMenu" class="dropdown-menu">
+      <a href="#" onclick="pickStatus(1); return false;">المنافسات النشطة (تقديم العروض)</a>
+      <a href="#" onclick="pickStatus(0); return false;">الكل</a>
+    </div>
+  </div>
+  <button id="searchBtn" onclick="search(1)">بحث</button>
+</div>
+<div id="cardsresult"></div>
+<script>
+var statusFilter = 0;
+function pickStatus(value) {
+  statusFilter = value;
+  document.getElementById('statusMenu').classList.remove('show');
+}
+function search(page) {
+  var keyword = document.getElementById('txtMultipleSearch').value;
+  fetch('/Tender/AllSupplierTendersForVisitorAsync?keyword=' + encodeURIComponent(keyword) + '&status=' + statusFilter + '&page=' + page)
+    .then(function (r) { return r.text(); })
+    .then(function (body) { document.getElementById('cardsresult').innerHTML = body; });
+}
+</script>
+</body>
+</html>
+"""
+
+CARD_TEMPLATE = """<div class="tender-card">
+<h3><a href="/Tender/DetailsForVisitor?STenderId={tender_id}">منافسة {keyword} رقم {tender_id}</a></h3>
+<p>وزارة الاختبار - آخر موعد لتقديم العروض {deadline}</p>
+</div>"""
+
+PAGER_TEMPLATE = """<ul class="pagination">
+<li class="page-item{disabled}"><a class="page-link" aria-label="Next" href="#" onclick="search({next_page}); return false;">التالي</a></li>
+</ul>"""
+
+NO_RESULTS = '<p class="no-results">لا توجد نتائج</p>'
+
+# Static payloads standing in for the real site's images, fonts, bundles and trackers
+ASSETS = {
+    "/static/site.css": ("text/css", "@font-face { font-family: f; src: url(/static/font.woff2); } body { font-family: f; }\n" + "/* pad */\n" * 4000),
+    "/static/app.js": ("application/javascript", "window.app = {};\n" + "// pad\n" * 8000),
+    "/static/font.woff2": ("font/woff2", "F" * 60000),
+    "/static/logo.png": ("image/png", "P" * 40000),
+    "/static/banner.jpg": ("image/jpeg", "J" * 150000),
+    "/analytics/gtag.js": ("application/javascript", "window.dataLayer = [];\n" + "// pad\n" * 10000),
+}
+
+# Endpoints subject to latency and error injection (static assets are always fast)
+DYNAMIC_PATHS = {"/Tender/AllTendersForVisitor", "/Tender/AllSupplierTendersForVisitorAsync",
+                 "/Tender/DetailsForVisitor", "/Tender/GetTenderDatesViewComponenet"}
+
+
+def deadline_for(tender_id: int) -> str:
+    return f"{1 + int(tender_id) % 28:02d}/08/2025"
+
+
+def render_detail(tender_id, lazy_tabs: bool = False) -> str:
+    section_2 = "" if lazy_tabs else SECTION_2_BODY.format(deadline=deadline_for(tender_id))
+    return DETAIL_TEMPLATE.format(
+        tender_id=tender_id,
+        section_1=SECTION_1_TEMPLATE.format(tender_id=tender_id),
+        section_2=section_2,
+        d2_loaded="false" if lazy_tabs else "true",
+    )
+
+
+class FixtureDataset:
+    """
+    `tenders` tender ids starting at `first_id`, spread over `keywords`
+    keywords. Every `overlap_every`-th tender also matches the next keyword,
+    so cross-keyword deduplication is exercised. Card titles name every
+    keyword of the tender, and an empty search lists all tenders, so the
+    local discovery mode can classify them.
+    """
+
+    def __init__(self, tenders: int = 500, keywords: int = 10, page_size: int = 10,
+                 overlap_every: int = 5, first_id: int = 900000):
+        self.page_size = page_size
+        self.keywords: List[str] = [f"اختبار{k}" for k in range(keywords)]
+        self.by_keyword = {keyword: [] for keyword in self.keywords}
+        self.keywords_of: Dict[int, List[str]] = {}
+        for i in range(tenders):
+            tender_id = first_id + i
+            k = i % keywords
+            self.by_keyword[self.keywords[k]].append(tender_id)
+            self.keywords_of[tender_id] = [self.keywords[k]]
+            if overlap_every and i % overlap_every == 0 and keywords > 1:
+                self.by_keyword[self.keywords[(k + 1) % keywords]].append(tender_id)
+                self.keywords_of[tender_id].append(self.keywords[(k + 1) % keywords])
+        self.tender_ids = list(range(first_id, first_id + tenders))
+
+    def search(self, keyword: str, page: int):
+        """(tender ids on `page`, has_next_page) for a keyword; unknown keywords match nothing, "" matches all."""
+        ids = self.by_keyword.get(keyword, []) if keyword else self.tender_ids
+        start = (page - 1) * self.page_size
+        return ids[start:start + self.page_size], start + self.page_size < len(ids)
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: str, content_type: str = "text/html; charset=utf-8"):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(payload)
+        self.server.count_bytes(len(payload))
+
+    def _search_cards(self, query) -> str:
+        keyword = query.get("keyword", [""])[0]
+        page = int(query.get("page", ["1"])[0])
+        dataset = self.server.dataset
+        ids, has_next = dataset.search(keyword, page)
+        self.server.count_search()
+        if not ids:
+            return NO_RESULTS
+        cards = "\n".join(CARD_TEMPLATE.format(tender_id=tender_id,
+                                               keyword=html.escape(" ".join(dataset.keywords_of[tender_id])),
+                                               deadline=deadline_for(tender_id)) for tender_id in ids)
+        pager = PAGER_TEMPLATE.format(disabled="" if has_next else " disabled", next_page=page + 1)
+        return cards + "\n" + pager
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        server = self.server
+        if url.path in DYNAMIC_PATHS:
+            failing = bool(server.error_rate) and random.random() < server.error_rate
+            server.count_request(failing)
+            if server.latency_ms:
+                time.sleep(server.latency_ms * random.uniform(0.5, 1.5) / 1000)
+            if failing:
+                self._send(random.choice([429, 503]), "overloaded", "text/plain")
+                return
+
+        if url.path == "/Tender/AllTendersForVisitor":
+            self._send(200, SEARCH_TEMPLATE)
+        elif url.path == "/Tender/AllSupplierTendersForVisitorAsync":
+            self._send(200, self._search_cards(query))
+        elif url.path == "/Tender/DetailsForVisitor":
+            tender_id = query.get("STenderId", ["0"])[0]
+            self._send(200, render_detail(tender_id, server.lazy_tabs))
+        elif url.path == "/Tender/GetTenderDatesViewComponenet":
+            tender_id = query.get("tenderIdStr", ["0"])[0]
+            self._send(200, SECTION_2_BODY.format(deadline=deadline_for(tender_id)))
+        elif url.path in ASSETS:
+            content_type, body = ASSETS[url.path]
+            self._send(200, body, content_type)
+        else:
+            self._send(404, "not found", "text/plain")
+
+
+class _CountingHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, *args, dataset: FixtureDataset, latency_ms: float, error_rate: float,
+                 lazy_tabs: bool, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dataset = dataset
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.lazy_tabs = lazy_tabs
+        self.bytes_served = 0
+        self.requests = 0
+        self.errors = 0
+        self.searches = 0
+        self._lock = threading.Lock()
+
+    def count_bytes(self, n: int) -> None:
+        with self._lock:
+            self.bytes_served += n
+
+    def count_request(self, failed: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            self.errors += failed
+
+    def count_search(self) -> None:
+        with self._lock:
+            self.searches += 1
+
+
+class FixtureServer:
+    """Run the fixture site on a background thread: `with FixtureServer() as srv: srv.detail_url(...)`."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, dataset: FixtureDataset = None,
+                 latency_ms: float = 0, error_rate: float = 0.0, lazy_tabs: bool = False):
+        self.dataset = dataset or FixtureDataset()
+        self.httpd = _CountingHTTPServer((host, port), FixtureHandler, dataset=self.dataset,
+                                         latency_ms=latency_ms, error_rate=error_rate, lazy_tabs=lazy_tabs)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def bytes_served(self) -> int:
+        return self.httpd.bytes_served
+
+    @property
+    def requests(self) -> int:
+        return self.httpd.requests
+
+    @property
+    def errors(self) -> int:
+        return self.httpd.errors
+
+    @property
+    def searches(self) -> int:
+        """Result pages served (results XHRs), i.e. site round trips spent on discovery."""
+        return self.httpd.searches
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def keywords(self) -> List[str]:
+        return self.dataset.keywords
+
+    def detail_url(self, tender_id) -> str:
+        return f"{self.base_url}/Tender/DetailsForVisitor?STenderId={tender_id}"
+
+    def search_url(self, keyword: str = "", page: int = 1) -> str:
+        return f"{self.base_url}/Tender/AllSupplierTendersForVisitorAsync?keyword={quote(keyword)}&page={page}"
+
+    def __enter__(self) -> "FixtureServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tenders", type=int, default=500)
+    parser.add_argument("--keywords", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--lazy-tabs", action="store_true", help="Load #d-2 by XHR instead of inline")
+    args = parser.parse_args()
+    dataset = FixtureDataset(args.tenders, args.keywords, args.page_size)
+    with FixtureServer(port=args.port, dataset=dataset, latency_ms=args.latency_ms,
+                       error_rate=args.error_rate, lazy_tabs=args.lazy_tabs) as server:
+        print(f"Fixture server on {server.base_url} ({args.tenders} tenders, keywords: {', '.join(server.keywords)})")
+        server.thread.join()
@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import logging.config
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright, Error as PlaywrightError
+from config import BROWSER_POOL_CONFIG, SCRAPER_CONFIG, LOGGING_CONFIG
+from scrape_profile import ScrapeProfile, default_profile
+
+logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger("etimad.browser_pool")
+
+
+class _PageSlot:
+    """One reusable page: a context on a given browser plus its usage counter."""
+
+    def __init__(self, browser_index: int):
+        self.browser_index = browser_index
+        self.context: Optional[BrowserContext] = None
+        self.page: Optional[Page] = None
+        self.navigations = 0
+        self.broken = False
+
+
+class BrowserPool:
+    """
+    Long-lived pool of Chromium browsers (N) each serving M contexts.
+    Pages are handed out with `async with pool.page() as page:` and reused
+    across links. A slot is recycled after `max_navigations` uses or when its
+    page/browser crashed; a disconnected browser is relaunched on demand.
+    """
+
+    def __init__(self, browsers: int = None, contexts_per_browser: int = None,
+                 max_navigations: int = None, headless: bool = None, profile: ScrapeProfile = None):
+        self.browser_count = browsers or BROWSER_POOL_CONFIG["browsers"]
+        self.contexts_per_browser = contexts_per_browser or BROWSER_POOL_CONFIG["contexts_per_browser"]
+        self.max_navigations = max_navigations or BROWSER_POOL_CONFIG["max_navigations"]
+        self.profile = profile or default_profile
+        self.headless = self.profile.headless if headless is None else headless
+
+        self._playwright: Optional[Playwright] = None
+        self._browsers: List[Optional[Browser]] = []
+        self._browser_locks: List[asyncio.Lock] = []
+        self._slots: Optional[asyncio.Queue] = None
+        self._all_slots: List[_PageSlot] = []
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.started = False
+
+    @property
+    def size(self) -> int:
+        return self.browser_count * self.contexts_per_browser
+
+    async def start(self) -> "BrowserPool":
+        if self.started:
+            return self
+        self.loop = asyncio.get_running_loop()
+        self._playwright = await async_playwright().start()
+        self._browsers = [None] * self.browser_count
+        self._browser_locks = [asyncio.Lock() for _ in range(self.browser_count)]
+        self._slots = asyncio.Queue()
+        for b in range(self.browser_count):
+            await self._ensure_browser(b)
+            for _ in range(self.contexts_per_browser):
+                slot = _PageSlot(b)
+                self._all_slots.append(slot)
+                self._slots.put_nowait(slot)
+        self.started = True
+        logger.info(f"🧭 Browser pool started: {self.browser_count} browsers x {self.contexts_per_browser} contexts")
+        return self
+
+    async def close(self) -> None:
+        # Also cleans up after a start() that failed halfway
+        if not self.started and self._playwright is None:
+            return
+        self.started = False
+        for slot in self._all_slots:
+            await self._close_slot(slot)
+        for browser in self._browsers:
+            if browser:
+                try:
+                    await browser.close()
+                except PlaywrightError:
+                    pass
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+        self._browsers = []
+        self._all_slots = []
+        logger.info("🧭 Browser pool closed")
+
+    async def __aenter__(self) -> "BrowserPool":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def _launch_browser(self) -> Browser:
+        options = {**self.profile.launch_options(), "headless": self.headless}
+        return await self._playwright.chromium.launch(timeout=SCRAPER_CONFIG["timeout"], **options)
+
+    async def _ensure_browser(self, index: int) -> Browser:
+        async with self._browser_locks[index]:
+            browser = self._browsers[index]
+            if browser is None or not browser.is_connected():
+                if browser is not None:
+                    logger.warning(f"♻️ Browser {index} disconnected, relaunching")
+                browser = await self._launch_browser()
+                self._browsers[index] = browser
+            return browser
+
+    async def _close_slot(self, slot: _PageSlot) -> None:
+        if slot.context:
+            try:
+                await slot.context.close()
+            except PlaywrightError:
+                pass
+        slot.context = None
+        slot.page = None
+        slot.navigations = 0
+        slot.broken = False
+
+    def _is_healthy(self, slot: _PageSlot) -> bool:
+        browser = self._browsers[slot.browser_index]
+        return (
+            slot.page is not None
+            and not slot.broken
+            and not slot.page.is_closed()
+            and slot.navigations < self.max_navigations
+            and browser is not None
+            and browser.is_connected()
+        )
+
+    async def _prepare_slot(self, slot: _PageSlot) -> Page:
+        if self._is_healthy(slot):
+            return slot.page
+        await self._close_slot(slot)
+        browser = await self._ensure_browser(slot.browser_index)
+        slot.context = await browser.new_context(**self.profile.context_options())
+        await self.profile.apply(slot.context)
+        slot.page = await slot.context.new_page()
+        return slot.page
+
+    @asynccontextmanager
+    async def page(self):
+        """Borrow a page from the pool; it is returned (or recycled) on exit."""
+        if not self.started:
+            await self.start()
+        slot = await self._slots.get()
+        try:
+            try:
+                page = await self._prepare_slot(slot)
+            except PlaywrightError:
+                slot.broken = True
+                raise
+            try:
+                yield page
+            except PlaywrightError:
+                # Target/browser crashes surface as generic Playwright errors
+                slot.broken = True
+                raise
+            finally:
+                slot.navigations += 1
+        finally:
+            self._slots.put_nowait(slot)
+
+
+_shared_pool: Optional[BrowserPool] = None
+_shared_pool_lock: Optional[asyncio.Lock] = None
+_shared_pool_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _pool_lock() -> asyncio.Lock:
+    # asyncio.Lock binds to the loop it is first used on; each asyncio.run() gets a fresh one
+    global _shared_pool_lock, _shared_pool_lock_loop
+    loop = asyncio.get_running_loop()
+    if _shared_pool_lock is None or _shared_pool_lock_loop is not loop:
+        _shared_pool_lock, _shared_pool_lock_loop = asyncio.Lock(), loop
+    return _shared_pool_lock
+
+
+async def get_browser_pool() -> BrowserPool:
+    """Return the process-wide pool, (re)starting it on the current event loop."""
+    global _shared_pool
+    loop = asyncio.get_running_loop()
+    async with _pool_lock():
+        if _shared_pool is None or not _shared_pool.started or _shared_pool.loop is not loop:
+            pool = BrowserPool()
+            try:
+                await pool.start()
+            except BaseException:
+                await pool.close()
+                raise
+            # Published only once started, so concurrent callers never see (or replace) a half-built pool
+            _shared_pool = pool
+        return _shared_pool
+
+
+async def close_browser_pool() -> None:
+    global _shared_pool
+    async with _pool_lock():
+        if _shared_pool is not None:
+            await _shared_pool.close()
+            _shared_pool = None
+
+
+@asynccontextmanager
+async def pool_or_shared(pool: Optional[BrowserPool] = None):
+    """
+    For top-level entry points: `pool` when the caller passed one, otherwise
+    the shared pool, closed again on exit so its browsers don't outlive the call.
+    """
+    if pool is not None:
+        yield pool
+        return
+    try:
+        yield await get_browser_pool()
+    finally:
+        await close_browser_pool()
@@ -0,0 +1,179 @@
+"""
+Read-through cache for the dashboard queries (queries.py / search.py).
+
+Entries are tagged with the data version current when they were loaded. The
+persistence stage calls bump_data_version() after every committed batch,
+which makes all older entries stale at once; TTL bounds staleness for writes
+the pipeline doesn't announce (e.g. scraping_logs rows written by searches).
+
+The version counter and the cached values live in-process by default, which
+covers the dashboard running the pipeline in its own thread. With
+CACHE_CONFIG["redis_url"] set, both are shared through Redis (or any
+Redis-compatible server), so a pipeline in another process (Airflow,
+main.py) invalidates the dashboard and several dashboard workers share one
+load per data change.
+"""
+import functools
+import logging
+import logging.config
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+from config import CACHE_CONFIG, LOGGING_CONFIG
+
+try:
+    import redis
+except ImportError:  # Optional dependency
+    redis = None
+
+logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger("etimad.cache")
+
+_MISSING = object()
+
+
+class LocalBackend:
+    """Process-local version counter and LRU store."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._version = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def version(self) -> int:
+        return self._version
+
+    def bump(self) -> int:
+        with self._lock:
+            self._version += 1
+            # Every entry is stale now; free them instead of waiting for LRU eviction
+            self._entries.clear()
+            return self._version
+
+    def get(self, key: Hashable, version: int) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            entry_version, expires_at, value = entry
+            if entry_version != version or expires_at <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, version: int, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (version, time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+class RedisBackend:
+    """Version counter and pickled values in Redis; keys embed the version, so a bump orphans old ones."""
+
+    def __init__(self, url: str, prefix: str):
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def version(self) -> int:
+        return int(self.client.get(f"{self.prefix}:version") or 0)
+
+    def bump(self) -> int:
+        return self.client.incr(f"{self.prefix}:version")
+
+    def _key(self, key: Hashable, version: int) -> str:
+        return f"{self.prefix}:v{version}:{key!r}"
+
+    def get(self, key: Hashable, version: int) -> Any:
+        payload = self.client.get(self._key(key, version))
+        return _MISSING if payload is None else pickle.loads(payload)
+
+    def set(self, key: Hashable, version: int, value: Any, ttl: float) -> None:
+        self.client.set(self._key(key, version), pickle.dumps(value), px=max(1, int(ttl * 1000)))
+
+
+class QueryCache:
+    def __init__(self, backend=None, ttl: float = None):
+        self.backend = backend or LocalBackend(CACHE_CONFIG["maxsize"])
+        self.ttl = CACHE_CONFIG["ttl"] if ttl is None else ttl
+        self.hits = 0
+        self.misses = 0
+        self._loading: Dict[Hashable, threading.Lock] = {}
+        self._loading_lock = threading.Lock()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: float = None) -> Any:
+        try:
+            version = self.backend.version()
+            value = self.backend.get(key, version)
+        except Exception as e:
+            logger.warning(f"Cache backend unavailable, querying directly: {e}")
+            return loader()
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        # Single flight: viewers missing the same key wait for one load instead of each querying
+        with self._loading_lock:
+            key_lock = self._loading.get(key)
+            owner = key_lock is None
+            if owner:
+                key_lock = self._loading[key] = threading.Lock()
+        try:
+            with key_lock:
+                value = self.backend.get(key, version)
+                if value is _MISSING:
+                    self.misses += 1
+                    value = loader()
+                    try:
+                        self.backend.set(key, version, value, self.ttl if ttl is None else ttl)
+                    except Exception as e:
+                        logger.warning(f"Could not store cache entry: {e}")
+                else:
+                    self.hits += 1
+        finally:
+            # Only the thread that registered the lock retires it, and only if no newer one replaced it
+            if owner:
+                with self._loading_lock:
+                    if self._loading.get(key) is key_lock:
+                        del self._loading[key]
+        return value
+
+    def cached(self, func: Callable = None, *, ttl: float = None):
+        """Decorator form: results keyed by function name and (hashable) arguments."""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not CACHE_CONFIG["enabled"]:
+                    return func(*args, **kwargs)
+                key = (func.__qualname__, args, tuple(sorted(kwargs.items())))
+                return self.get_or_load(key, lambda: func(*args, **kwargs), ttl)
+            return wrapper
+        return decorate(func) if func else decorate
+
+
+def _create_cache() -> QueryCache:
+    url = CACHE_CONFIG["redis_url"]
+    if url:
+        if redis is None:
+            logger.warning("CACHE_REDIS_URL is set but the redis package is not installed; using the local cache")
+        else:
+            return QueryCache(RedisBackend(url, CACHE_CONFIG["redis_prefix"]))
+    return QueryCache()
+
+
+query_cache = _create_cache()
+
+
+def bump_data_version() -> Optional[int]:
+    """Invalidate cached dashboard reads; called by the persistence stage after each committed batch."""
+    try:
+        return query_cache.backend.bump()
+    except Exception as e:
+        # A cache outage must never fail a DB write; entries still expire by TTL
+        logger.warning(f"Could not bump data version: {e}")
+        return None
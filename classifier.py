@@ -0,0 +1,105 @@
+"""
+Local keyword classification for the "local" discovery mode: instead of one
+site search per taxonomy keyword, a few broad searches list every active
+tender once and each card title is matched against all keywords in a single
+pass of an Aho–Corasick automaton.
+
+Titles and keywords go through arabic.tokenize first, so the match is on
+whole stemmed words and ignores hamza/taa-marbuta spelling, diacritics and
+the article/plural affixes (المستشفيات matches the keyword مستشفى).
+"""
+from collections import deque
+from typing import Dict, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
+from arabic import tokenize
+from keyword_index import KeywordIndex
+
+T = TypeVar("T")
+
+
+class AhoCorasick(Generic[T]):
+    """Multi-pattern substring matcher: add() patterns, build() once, then find() in O(len(text) + matches)."""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[T]] = [[]]
+        self._built = False
+
+    def add(self, pattern: str, value: T) -> None:
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = next_node
+        self._out[node].append(value)
+        self._built = False
+
+    def build(self) -> "AhoCorasick[T]":
+        """Compute failure links breadth-first and merge each node's outputs with its fallback's."""
+        queue = deque(self._goto[0].values())
+        for node in queue:
+            self._fail[node] = 0
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+                queue.append(child)
+        self._built = True
+        return self
+
+    def find(self, text: str) -> Iterator[T]:
+        if not self._built:
+            self.build()
+        node = 0
+        for char in text:
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            yield from self._out[node]
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+
+def _pattern(text: Optional[str]) -> Optional[str]:
+    """Space-padded token string, so patterns only match on whole (stemmed) words."""
+    tokens = tokenize(text)
+    return f" {' '.join(tokens)} " if tokens else None
+
+
+class KeywordClassifier:
+    """
+    Maps a card title to every (sub_category, keyword_id) whose keyword occurs
+    in it. Keyword ids come from the shared keyword index; keywords missing
+    from it (e.g. benchmark fixtures) still match with a None id.
+    """
+
+    def __init__(self, keywords: Iterable[str], index: KeywordIndex = None):
+        self.automaton: AhoCorasick[Tuple[str, Optional[int]]] = AhoCorasick()
+        self.keywords: List[str] = []
+        for keyword in keywords:
+            entry = index.lookup(keyword) if index else None
+            target = (keyword, entry.keyword_id if entry else None)
+            # The English keyword, if any, classifies into the same sub-category
+            variants = {keyword, entry.keyword_ar, entry.keyword_en} if entry else {keyword}
+            patterns = {_pattern(variant) for variant in variants} - {None}
+            for pattern in patterns:
+                self.automaton.add(pattern, target)
+            if patterns:
+                self.keywords.append(keyword)
+        self.automaton.build()
+
+    def classify(self, text: str) -> List[Tuple[str, Optional[int]]]:
+        """Distinct matches in order of first occurrence in `text`."""
+        pattern = _pattern(text)
+        return list(dict.fromkeys(self.automaton.find(pattern))) if pattern else []
@@ -0,0 +1,202 @@
+import asyncio
+import time
+import logging
+import logging.config
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Optional
+from config import LOGGING_CONFIG, ADAPTIVE_CONCURRENCY_CONFIG
+from metrics import RETRIES
+
+logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger("etimad.concurrency")
+
+OVERLOAD_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HostOverloadedError(Exception):
+    """
+    Raised by fetchers when Etimad answers with 429/5xx or times out (status
+    None), so the limiter backs off.
+    """
+
+    def __init__(self, status: Optional[int], url: str = ""):
+        super().__init__(f"HTTP {status} from {url}" if status else f"Timed out fetching {url}")
+        self.status = status
+        self.url = url
+
+
+class _Outcome:
+    def __init__(self):
+        self.overloaded = False
+        self.failed = False
+
+    def mark_overloaded(self) -> None:
+        self.overloaded = True
+
+    def mark_failed(self) -> None:
+        self.failed = True
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit: after `limit` consecutive healthy completions
+    (no error, latency under target) the limit grows by one; a timeout or
+    429/5xx cuts it by `decrease_factor`, at most once per cooldown window.
+    """
+
+    def __init__(self, initial: int = None, minimum: int = None, maximum: int = None,
+                 latency_target: float = None, decrease_factor: float = None, cooldown: float = None):
+        cfg = ADAPTIVE_CONCURRENCY_CONFIG
+        self.minimum = minimum or cfg["min_limit"]
+        self.maximum = maximum or cfg["max_limit"]
+        self.limit = initial or cfg["initial_limit"]
+        self.latency_target = latency_target or cfg["latency_target"]
+        self.decrease_factor = decrease_factor or cfg["decrease_factor"]
+        self.cooldown = cooldown or cfg["cooldown"]
+        self.in_flight = 0
+        self._healthy_streak = 0
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+
+    async def _acquire(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def _release(self, latency: float, ok: bool, overloaded: bool) -> None:
+        async with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if overloaded:
+                self._healthy_streak = 0
+                if now - self._last_decrease >= self.cooldown:
+                    new_limit = max(self.minimum, int(self.limit * self.decrease_factor))
+                    if new_limit != self.limit:
+                        logger.info(f"🐢 Backing off: concurrency {self.limit} -> {new_limit}")
+                    self.limit = new_limit
+                    self._last_decrease = now
+            elif ok and latency <= self.latency_target:
+                self._healthy_streak += 1
+                if self._healthy_streak >= self.limit and self.limit < self.maximum:
+                    self.limit += 1
+                    self._healthy_streak = 0
+                    logger.debug(f"Concurrency raised to {self.limit}")
+            else:
+                self._healthy_streak = 0
+            self._cond.notify_all()
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Hold one unit of concurrency; call `outcome.mark_overloaded()` to signal
+        backpressure and `outcome.mark_failed()` for a completion that must not
+        count as healthy.
+        """
+        await self._acquire()
+        outcome = _Outcome()
+        start = time.monotonic()
+        ok = False
+        try:
+            yield outcome
+            ok = not (outcome.overloaded or outcome.failed)
+        except (HostOverloadedError, asyncio.TimeoutError):
+            outcome.mark_overloaded()
+            raise
+        finally:
+            await self._release(time.monotonic() - start, ok, outcome.overloaded)
+
+
+class WorkQueueScheduler:
+    """
+    Continuous work-queue: up to `limiter.maximum` workers pull items as soon
+    as they free up (no batch barriers), each gated by the adaptive limiter.
+    Items hitting HostOverloadedError are requeued with exponential backoff.
+    """
+
+    def __init__(self, handler: Callable[[Any], Awaitable[Any]], limiter: Optional[AdaptiveLimiter] = None,
+                 on_result: Optional[Callable[[Any, Any], Awaitable[None]]] = None, max_retries: int = None):
+        self.handler = handler
+        self.limiter = limiter or AdaptiveLimiter()
+        self.on_result = on_result
+        self.max_retries = max_retries or ADAPTIVE_CONCURRENCY_CONFIG["max_overload_retries"]
+        self.queue: Optional[asyncio.Queue] = None
+        self._pending_retries = 0
+        self._active = 0
+        self._retry_tasks = set()
+
+    @property
+    def current_limit(self) -> int:
+        return self.limiter.limit
+
+    @property
+    def queue_depth(self) -> int:
+        return (self.queue.qsize() if self.queue else 0) + self._pending_retries
+
+    async def _requeue_later(self, item: Any, attempt: int) -> None:
+        try:
+            await asyncio.sleep(2 ** attempt)
+            await self.queue.put((item, attempt + 1))
+        finally:
+            self._pending_retries -= 1
+
+    async def _worker(self) -> None:
+        while True:
+            entry = await self.queue.get()
+            if entry is None:
+                # Put the sentinel back for the next worker
+                await self.queue.put(None)
+                return
+            item, attempt = entry
+            self._active += 1
+            try:
+                await self._handle(item, attempt)
+            finally:
+                self._active -= 1
+
+    async def _handle(self, item: Any, attempt: int) -> None:
+        try:
+            async with self.limiter.slot() as outcome:
+                result = await self.handler(item)
+                if isinstance(result, dict) and "Error" in result:
+                    outcome.mark_failed()
+        except HostOverloadedError as e:
+            if attempt < self.max_retries:
+                logger.warning(f"⚠️ {e}; retrying later (attempt {attempt + 1})")
+                RETRIES.inc(stage="scheduler", reason="overloaded")
+                self._pending_retries += 1
+                task = asyncio.create_task(self._requeue_later(item, attempt))
+                self._retry_tasks.add(task)
+                task.add_done_callback(self._retry_tasks.discard)
+            else:
+                logger.error(f"❌ Giving up after {attempt + 1} overloaded responses: {e}")
+            return
+        except Exception as e:
+            logger.error(f"Work item failed: {e}")
+            return
+        if self.on_result:
+            await self.on_result(item, result)
+
+    async def run(self, source: asyncio.Queue) -> None:
+        """
+        Consume `source` until it yields None, then wait for in-flight and
+        retried items to finish.
+        """
+        # Bounded, so a saturated limiter pushes backpressure up to the producer
+        self.queue = asyncio.Queue(maxsize=self.limiter.maximum)
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.limiter.maximum)]
+        try:
+            while True:
+                item = await source.get()
+                if item is None:
+                    break
+                await self.queue.put((item, 0))
+            while self._pending_retries or self._active or self.queue.qsize():
+                await asyncio.sleep(0.1)
+            await self.queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            pending = [*workers, *self._retry_tasks]
+            for task in pending:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
@@ -13,6 +13,12 @@ MYSQL_CONFIG = {
     "autocommit": True
 }
 
+DB_CONFIG = {
+    # Backend for the async scraping path: "aiomysql" (native async pool) or
+    # "thread" (blocking DatabaseManager run in worker threads)
+    "async_backend": os.getenv("DB_ASYNC_BACKEND", "aiomysql")
+}
+
 # Logging configuration
 LOGGING_CONFIG = {
      "version": 1,
@@ -24,31 +30,178 @@ LOGGING_CONFIG = {
         }
     },
     "handlers": {
-        "console": {
-            "class": "logging.StreamHandler",
-            "formatter": "unicode",
-            "stream": "ext://sys.stdout"
-        },
+        # Loggers only enqueue; a listener thread writes the rotating (gzip) file, stdout and the
+        # in-memory buffer the dashboard tails (log_stream.py). Of the processes sharing the file,
+        # only the holder of etimad_scraper.log.lock rotates it
         "file": {
-            "class": "logging.FileHandler",
-            "filename": "etimad_scraper.log",
+            "()": "log_stream.queued_handler",
             "formatter": "unicode",
-            "encoding": "utf-8"
+            "filename": "etimad_scraper.log",
+            "max_bytes": 10 * 1024 * 1024,
+            "backup_count": 5,
+            "console": True,
+            "buffer_size": 5000
         }
     },
     "loggers": {
         "etimad": {
-            "handlers": ["console", "file"],
+            "handlers": ["file"],
             "level": "DEBUG",
             "propagate": False
         }
     }
 }
 
+# Dashboard log view (app.py)
+LOG_STREAM_CONFIG = {
+    "display_lines": 500,             # Lines kept in each session's log box
+    "initial_tail_bytes": 64 * 1024,  # File tail shown when no in-process records exist yet
+    "follow_seconds": 900,            # Length of one streaming follow; the refresh button restarts it
+    "poll_interval": 1.0              # Seconds between checks for new records while following
+}
+
 # Scraper configuration
 SCRAPER_CONFIG = {
+    "base_url": os.getenv("ETIMAD_BASE_URL", "https://tenders.etimad.sa"),  # Overridden by the benchmark fixture site
     "max_retries": 3,
     "timeout": 60000,
-    "concurrent_requests": 5,
-    "batch_size": 20
-}
\ No newline at end of file
+    "max_result_pages": 200,            # Safety cap on search result pages per keyword
+    "card_queue_size": 100,             # Cards buffered between the page crawler and its consumers
+    "next_page_selector": "ul.pagination li.page-item:not(.disabled) a.page-link[aria-label='Next']",
+    "detail_fetch_mode": "http",        # "http" = plain HTTP fast path with browser fallback, "browser" = Playwright only
+    "http_max_connections": 20,
+    "detail_tab_urls": {                # Tab partials fetched when a section is not rendered inline (relative to the detail page)
+        "d-2": "/Tender/GetTenderDatesViewComponenet?tenderIdStr={tender_id}"
+    }
+}
+
+# Browser pool configuration
+BROWSER_POOL_CONFIG = {
+    "browsers": 2,                  # Chromium processes kept alive for the whole run
+    "contexts_per_browser": 3,      # Pages (one per context) served by each browser
+    "max_navigations": 50           # Recycle a context after this many uses
+}
+
+
+# Streaming pipeline configuration (orchestrator stages and the queues between them)
+PIPELINE_CONFIG = {
+    "metadata_concurrency": 3,      # Keyword searches running at once
+    "db_writers": 1,                # Concurrent persistence workers
+    "detail_queue_size": 50,        # Links waiting for a detail worker
+    "persist_queue_size": 50,       # Extracted tenders waiting for the DB writer
+    "db_batch_size": 100,           # Tenders per multi-row upsert transaction
+    "db_flush_interval": 2.0        # Seconds to wait for a batch to fill before flushing it
+}
+
+# Keyword -> classification index shared by the scraping stages
+KEYWORD_INDEX_CONFIG = {
+    "ttl": 900                      # Seconds before the taxonomy version is re-checked
+}
+
+# Lazily loaded classification taxonomy
+TAXONOMY_CONFIG = {
+    "cache_path": os.getenv("TAXONOMY_CACHE_PATH", "taxonomy_cache.json"),
+    "import_budget_ms": 500         # Target for `import orchestrator`, checked by benchmarks/bench_startup.py
+}
+
+# How tender links are discovered: "keywords" = one site search per taxonomy keyword,
+# "local" = a few broad searches whose cards are classified locally (classifier.py)
+DISCOVERY_CONFIG = {
+    "mode": os.getenv("DISCOVERY_MODE", "keywords"),
+    "broad_queries": [""],          # Search texts for the local mode; "" lists every active tender
+    "max_result_pages": 5000,       # Page cap per broad query (keyword searches use SCRAPER_CONFIG's)
+    "keep_unmatched": False         # Queue cards that match no keyword anyway (without a keyword id)
+}
+
+# Incremental scraping: only re-open detail pages that are new, changed or due
+INCREMENTAL_CONFIG = {
+    "enabled": True,
+    "refetch_after_hours": 168,     # Re-fetch unchanged tenders at least weekly
+    "deadline_window_hours": 72     # Always re-fetch when the submission deadline is this close
+}
+
+# Adaptive (AIMD) concurrency for detail extraction
+ADAPTIVE_CONCURRENCY_CONFIG = {
+    "initial_limit": 5,
+    "min_limit": 1,
+    "max_limit": 30,
+    "latency_target": 10.0,         # Seconds; slower completions stop the limit from growing
+    "decrease_factor": 0.5,         # Multiplicative cut on timeouts and HTTP 429/5xx
+    "cooldown": 5.0,                # Seconds between two consecutive cuts
+    "max_overload_retries": 3,      # Requeues per link after 429/5xx before giving up
+    "stats_interval": 30            # Seconds between limit/queue-depth log lines
+}
+
+# Lightweight page profile applied to every scraping browser/context
+SCRAPE_PROFILE_CONFIG = {
+    "headless": True,
+    "launch_args": ["--disable-gpu", "--disable-dev-shm-usage", "--disable-extensions",
+                    "--disable-background-networking", "--mute-audio"],
+    # Stylesheets stay allowed: tab visibility checks (#d-1/#d-2) depend on them
+    "blocked_resource_types": ["image", "font", "media"],
+    "blocked_url_patterns": ["google-analytics.com", "googletagmanager.com", "doubleclick.net",
+                             "facebook.net", "hotjar.com", "clarity.ms"],
+    "disable_animations": True,
+    "cache_static_assets": True,    # Serve repeated scripts/stylesheets from memory across contexts
+    "static_cache_max_entries": 500
+}
+
+# Event-driven readiness waits that replace fixed sleeps
+READINESS_CONFIG = {
+    # Path of the results XHR fired by #searchBtn / the pager (not the detail pages or tab partials)
+    "search_response_pattern": os.getenv("SEARCH_RESPONSE_PATTERN", "/Tender/AllSupplierTendersForVisitorAsync"),
+    "response_timeout_ms": 30000,
+    "settle_quiet_ms": 300,         # Card count unchanged this long = results rendered
+    "empty_quiet_ms": 2000,         # Longer quiet period before accepting zero results
+    "settle_timeout_ms": 60000,
+    "tab_timeout_ms": 5000,         # Longest wait for #d-2 to load and #d-1 to re-render after "عرض المزيد"
+    "poll_ms": 100
+}
+
+# Offline backfill from saved detail pages (backfill.py)
+BACKFILL_CONFIG = {
+    "workers": os.cpu_count() or 1,   # Parser processes
+    "chunk_size": 200,                # Pages handed to a worker at a time
+    "max_pending_chunks": 4,          # Per worker; bounds memory while the DB writer catches up
+    "db_batch_size": 500,
+    "detail_url": os.getenv("ETIMAD_BASE_URL", "https://tenders.etimad.sa") + "/Tender/DetailsForVisitor?STenderId={tender_id}"
+}
+
+# Raw page archive (archive.py): zstd blobs named by content hash + SQLite index
+ARCHIVE_CONFIG = {
+    "enabled": os.getenv("ARCHIVE_ENABLED", "false").lower() in ("1", "true", "yes"),
+    "root": os.getenv("ARCHIVE_DIR", "page_archive"),
+    "compression_level": 10
+}
+
+# Instrumentation (metrics.py): Prometheus text endpoint and optional OpenTelemetry spans
+METRICS_CONFIG = {
+    "enabled": os.getenv("METRICS_ENABLED", "false").lower() in ("1", "true", "yes"),
+    "port": int(os.getenv("METRICS_PORT", 9108)),
+    "sample_interval": 5,            # Seconds between queue-depth gauge updates
+    "otel_enabled": os.getenv("OTEL_ENABLED", "false").lower() in ("1", "true", "yes")
+}
+
+# Run journal (journal.py) used to resume interrupted pipeline runs
+JOURNAL_CONFIG = {
+    "path": os.getenv("RUN_JOURNAL_PATH", "run_journal.sqlite3"),
+    "keep_days": 7,                   # Successful runs older than this are pruned
+    "flush_events": 500,              # Per-link events committed together...
+    "flush_seconds": 2.0              # ...or after this long, whichever comes first
+}
+# Tender search (search.py): FULLTEXT index over tenders.search_text (normalized, stemmed name + purpose)
+SEARCH_CONFIG = {
+    # "ngram" needs MySQL 5.7.6+; set to "" for the built-in parser (e.g. MariaDB)
+    "fulltext_parser": os.getenv("SEARCH_FULLTEXT_PARSER", "ngram"),
+    "max_results": 50,
+    "reindex_batch_size": 1000
+}
+
+# Dashboard read cache (cache.py): invalidated by the pipeline's data version bumps, TTL as a backstop
+CACHE_CONFIG = {
+    "enabled": os.getenv("CACHE_ENABLED", "true").lower() in ("1", "true", "yes"),
+    "maxsize": 256,                   # Entries kept by the in-process LRU
+    "ttl": 60,                        # Seconds; covers writes that don't bump the version
+    "redis_url": os.getenv("CACHE_REDIS_URL", ""),  # e.g. redis://localhost:6379/0 to share across processes
+    "redis_prefix": "etimad:cache"
+}
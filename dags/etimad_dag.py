@@ -1,12 +1,16 @@
 from airflow import DAG
 from airflow.operators.python import PythonOperator
 from datetime import datetime, timedelta
-from orchestration import ScraperOrchestrator
+from orchestrator import ScraperOrchestrator
 
-def run_etimad_pipeline():
+def run_etimad_pipeline(ti=None, run_id=None):
     orchestrator = ScraperOrchestrator()
     import asyncio
-    asyncio.run(orchestrator.run_pipeline())
+    # The journal run is named after the DAG run, so a task retry continues exactly the run its
+    # first try started (never an older failed one) instead of re-scraping everything
+    journal_run_id = f"airflow-{run_id}" if run_id else None
+    resume = journal_run_id if journal_run_id and ti is not None and ti.try_number > 1 else None
+    asyncio.run(orchestrator.run_pipeline(resume_run_id=resume, run_id=journal_run_id))
 
 default_args = {
     'owner': 'etimad',
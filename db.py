@@ -1,52 +1,142 @@
 import mysql.connector
-from mysql.connector import pooling, Error
-from config import MYSQL_CONFIG, LOGGING_CONFIG
+from mysql.connector import pooling, Error, DataError, IntegrityError
+from config import MYSQL_CONFIG, LOGGING_CONFIG, SEARCH_CONFIG
+from parsing import parse_arabic_datetime, parse_decimal
+from arabic import search_document
+from metrics import DB_WRITE_SECONDS, DB_ROWS
 import logging
 import logging.config
-import re
+import threading
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, Iterable, List, Tuple
 
 
 logging.config.dictConfig(LOGGING_CONFIG)
 logger = logging.getLogger("etimad.db")
 
-def parse_arabic_datetime(value: str) -> datetime:
+TENDER_KEY_MAPPING = {
+    "رقم_المنافسة": "tender_number",
+    "اسم_المنافسة": "tender_name",
+    "الرقم_المرجعي": "reference_number",
+    "الغرض_من_المنافسة": "purpose",
+    "قيمة_وثائق_المنافسة": "document_value",
+    "حالة_المنافسة": "status",
+    "مدة_العقد": "contract_duration",
+    "هل_التأمين_من_متطلبات_المنافسة": "insurance_required",
+    "نوع_المنافسة": "tender_type",
+    "الجهة_الحكوميه": "government_entity",
+    "آخر_موعد_لإستلام_الإستفسارات": "last_query_date",
+    "آخر_موعد_لتقديم_العروض": "last_submission_date",
+    "تاريخ_فتح_العروض": "opening_date",
+    "تاريخ_فحص_العروض": "evaluation_date",
+    "فترة_التوقف": "suspension_period",
+    "التاريخ_المتوقع_للترسية": "expected_award_date",
+    "تاريخ_بدء_الأعمال_/_الخدمات": "start_date",
+    "بداية_إرسال_الأسئلة_و_الاستفسارات": "question_start_date",
+    "اقصى_مدة_للاجابة_على_الاستفسارات": "max_query_response_time",
+    "مكان_فتح_العرض": "opening_location",
+    "Link": "link",
+    "CardFingerprint": "card_fingerprint",
+    "DetailFetchedAt": "last_detail_fetch_at"
+}
+
+TENDER_DATE_FIELDS = ["last_query_date", "last_submission_date", "opening_date",
+                      "evaluation_date", "expected_award_date", "start_date", "question_start_date"]
+
+# Set on first insert only; later scrapes must not reset what users edited
+TENDER_INSERT_ONLY_COLUMNS = {"tender_number", "status_company", "attachment", "created_at"}
+
+# Accumulated on update instead of overwritten
+TENDER_COUNTER_COLUMNS = {"detail_fetch_count"}
+
+# NOT NULL columns without a default; a row missing one would fail the whole multi-row INSERT
+TENDER_REQUIRED_COLUMNS = ("tender_number", "link", "tender_name", "status", "government_entity")
+
+# (table, index, columns) for the dashboard filters in queries.py; each pairs a filter column with
+# the id used as keyset tiebreaker
+QUERY_INDEXES = [
+    ("tenders", "idx_tenders_entity_id", "(government_entity, id)"),
+    ("tenders", "idx_tenders_status_id", "(status, id)"),
+    ("tenders", "idx_tenders_deadline_id", "(last_submission_date, id)"),
+    ("scraping_logs", "idx_scraping_logs_status_id", "(status, id)"),
+]
+
+def map_tender(tender: Dict) -> Dict:
+    """Convert a normalized (underscore-keyed) tender dict into a typed `tenders` row."""
+    mapped_tender = {}
+    for arabic_key, english_key in TENDER_KEY_MAPPING.items():
+        if arabic_key in tender:
+            mapped_tender[english_key] = tender[arabic_key]
+
+    mapped_tender.setdefault("attachment", None)
+    mapped_tender.setdefault("status_company", "Under Evaluation")
+    mapped_tender.setdefault("created_at", datetime.now())
+
+    # Values may already be typed when they came through parsing.extract_fields(typed=True)
+    if "document_value" in mapped_tender:
+        mapped_tender["document_value"] = parse_decimal(mapped_tender["document_value"]) or 0.0
+
+    for field in TENDER_DATE_FIELDS:
+        if isinstance(mapped_tender.get(field), str):
+            mapped_tender[field] = parse_arabic_datetime(mapped_tender[field])
+
+    if mapped_tender.get("last_detail_fetch_at"):
+        mapped_tender["last_seen_at"] = mapped_tender["last_detail_fetch_at"]
+        mapped_tender["detail_fetch_count"] = 1
+
+    # Detail rows always carry both fields; card-only updates never reach this mapping
+    if "tender_name" in mapped_tender or "purpose" in mapped_tender:
+        mapped_tender["search_text"] = search_document(mapped_tender.get("tender_name"), mapped_tender.get("purpose"))
+
+    # Get keyword_id from SubCategory if available
+    if "keyword_ids" in tender:
+        mapped_tender["keyword_id"] = tender["keyword_ids"][0]
+
+    return mapped_tender
+
+def build_upsert_statement(columns: Tuple[str, ...], row_count: int) -> str:
+    """Multi-row INSERT ... ON DUPLICATE KEY UPDATE for `row_count` rows sharing `columns`."""
+    placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    column_list = ", ".join(f"`{k}`" for k in columns)
+    update_clause = ", ".join(
+        f"`{k}`=`{k}`+VALUES(`{k}`)" if k in TENDER_COUNTER_COLUMNS else f"`{k}`=VALUES(`{k}`)"
+        for k in columns if k not in TENDER_INSERT_ONLY_COLUMNS
+    )
+    return f"""
+        INSERT INTO tenders ({column_list})
+        VALUES {", ".join([placeholders] * row_count)}
+        ON DUPLICATE KEY UPDATE {update_clause}
     """
-    Extract Gregorian date and time (if exists) from Arabic Etimad string,
-    convert to datetime object. Ignores Hijri date. Returns None for invalid or 'لا يوجد'.
-    """
-    if not value or not isinstance(value, str) or value.strip() == "لا يوجد":
-        return None
-
-    match = re.search(r'(\d{2}/\d{2}/\d{4})(?:\s+(\d{1,2}:\d{2}\s*(?:AM|PM)?))?', value)
-    if not match:
-        return None
-
-    date_part = match.group(1)
-    time_part = match.group(2) or "00:00"
-
-    try:
-        if "AM" in time_part or "PM" in time_part:
-            dt = datetime.strptime(f"{date_part} {time_part}", "%d/%m/%Y %I:%M %p")
-        else:
-            dt = datetime.strptime(f"{date_part} {time_part}", "%d/%m/%Y %H:%M")
-        return dt
-    except ValueError:
-        return None
-    
-def parse_decimal(value: str) -> float:
-    """
-    Convert a string to a DECIMAL-compatible float. Handles 'مجانا' as 0.0.
-    Returns None for invalid values.
+
+def missing_required_columns(row: Dict) -> List[str]:
+    return [column for column in TENDER_REQUIRED_COLUMNS if not row.get(column)]
+
+def split_batch(rows: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """Halves of a failed batch, retried separately until the offending rows are isolated."""
+    middle = len(rows) // 2
+    return rows[:middle], rows[middle:]
+
+def group_rows_by_columns(rows: List[Dict]) -> Dict[Tuple[str, ...], List[Dict]]:
+    groups: Dict[Tuple[str, ...], List[Dict]] = {}
+    for row in rows:
+        groups.setdefault(tuple(row.keys()), []).append(row)
+    return groups
+
+def build_tender_keywords_statement(pair_count: int) -> str:
+    """Multi-row INSERT IGNORE of (link, keyword_id) pairs, resolving links to tender ids in the same statement."""
+    values = " UNION ALL ".join(["SELECT %s AS link, %s AS keyword_id"] * pair_count)
+    return f"""
+        INSERT IGNORE INTO tender_keywords (tender_id, keyword_id)
+        SELECT t.id, v.keyword_id
+        FROM ({values}) AS v
+        JOIN tenders AS t ON t.link = v.link
     """
-    if not value or not isinstance(value, str) or value.strip() == "مجانا":
-        return 0.0
-    try:
-        cleaned_value = re.sub(r'[^\d.]', '', value)
-        return float(cleaned_value)
-    except (ValueError, TypeError):
-        return None
+
+LOG_SCRAPING_SQL = """
+    INSERT INTO scraping_logs
+    (key_word_id, classification_id, tender_count, page_count, fetched_count, skipped_count, status, error_message)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
 
 class DatabaseManager:
     _instance = None
@@ -54,7 +144,9 @@ class DatabaseManager:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            cls._instance._init_pool()
+            # The pool is opened on first use, so importing this module stays free of DB I/O
+            cls._instance.connection_pool = None
+            cls._instance._pool_lock = threading.Lock()
         return cls._instance
 
     def _init_pool(self):
@@ -71,6 +163,10 @@ class DatabaseManager:
             raise
 
     def get_connection(self):
+        if self.connection_pool is None:
+            with self._pool_lock:
+                if self.connection_pool is None:
+                    self._init_pool()
         try:
             return self.connection_pool.get_connection()
         except Error as e:
@@ -136,7 +232,14 @@ class DatabaseManager:
                     opening_location TEXT,
                     attachment VARCHAR(255) DEFAULT NULL,
                     keyword_id INT NULL,
+                    card_fingerprint CHAR(40),
+                    last_seen_at DATETIME,
+                    last_detail_fetch_at DATETIME,
+                    detail_fetch_count INT NOT NULL DEFAULT 0,
+                    detail_skip_count INT NOT NULL DEFAULT 0,
+                    search_text TEXT,
                     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    INDEX idx_tenders_link (link),
                     FOREIGN KEY (keyword_id) REFERENCES etimad_classification_keywords(id) ON DELETE SET NULL
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
             """)
@@ -148,6 +251,9 @@ class DatabaseManager:
                     key_word_id INT,
                     classification_id INT,
                     tender_count INT NOT NULL,
+                    page_count INT,
+                    fetched_count INT,
+                    skipped_count INT,
                     status VARCHAR(50) NOT NULL,
                     error_message TEXT,
                     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
@@ -156,8 +262,35 @@ class DatabaseManager:
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
             """)
 
-            # Drop the old tender_keywords table if it exists
-            cursor.execute("DROP TABLE IF EXISTS tender_keywords")
+            # Columns added after the first release, for databases created earlier
+            self._ensure_column(cursor, "scraping_logs", "page_count", "INT AFTER tender_count")
+            self._ensure_column(cursor, "scraping_logs", "fetched_count", "INT AFTER page_count")
+            self._ensure_column(cursor, "scraping_logs", "skipped_count", "INT AFTER fetched_count")
+            self._ensure_column(cursor, "tenders", "card_fingerprint", "CHAR(40) AFTER keyword_id")
+            self._ensure_column(cursor, "tenders", "last_seen_at", "DATETIME AFTER card_fingerprint")
+            self._ensure_column(cursor, "tenders", "last_detail_fetch_at", "DATETIME AFTER last_seen_at")
+            self._ensure_column(cursor, "tenders", "detail_fetch_count", "INT NOT NULL DEFAULT 0 AFTER last_detail_fetch_at")
+            self._ensure_column(cursor, "tenders", "detail_skip_count", "INT NOT NULL DEFAULT 0 AFTER detail_fetch_count")
+            self._ensure_index(cursor, "tenders", "idx_tenders_link", "(link)")
+            self._ensure_column(cursor, "tenders", "search_text", "TEXT AFTER detail_skip_count")
+            for table, index, columns in QUERY_INDEXES:
+                self._ensure_index(cursor, table, index, columns)
+            parser = SEARCH_CONFIG["fulltext_parser"]
+            self._ensure_index(cursor, "tenders", "ftx_tenders_search",
+                               f"(search_text) WITH PARSER {parser}" if parser else "(search_text)", kind="FULLTEXT")
+
+            # Create tender_keywords table (every keyword a tender was found under)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS tender_keywords (
+                    tender_id INT NOT NULL,
+                    keyword_id INT NOT NULL,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (tender_id, keyword_id),
+                    INDEX idx_tender_keywords_keyword (keyword_id),
+                    FOREIGN KEY (tender_id) REFERENCES tenders(id) ON DELETE CASCADE,
+                    FOREIGN KEY (keyword_id) REFERENCES etimad_classification_keywords(id) ON DELETE CASCADE
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            """)
 
             conn.commit()
             logger.info("Database tables initialized with new schema")
@@ -170,6 +303,25 @@ class DatabaseManager:
             if conn:
                 conn.close()
 
+    def _ensure_column(self, cursor, table, column, definition):
+        """Add a column to an existing table if it is missing (CREATE TABLE IF NOT EXISTS won't)."""
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """, (table, column))
+        if cursor.fetchone()[0] == 0:
+            cursor.execute(f"ALTER TABLE `{table}` ADD COLUMN `{column}` {definition}")
+            logger.info(f"Added column {table}.{column}")
+
+    def _ensure_index(self, cursor, table, index, columns, kind=""):
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        """, (table, index))
+        if cursor.fetchone()[0] == 0:
+            cursor.execute(f"CREATE {kind} INDEX `{index}` ON `{table}` {columns}")
+            logger.info(f"Added index {table}.{index}")
+
     def execute_query(self, query, params=None):
         """Execute a single SQL query (INSERT/UPDATE/DELETE)"""
         conn = None
@@ -221,89 +373,91 @@ class DatabaseManager:
             if conn:
                 conn.close()
 
+    def bulk_upsert_tenders(self, tenders: Iterable[Dict], batch_size: int = 500) -> int:
+        """
+        Upsert tenders with multi-row INSERT ... ON DUPLICATE KEY UPDATE
+        statements, one transaction per batch. Rows are grouped by their column
+        set so partially filled tenders never overwrite columns they don't carry.
+        Returns the number of tenders written.
+        """
+        return self.bulk_write_rows((map_tender(tender) for tender in tenders), batch_size)
+
+    def bulk_write_rows(self, rows: Iterable[Dict], batch_size: int = 500) -> int:
+        """bulk_upsert_tenders for rows already converted by map_tender (e.g. in backfill workers)."""
+        written = 0
+        batch = []
+        for row in rows:
+            missing = missing_required_columns(row)
+            if missing:
+                logger.warning(f"Skipping tender without {', '.join(missing)}: {row.get('link', 'Unknown')}")
+                continue
+            batch.append(row)
+            if len(batch) >= batch_size:
+                written += self._write_tender_batch(batch)
+                batch = []
+        if batch:
+            written += self._write_tender_batch(batch)
+        return written
+
+    def _write_tender_batch(self, rows: List[Dict]) -> int:
+        """
+        Upsert one batch in a single transaction. If the database rejects a
+        row's data, the halves are retried separately, so one bad row costs
+        only itself; any other error (connection, schema, SQL) is raised.
+        """
+        try:
+            return self._upsert_batch(rows)
+        except (DataError, IntegrityError) as e:
+            if len(rows) == 1:
+                logger.error(f"Rejected tender {rows[0].get('tender_number')} ({rows[0].get('link')}): {e}")
+                return 0
+            logger.warning(f"Batch of {len(rows)} tenders failed, retrying in halves: {e}")
+            return sum(self._write_tender_batch(half) for half in split_batch(rows))
+
+    def _upsert_batch(self, rows: List[Dict]) -> int:
+        groups = group_rows_by_columns(rows)
+
+        conn = None
+        try:
+            conn = self.get_connection()
+            with DB_WRITE_SECONDS.time(backend="mysql-connector"):
+                conn.start_transaction()
+                cursor = conn.cursor()
+                for columns, group in groups.items():
+                    values = [row[k] for row in group for k in columns]
+                    cursor.execute(build_upsert_statement(columns, len(group)), values)
+                conn.commit()
+            DB_ROWS.inc(len(rows), backend="mysql-connector")
+            logger.debug(f"Upserted batch of {len(rows)} tenders")
+            return len(rows)
+        except Error:
+            if conn:
+                conn.rollback()
+            raise
+        finally:
+            if conn:
+                conn.close()
+
     def upsert_tender(self, tender):
+        self.bulk_upsert_tenders([tender])
+
+    def bulk_link_tender_keywords(self, pairs: List[Tuple[str, int]], batch_size: int = 500) -> int:
+        """Persist (link, keyword_id) pairs into tender_keywords, one transaction for all batches."""
+        if not pairs:
+            return 0
         conn = None
         try:
             conn = self.get_connection()
+            conn.start_transaction()
             cursor = conn.cursor()
-
-            key_mapping = {
-                "رقم_المنافسة": "tender_number",
-                "اسم_المنافسة": "tender_name",
-                "الرقم_المرجعي": "reference_number",
-                "الغرض_من_المنافسة": "purpose",
-                "قيمة_وثائق_المنافسة": "document_value",
-                "حالة_المنافسة": "status",
-                "مدة_العقد": "contract_duration",
-                "هل_التأمين_من_متطلبات_المنافسة": "insurance_required",
-                "نوع_المنافسة": "tender_type",
-                "الجهة_الحكوميه": "government_entity",
-                "آخر_موعد_لإستلام_الإستفسارات": "last_query_date",
-                "آخر_موعد_لتقديم_العروض": "last_submission_date",
-                "تاريخ_فتح_العروض": "opening_date",
-                "تاريخ_فحص_العروض": "evaluation_date",
-                "فترة_التوقف": "suspension_period",
-                "التاريخ_المتوقع_للترسية": "expected_award_date",
-                "تاريخ_بدء_الأعمال_/_الخدمات": "start_date",
-                "بداية_إرسال_الأسئلة_و_الاستفسارات": "question_start_date",
-                "اقصى_مدة_للاجابة_على_الاستفسارات": "max_query_response_time",
-                "مكان_فتح_العرض": "opening_location",
-                "Link": "link"
-            }
-
-            mapped_tender = {}
-            for arabic_key, english_key in key_mapping.items():
-                if arabic_key in tender:
-                    value = tender[arabic_key]
-                    mapped_tender[english_key] = value
-                    
-            mapped_tender.setdefault("attachment", None)
-            mapped_tender.setdefault("status_company", "Under Evaluation")
-            mapped_tender.setdefault("created_at", datetime.now())
-            
-            if "document_value" in mapped_tender:
-                if mapped_tender["document_value"] == "مجانا":
-                    mapped_tender["document_value"] = 0.0
-                elif isinstance(mapped_tender["document_value"], str):
-                    try:
-                        mapped_tender["document_value"] = float(mapped_tender["document_value"])
-                    except ValueError:
-                        mapped_tender["document_value"] = 0.0
-            
-            date_fields = ["last_query_date", "last_submission_date", "opening_date", 
-                        "evaluation_date", "expected_award_date", "start_date", "question_start_date"]
-            for field in date_fields:
-                if field in mapped_tender:
-                    if mapped_tender[field] == "لا يوجد":
-                        mapped_tender[field] = None
-                    else:
-                        mapped_tender[field] = parse_arabic_datetime(mapped_tender[field])
-
-            # Get keyword_id from SubCategory if available
-            if "keyword_ids" in tender:
-                mapped_tender["keyword_id"] = tender["keyword_ids"][0]
-
-
-            keys = mapped_tender.keys() 
-            values = [mapped_tender[k] for k in keys]
-
-            cursor.execute("DELETE FROM tenders WHERE tender_number = %s", (mapped_tender["tender_number"],))
-
-            placeholders = ", ".join(["%s"] * len(keys))
-            columns = ", ".join(f"`{k}`" for k in keys)
-            update_clause = ", ".join([f"`{k}`=VALUES(`{k}`)" for k in keys if k != "tender_number"])
-
-            sql = f"""
-                INSERT INTO tenders ({columns})
-                VALUES ({placeholders})
-                ON DUPLICATE KEY UPDATE {update_clause}
-            """
-            
-            cursor.execute(sql, values)
+            for i in range(0, len(pairs), batch_size):
+                chunk = pairs[i:i + batch_size]
+                cursor.execute(build_tender_keywords_statement(len(chunk)),
+                               [value for pair in chunk for value in pair])
             conn.commit()
-            logger.debug(f"Upserted tender: {mapped_tender.get('tender_number', 'Unknown')}")
+            return len(pairs)
         except Error as e:
-            logger.error(f"Error upserting tender: {e}")
+            logger.error(f"Error linking tender keywords: {e}")
             if conn:
                 conn.rollback()
             raise
@@ -311,19 +465,15 @@ class DatabaseManager:
             if conn:
                 conn.close()
 
-
-    def log_scraping(self, key_word_id=None, classification_id=None, count=0, status="unknown", error=None, note=None):
+    def log_scraping(self, key_word_id=None, classification_id=None, count=0, status="unknown", error=None, note=None,
+                     page_count=None, fetched_count=None, skipped_count=None):
         conn = None
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
 
-            sql = """
-                INSERT INTO scraping_logs 
-                (key_word_id, classification_id, tender_count, status, error_message)
-                VALUES (%s, %s, %s, %s, %s)
-            """
-            cursor.execute(sql, (key_word_id, classification_id, count, status, error or note))
+            cursor.execute(LOG_SCRAPING_SQL, (key_word_id, classification_id, count, page_count,
+                                              fetched_count, skipped_count, status, error or note))
             conn.commit()
         except Error as e:
             logger.error(f"Error logging scraping: {e}")
@@ -333,6 +483,5 @@ class DatabaseManager:
             if conn:
                 conn.close()
 
-# Singleton instance
-db_manager = DatabaseManager()
-db_manager.initialize_table()
\ No newline at end of file
+# Singleton instance (tables are created by the entry points via initialize_table)
+db_manager = DatabaseManager()
\ No newline at end of file
@@ -49,19 +49,45 @@ CREATE TABLE IF NOT EXISTS tenders (
     opening_location TEXT,
     attachment VARCHAR(255) DEFAULT NULL,
     keyword_id INT NULL,
+    card_fingerprint CHAR(40),
+    last_seen_at DATETIME,
+    last_detail_fetch_at DATETIME,
+    detail_fetch_count INT NOT NULL DEFAULT 0,
+    detail_skip_count INT NOT NULL DEFAULT 0,
+    search_text TEXT,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_tenders_link (link),
+    INDEX idx_tenders_entity_id (government_entity, id),
+    INDEX idx_tenders_status_id (status, id),
+    INDEX idx_tenders_deadline_id (last_submission_date, id),
+    FULLTEXT INDEX ftx_tenders_search (search_text) WITH PARSER ngram,
     FOREIGN KEY (keyword_id) REFERENCES etimad_classification_keywords(id) ON DELETE SET NULL
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- Tender <-> Keyword (every keyword a tender was found under)
+CREATE TABLE IF NOT EXISTS tender_keywords (
+    tender_id INT NOT NULL,
+    keyword_id INT NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (tender_id, keyword_id),
+    INDEX idx_tender_keywords_keyword (keyword_id),
+    FOREIGN KEY (tender_id) REFERENCES tenders(id) ON DELETE CASCADE,
+    FOREIGN KEY (keyword_id) REFERENCES etimad_classification_keywords(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 -- Scraping Logs Table
 CREATE TABLE IF NOT EXISTS scraping_logs (
     id INT AUTO_INCREMENT PRIMARY KEY,
     key_word_id INT,
     classification_id INT,
     tender_count INT NOT NULL,
+    page_count INT,
+    fetched_count INT,
+    skipped_count INT,
     status VARCHAR(50) NOT NULL,
     error_message TEXT,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_scraping_logs_status_id (status, id),
     FOREIGN KEY (key_word_id) REFERENCES etimad_classification_keywords(id) ON DELETE SET NULL,
     FOREIGN KEY (classification_id) REFERENCES etimad_classifications(id) ON DELETE SET NULL
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
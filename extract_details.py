@@ -1,41 +1,83 @@
 import json
 import asyncio
+from datetime import datetime
 import logging
 import logging.config
 from typing import List, Dict
-from playwright.async_api import async_playwright, Page, TimeoutError as PlaywrightTimeoutError
-from config import SCRAPER_CONFIG, LOGGING_CONFIG
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+from config import SCRAPER_CONFIG, LOGGING_CONFIG, READINESS_CONFIG
+from browser_pool import BrowserPool, get_browser_pool, pool_or_shared
+from parsing import parse_sections, is_valid_tender
+from http_details import create_http_client, fetch_sections_http, tender_id_from_link
+from archive import get_page_archive, KIND_DETAIL
+from readiness import step_latency
+from metrics import PARSE_SECONDS, RETRIES, TENDERS, tender_span
+from utils import log_execution_time
+from concurrency import AdaptiveLimiter, HostOverloadedError, OVERLOAD_STATUSES, WorkQueueScheduler
 
 # Configure logging
 logging.config.dictConfig(LOGGING_CONFIG)
 logger = logging.getLogger("etimad.details")
 
-SECTION_1_FIELDS = [
-    "اسم المنافسة", "رقم المنافسة", "الرقم المرجعي", "الغرض من المنافسة",
-    "قيمة وثائق المنافسة", "حالة المنافسة", "مدة العقد",
-    "هل التأمين من متطلبات المنافسة", "نوع المنافسة", "الجهة الحكوميه"
-]
-
-SECTION_2_FIELDS = [
-    "آخر موعد لإستلام الإستفسارات", "آخر موعد لتقديم العروض", "تاريخ فتح العروض",
-    "تاريخ فحص العروض", "فترة التوقف", "التاريخ المتوقع للترسية",
-    "تاريخ بدء الأعمال / الخدمات", "بداية إرسال الأسئلة و الاستفسارات",
-    "اقصى مدة للاجابة على الاستفسارات", "مكان فتح العرض"
-]
-
-def extract_fields(raw_text: str, keys: List[str]) -> Dict[str, str]:
-    lines = raw_text.strip().splitlines()
-    result = {}
-    i = 0
-    while i < len(lines):
-        key = lines[i].strip()
-        if key in keys and i + 1 < len(lines):
-            value = lines[i + 1].strip()
-            result[key] = value
-            i += 2
-        else:
-            i += 1
-    return result
+SECTION_2_READY_TEXT = "آخر موعد"
+
+# Clicks both tab links up front so the lazily loaded #d-2 starts loading while
+# #d-1 is expanded, then polls in-page until #d-2 shows `readyText` and the
+# expanded #d-1 has re-rendered (one `timeoutMs` deadline for both), and reads
+# both panes' rendered text (hidden panes are shown briefly so innerText keeps
+# line breaks).
+READ_SECTIONS_SCRIPT = """
+async ([timeoutMs, pollMs, readyText]) => {
+    const tab = (id) => document.querySelector(`a[href='#${id}']`);
+    if (tab('d-2')) tab('d-2').click();
+    if (tab('d-1')) tab('d-1').click();
+
+    const pane1 = document.getElementById('d-1');
+    const showMore = pane1 && Array.from(pane1.querySelectorAll('a, button, span'))
+        .find((el) => el.textContent.trim() === 'عرض المزيد');
+    const collapsed = pane1 ? pane1.innerText : '';
+    if (showMore) showMore.click();
+
+    const deadline = performance.now() + timeoutMs;
+    const expanded = () => !showMore || document.getElementById('d-1').innerText !== collapsed;
+    const ready = () => {
+        const pane2 = document.getElementById('d-2');
+        return expanded() && pane2 && pane2.textContent.includes(readyText);
+    };
+    while (!ready() && performance.now() < deadline) {
+        await new Promise((resolve) => setTimeout(resolve, pollMs));
+    }
+
+    const read = (id) => {
+        const el = document.getElementById(id);
+        if (!el) return '';
+        const display = el.style.display;
+        el.style.display = 'block';
+        const text = el.innerText;
+        el.style.display = display;
+        return text;
+    };
+    return {'d-1': read('d-1'), 'd-2': read('d-2')};
+}
+"""
+
+async def extract_single_tender_http(client, link: str) -> Dict[str, str]:
+    """HTTP fast path; returns None when the page does not validate so the browser can take over."""
+    async with step_latency.timed("detail.http"):
+        sections = await fetch_sections_http(client, link)
+    if not sections:
+        return None
+
+    tender = {"Link": link}
+    with PARSE_SECONDS.time(path="http"):
+        tender.update(parse_sections(sections))
+    if not is_valid_tender(tender):
+        logger.debug(f"HTTP result for {link} failed validation, falling back to browser")
+        return None
+
+    tender["Raw"] = json.dumps(tender, ensure_ascii=False)
+    logger.debug(f"⚡ Extracted over HTTP: {tender.get('رقم المنافسة', 'Unknown')}")
+    return tender
 
 async def extract_single_tender(page: Page, link: str) -> Dict[str, str]:
     tender = {"Link": link}
@@ -43,34 +85,36 @@ async def extract_single_tender(page: Page, link: str) -> Dict[str, str]:
     for attempt in range(SCRAPER_CONFIG["max_retries"]):
         try:
             logger.debug(f"🌐 Attempt {attempt + 1} - Loading: {link}")
-            await page.goto(link, timeout=SCRAPER_CONFIG["timeout"])
+            async with step_latency.timed("detail.navigate"):
+                response = await page.goto(link, timeout=SCRAPER_CONFIG["timeout"])
+            if response and response.status in OVERLOAD_STATUSES:
+                raise HostOverloadedError(response.status, link)
             break
         except PlaywrightTimeoutError:
             logger.warning(f"⚠️ Timeout loading {link}, retrying...")
+            RETRIES.inc(stage="detail", reason="timeout")
             if attempt == SCRAPER_CONFIG["max_retries"] - 1:
                 logger.error(f"❌ Failed after {SCRAPER_CONFIG['max_retries']} attempts: {link}")
-                return {"Link": link, "Error": "Timeout after retries"}
+                raise HostOverloadedError(None, link)
         await asyncio.sleep(2 ** attempt)
 
     try:
-        await page.click("a[href='#d-1']")
-        await page.wait_for_selector("#d-1", state="visible")
-        try:
-            show_more = await page.query_selector("#d-1 >> text=عرض المزيد")
-            if show_more:
-                await show_more.click()
-                await page.wait_for_timeout(500)
-        except:
-            pass
-
-        raw1 = await page.inner_text("#d-1")
-        tender.update(extract_fields(raw1, SECTION_1_FIELDS))
-
-        await page.click("a[href='#d-2']")
-        await page.wait_for_timeout(1000)
-        await page.wait_for_selector("#d-2 >> text=آخر موعد", timeout=5000)
-        raw2 = await page.inner_text("#d-2")
-        tender.update(extract_fields(raw2, SECTION_2_FIELDS))
+        # Both tabs are triggered and read inside the page: one CDP round trip per tender
+        async with step_latency.timed("detail.sections"):
+            sections = await page.evaluate(
+                READ_SECTIONS_SCRIPT,
+                [READINESS_CONFIG["tab_timeout_ms"], READINESS_CONFIG["poll_ms"], SECTION_2_READY_TEXT]
+            )
+        if SECTION_2_READY_TEXT not in sections["d-2"]:
+            raise PlaywrightTimeoutError(f"#d-2 did not show '{SECTION_2_READY_TEXT}' in time")
+        with PARSE_SECONDS.time(path="browser"):
+            tender.update(parse_sections(sections))
+
+        archive = get_page_archive()
+        tender_id = tender_id_from_link(link)
+        if archive and tender_id:
+            # Snapshot after the tabs were populated, so #d-2 is part of the page
+            await archive.aput(KIND_DETAIL, tender_id, link, await page.content())
 
         tender["Raw"] = json.dumps(tender, ensure_ascii=False)
         logger.debug(f"✅ Extracted: {tender.get('رقم المنافسة', 'Unknown')}")
@@ -82,33 +126,54 @@ async def extract_single_tender(page: Page, link: str) -> Dict[str, str]:
         tender["Error"] = str(e)
         return tender
 
-async def extract_all_details(links_with_ids: List[Dict[str, str]]) -> List[Dict[str, str]]:
-    semaphore = asyncio.Semaphore(SCRAPER_CONFIG["concurrent_requests"])
+async def extract_tender(item: Dict[str, str], pool: BrowserPool = None, http_client=None) -> Dict[str, str]:
+    """
+    Extract one tender from a metadata record: HTTP fast path when a client is
+    given, falling back to a pooled browser page.
+    """
+    link = item["Link"]
+    keyword_ids = item.get("KeyWordIDs") or ([item["KeyWordID"]] if item.get("KeyWordID") else [])
+
+    with tender_span(link):
+        path = "http"
+        result = await extract_single_tender_http(http_client, link) if http_client else None
+        if result is None:
+            path = "browser"
+            pool = pool or await get_browser_pool()
+            async with pool.page() as page:
+                result = await extract_single_tender(page, link)
+    TENDERS.inc(path=path, outcome="ok" if result and "Error" not in result else "error")
+    if result and keyword_ids:
+        result["keyword_ids"] = keyword_ids
+    if result and "Error" not in result:
+        # Only a complete extraction may mark the card as up to date
+        result["CardFingerprint"] = item.get("Fingerprint")
+        result["DetailFetchedAt"] = datetime.now()
+    return result
+
+@log_execution_time
+async def extract_all_details(links_with_ids: List[Dict[str, str]], pool: BrowserPool = None,
+                              limiter: AdaptiveLimiter = None) -> List[Dict[str, str]]:
     detailed_results = []
+    use_http = SCRAPER_CONFIG["detail_fetch_mode"] == "http"
+    http_client = create_http_client() if use_http else None
+
+    async def collect(item: Dict[str, str], result: Dict[str, str]):
+        if result:
+            detailed_results.append(result)
 
-    async def process_link(item: Dict[str, str]):
-        link = item["Link"]
-        keyword_id = item.get("KeyWordID")
-
-        async with semaphore:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=False, timeout=SCRAPER_CONFIG["timeout"])
-                context = await browser.new_context()
-                page = await context.new_page()
-                try:
-                    result = await extract_single_tender(page, link)
-                    if result:
-                        if keyword_id:
-                            result["keyword_ids"] = [keyword_id]
-                        detailed_results.append(result)
-                finally:
-                    await context.close()
-                    await browser.close()
-
-    total_batches = (len(links_with_ids) + SCRAPER_CONFIG["batch_size"] - 1) // SCRAPER_CONFIG["batch_size"]
-    for i in range(0, len(links_with_ids), SCRAPER_CONFIG["batch_size"]):
-        batch = links_with_ids[i:i + SCRAPER_CONFIG["batch_size"]]
-        logger.info(f"🚀 Processing batch {i // SCRAPER_CONFIG['batch_size'] + 1} of {total_batches}")
-        await asyncio.gather(*[process_link(item) for item in batch])
+    source: asyncio.Queue = asyncio.Queue()
+    for item in links_with_ids:
+        source.put_nowait(item)
+    source.put_nowait(None)
+
+    try:
+        async with pool_or_shared(pool) as pool:
+            scheduler = WorkQueueScheduler(lambda item: extract_tender(item, pool, http_client), limiter, collect)
+            logger.info(f"🚀 Extracting {len(links_with_ids)} tenders (starting concurrency {scheduler.current_limit})")
+            await scheduler.run(source)
+    finally:
+        if http_client:
+            await http_client.aclose()
 
     return detailed_results
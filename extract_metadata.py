@@ -1,12 +1,20 @@
-from playwright.async_api import async_playwright
-from config import SCRAPER_CONFIG, LOGGING_CONFIG
-from db import db_manager
+from config import SCRAPER_CONFIG, LOGGING_CONFIG, READINESS_CONFIG, DISCOVERY_CONFIG
+from async_db import get_async_db
+from keyword_index import keyword_index
 import logging
 import logging.config
 import asyncio
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 import sys
-from utils import generate_main_to_sub_mapping
+from taxonomy import taxonomy
+from incremental import card_fingerprint
+from classifier import KeywordClassifier
+from link_registry import LinkRegistry
+from archive import get_page_archive, KIND_SEARCH
+from metrics import RETRIES
+from utils import log_execution_time
+from readiness import step_latency, click_and_wait_for_response, wait_for_count_settled
+from browser_pool import BrowserPool, get_browser_pool, pool_or_shared
 
 # Fix Windows console encoding for Arabic logs
 sys.stdout.reconfigure(encoding='utf-8', errors='replace')
@@ -15,138 +23,277 @@ sys.stderr.reconfigure(encoding='utf-8', errors='replace')
 logging.config.dictConfig(LOGGING_CONFIG)
 logger = logging.getLogger("etimad.metadata")
 
-MAIN_TO_SUB = generate_main_to_sub_mapping()
+SEARCH_PATH = "/Tender/AllTendersForVisitor"
 
-def get_classification_id(sub_category: str) -> int:
-    """Retrieve classification_id for a sub_category from etimad_classifications."""
+async def get_classification_id(sub_category: str) -> Tuple[Optional[int], Optional[int]]:
+    """Resolve (key_word_id, classification_id) for a sub_category from the shared keyword index."""
     try:
-        query = """
-            SELECT id AS key_word_id, classification_id FROM etimad_classification_keywords 
-            WHERE keyword_en = %s OR keyword_ar = %s
-            LIMIT 1
-        """
-        result = db_manager.fetch_all(query, (sub_category, sub_category), dictionary=True)
-        return (result[0]['key_word_id'], result[0]['classification_id']) if result else None
+        await keyword_index.arefresh(await get_async_db())
+        entry = keyword_index.lookup(sub_category)
+        return (entry.keyword_id, entry.classification_id) if entry else (None, None)
     except Exception as e:
         logger.error(f"Error fetching classification_id for {sub_category}: {e}")
-        return None
+        return None, None
 
-async def extract_metadata(sub_category: str) -> List[Dict[str, str]]:
+async def _open_search(page, sub_category: str) -> None:
+    # Retry goto
+    for nav_attempt in range(3):
+        try:
+            logger.debug(f"Attempt {nav_attempt + 1}: Navigating to Etimad...")
+            async with step_latency.timed("search.navigate"):
+                await page.goto(SCRAPER_CONFIG["base_url"] + SEARCH_PATH,
+                                # wait_until="networkidle",
+                                timeout=60000)
+            break
+        except Exception as e:
+            logger.warning(f"Navigation attempt {nav_attempt + 1} failed: {e}")
+            if nav_attempt == 2:
+                raise
+
+    # Fill search form
+    await page.click("#searchBtnColaps")
+    await page.wait_for_selector("#txtMultipleSearch", state="visible")
+    await page.fill("#txtMultipleSearch", sub_category)
+    await page.click('label:has-text("حالة المنافسة") + div .dropdown-toggle')
+    await page.click('div.dropdown-menu.show a:has-text("المنافسات النشطة (تقديم العروض)")')
+    async with step_latency.timed("search.results"):
+        await click_and_wait_for_response(page, "#searchBtn", READINESS_CONFIG["search_response_pattern"])
+        await page.wait_for_selector("#cardsresult", timeout=SCRAPER_CONFIG["timeout"])
+        await wait_for_count_settled(page, "#cardsresult .tender-card")
+
+async def _read_cards(page, sub_category: str, key_word_id: int, seen_links: set) -> List[Dict[str, str]]:
+    cards = await page.locator("#cardsresult .tender-card").element_handles()
+    records = []
+    for card in cards:
+        try:
+            title_element = await card.query_selector("h3 a, h2 a, a.tender-title")
+            if not title_element:
+                continue
+
+            title = await title_element.inner_text()
+            href = await title_element.get_attribute("href")
+            if not title or not href:
+                continue
+
+            full_link = f"{SCRAPER_CONFIG['base_url']}{href}" if not href.startswith("http") else href
+
+            if full_link and full_link not in seen_links:
+                seen_links.add(full_link)
+                records.append({
+                    "Title": title.strip(),
+                    "Link": full_link.strip(),
+                    "SubCategory": sub_category,  # For downstream use
+                    "KeyWordID": key_word_id,
+                    "Fingerprint": card_fingerprint(await card.inner_text()),
+                })
+        except Exception as e:
+            logger.warning(f"Error processing card: {e}")
+            continue
+    return records
+
+async def _goto_next_page(page) -> bool:
+    """Click the pager's next link; returns False on the last page."""
+    next_link = await page.query_selector(SCRAPER_CONFIG["next_page_selector"])
+    if not next_link:
+        return False
+
+    first_card = await page.query_selector("#cardsresult .tender-card a")
+    first_href = await first_card.get_attribute("href") if first_card else None
+    async with step_latency.timed("search.next_page"):
+        await next_link.click()
+        # The result list is swapped in place, wait until it shows different cards
+        await page.wait_for_function(
+            """(previous) => {
+                const link = document.querySelector('#cardsresult .tender-card a');
+                return link && link.getAttribute('href') !== previous;
+            }""",
+            arg=first_href,
+            timeout=SCRAPER_CONFIG["timeout"],
+        )
+        await wait_for_count_settled(page, "#cardsresult .tender-card")
+    return True
+
+async def iter_search_cards(sub_category: str, pool: BrowserPool = None,
+                            max_pages: int = None) -> AsyncIterator[Dict[str, str]]:
+    """
+    Walk every result page of a keyword search and yield card records as soon
+    as each page is read. Pages are crawled by a background producer into a
+    bounded queue, so consumers can start on links while later pages load.
+    """
+    max_pages = max_pages or SCRAPER_CONFIG["max_result_pages"]
     logger.info(f"Starting metadata extraction for: {sub_category}")
-    results = []
+    pool = pool or await get_browser_pool()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=SCRAPER_CONFIG["card_queue_size"])
+    done = object()
 
     # Get classification_id for the sub_category
-    key_word_id, classification_id = get_classification_id(sub_category)
-    for attempt in range(SCRAPER_CONFIG["max_retries"]):
-        try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=False, timeout=SCRAPER_CONFIG["timeout"])
-                context = await browser.new_context()
-                page = await context.new_page()
-
-                # Retry goto
-                for nav_attempt in range(3):
-                    try:
-                        logger.debug(f"Attempt {nav_attempt + 1}: Navigating to Etimad...")
-                        await page.goto("https://tenders.etimad.sa/Tender/AllTendersForVisitor",
-                                        # wait_until="networkidle",
-                                        timeout=60000)
-                        break
-                    except Exception as e:
-                        logger.warning(f"Navigation attempt {nav_attempt + 1} failed: {e}")
-                        if nav_attempt == 2:
-                            raise
-
-                # Fill search form
-                await page.click("#searchBtnColaps")
-                await page.wait_for_selector("#txtMultipleSearch", state="visible")
-                await page.fill("#txtMultipleSearch", sub_category)
-                await page.click('label:has-text("حالة المنافسة") + div .dropdown-toggle')
-                await page.click('div.dropdown-menu.show a:has-text("المنافسات النشطة (تقديم العروض)")')
-                await page.click("#searchBtn")
-                await page.wait_for_selector("#cardsresult", timeout=SCRAPER_CONFIG["timeout"])
-                await page.wait_for_timeout(2000)
-
-                logger.debug("Extracting tender cards...")
-
-                cards = await page.locator("#cardsresult .tender-card").element_handles()
-
-                if not cards:
+    key_word_id, classification_id = await get_classification_id(sub_category)
+    db = await get_async_db()
+
+    archive = get_page_archive()
+
+    async def produce():
+        seen_links = set()
+        page_count = 0
+        for attempt in range(SCRAPER_CONFIG["max_retries"]):
+            try:
+                async with pool.page() as page:
+                    await _open_search(page, sub_category)
+                    logger.debug("Extracting tender cards...")
+
+                    page_count = 0
+                    while page_count < max_pages:
+                        page_count += 1
+                        if archive:
+                            await archive.aput(KIND_SEARCH, f"{sub_category}#{page_count}", page.url,
+                                               await page.inner_html("#cardsresult"))
+                        for record in await _read_cards(page, sub_category, key_word_id, seen_links):
+                            await queue.put(record)
+                        if not await _goto_next_page(page):
+                            break
+
+                if not seen_links:
                     logger.warning(f"No relevant result found for: {sub_category}")
-                    db_manager.log_scraping(
-                        key_word_id=key_word_id,
-                        classification_id=classification_id,
-                        count=0,
-                        status="success",
-                        error="No relevant tenders found"
-                    )
-                    return [{"Message": "No relevant result found for the search"}]
-
-                seen_links = set()
-                for card in cards:
-                    try:
-                        title_element = await card.query_selector("h3 a, h2 a, a.tender-title")
-                        if not title_element:
-                            continue
-
-                        title = await title_element.inner_text()
-                        href = await title_element.get_attribute("href")
-                        if not title or not href:
-                            continue
-
-                        full_link = f"https://tenders.etimad.sa{href}" if not href.startswith("http") else href
-
-                        if full_link and full_link not in seen_links:
-                            seen_links.add(full_link)
-                            results.append({
-                                "Title": title.strip(),
-                                "Link": full_link.strip(),
-                                "SubCategory": sub_category,  # For downstream use
-                                "KeyWordID": key_word_id,
-                            })
-                    except Exception as e:
-                        logger.warning(f"Error processing card: {e}")
-                        continue
-
-                await browser.close()
-
-                logger.info(f"Found {len(results)} tenders for {sub_category}")
-                db_manager.log_scraping(
+                logger.info(f"Found {len(seen_links)} tenders for {sub_category} across {page_count} page(s)")
+                await db.log_scraping(
                     key_word_id=key_word_id,
                     classification_id=classification_id,
-                    count=len(results),
-                    status="success"
+                    count=len(seen_links),
+                    status="success",
+                    error=None if seen_links else "No relevant tenders found",
+                    page_count=page_count
                 )
-                return results
+                break
 
-        except Exception as e:
-            logger.error(f"Attempt {attempt + 1} failed: {e}")
-            if attempt == SCRAPER_CONFIG["max_retries"] - 1:
-                db_manager.log_scraping(
-                    key_word_id=key_word_id,
-                    classification_id=classification_id,
-                    count=0,
-                    status="failed",
-                    error=str(e)
-                )
-            await asyncio.sleep(2 ** attempt)
+            except Exception as e:
+                # Links already queued are remembered, a retry only emits the rest
+                logger.error(f"Attempt {attempt + 1} failed: {e}")
+                RETRIES.inc(stage="search", reason=type(e).__name__)
+                if attempt == SCRAPER_CONFIG["max_retries"] - 1:
+                    await db.log_scraping(
+                        key_word_id=key_word_id,
+                        classification_id=classification_id,
+                        count=len(seen_links),
+                        status="failed",
+                        error=str(e),
+                        page_count=page_count
+                    )
+                await asyncio.sleep(2 ** attempt)
+        await queue.put(done)
 
-    return []
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            record = await queue.get()
+            if record is done:
+                break
+            yield record
+    finally:
+        if not producer.done():
+            producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
+
+async def extract_metadata(sub_category: str, pool: BrowserPool = None) -> List[Dict[str, str]]:
+    async with pool_or_shared(pool) as pool:
+        results = [record async for record in iter_search_cards(sub_category, pool)]
+    if not results:
+        return [{"Message": "No relevant result found for the search"}]
+    return results
+
+async def taxonomy_keywords() -> List[str]:
+    main_to_sub = await asyncio.to_thread(taxonomy.main_to_sub)
+    return [sub_cat for sub_list in main_to_sub.values() for sub_cat in sub_list]
+
+async def stream_all_metadata(pool: BrowserPool = None, concurrency: int = None,
+                              keywords: List[str] = None, max_pages: int = None) -> AsyncIterator[Dict[str, str]]:
+    """
+    Merge the card streams of every keyword (all taxonomy sub-categories unless
+    `keywords` is given) into one async generator, running at most
+    `concurrency` searches at once.
+    """
+    pool = pool or await get_browser_pool()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=SCRAPER_CONFIG["card_queue_size"])
+    semaphore = asyncio.Semaphore(concurrency or pool.size)
+    done = object()
 
-async def extract_all_metadata() -> List[Dict[str, str]]:
-    all_results = []
-    tasks = []
+    async def drain(sub_cat: str):
+        try:
+            async with semaphore:
+                async for record in iter_search_cards(sub_cat, pool, max_pages):
+                    await queue.put(record)
+        except Exception as e:
+            logger.error(f"Search stream for {sub_cat} aborted: {e}")
+        await queue.put(done)
+
+    if keywords is None:
+        keywords = await taxonomy_keywords()
+    tasks = [asyncio.create_task(drain(sub_cat)) for sub_cat in keywords]
+    remaining = len(tasks)
+    try:
+        while remaining:
+            record = await queue.get()
+            if record is done:
+                remaining -= 1
+                continue
+            yield record
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
-    for sub_list in MAIN_TO_SUB.values():
-        for sub_cat in sub_list:
-            tasks.append(extract_metadata(sub_cat))
+async def stream_classified_metadata(pool: BrowserPool = None, concurrency: int = None,
+                                     keywords: List[str] = None) -> AsyncIterator[Dict[str, str]]:
+    """
+    Local discovery: run DISCOVERY_CONFIG["broad_queries"] once and classify
+    every card title against all `keywords` (default: the whole taxonomy).
+    A card is yielded once per matching keyword, the same shape as keyword
+    searches finding it several times, so downstream dedup and keyword
+    linking are unchanged. Site round trips scale with result pages instead
+    of keywords.
+    """
+    await keyword_index.arefresh(await get_async_db())
+    classifier = KeywordClassifier(keywords if keywords is not None else await taxonomy_keywords(), keyword_index)
+    seen_links = set()
+    matched = unmatched = 0
+    async for record in stream_all_metadata(pool, concurrency, DISCOVERY_CONFIG["broad_queries"],
+                                            DISCOVERY_CONFIG["max_result_pages"]):
+        if record["Link"] in seen_links:
+            continue
+        seen_links.add(record["Link"])
+        matches = classifier.classify(record["Title"])
+        if matches:
+            matched += 1
+        else:
+            unmatched += 1
+            if DISCOVERY_CONFIG["keep_unmatched"]:
+                yield {**record, "SubCategory": None, "KeyWordID": None}
+        for sub_category, key_word_id in matches:
+            yield {**record, "SubCategory": sub_category, "KeyWordID": key_word_id}
+    logger.info(f"Local classification: {matched} of {len(seen_links)} cards matched "
+                f"{len(classifier.keywords)} keywords ({unmatched} unmatched)")
 
-    results = await asyncio.gather(*tasks)
+def discover_metadata(pool: BrowserPool = None, concurrency: int = None,
+                      keywords: List[str] = None) -> AsyncIterator[Dict[str, str]]:
+    """Card stream for the configured DISCOVERY_CONFIG["mode"]."""
+    mode = DISCOVERY_CONFIG["mode"]
+    if mode == "local":
+        return stream_classified_metadata(pool, concurrency, keywords)
+    if mode != "keywords":
+        raise ValueError(f"Unknown discovery mode: {mode}")
+    return stream_all_metadata(pool, concurrency, keywords)
 
-    for res in results:
-        all_results.extend(res)
+@log_execution_time
+async def extract_all_metadata(pool: BrowserPool = None) -> List[Dict[str, str]]:
+    registry = LinkRegistry()
+    unique_results = []
+    async with pool_or_shared(pool) as pool:
+        async for record in discover_metadata(pool):
+            if registry.register(record):
+                unique_results.append(record)
 
-    # Deduplicate by link
-    unique_results = {item['Link']: item for item in all_results if 'Link' in item}.values()
+    # Keep every matching keyword, not just the first search that found the link
+    for record in unique_results:
+        record["KeyWordIDs"] = registry.keyword_ids(record["Link"])
     logger.info(f"Total unique tenders found: {len(unique_results)}")
-    return list(unique_results)
\ No newline at end of file
+    return unique_results
\ No newline at end of file
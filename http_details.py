@@ -0,0 +1,92 @@
+import logging
+import logging.config
+from datetime import datetime
+from typing import Dict, Optional
+from urllib.parse import urljoin, urlparse, parse_qs
+import httpx
+from selectolax.parser import HTMLParser
+from config import SCRAPER_CONFIG, LOGGING_CONFIG
+from concurrency import HostOverloadedError, OVERLOAD_STATUSES
+from archive import get_page_archive, KIND_DETAIL, KIND_TAB_D2
+
+logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger("etimad.http_details")
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept-Language": "ar,en;q=0.8",
+}
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Keep-alive HTTP/2 client shared by all detail fetches of a run."""
+    limits = httpx.Limits(
+        max_connections=SCRAPER_CONFIG["http_max_connections"],
+        max_keepalive_connections=SCRAPER_CONFIG["http_max_connections"],
+    )
+    return httpx.AsyncClient(
+        http2=True,
+        limits=limits,
+        headers=DEFAULT_HEADERS,
+        timeout=SCRAPER_CONFIG["timeout"] / 1000,
+        follow_redirects=True,
+    )
+
+
+def html_to_text(node) -> str:
+    """Approximate Playwright's inner_text: one line per text block."""
+    if node is None:
+        return ""
+    for tag in node.css("script, style"):
+        tag.decompose()
+    return node.text(separator="\n", strip=True)
+
+
+def section_text(tree: HTMLParser, section_id: str) -> str:
+    node = tree.css_first(f"#{section_id}")
+    # Tab partials are bare fragments without the wrapping #d-N element
+    return html_to_text(node if node is not None else tree.body)
+
+
+def tender_id_from_link(link: str) -> Optional[str]:
+    values = parse_qs(urlparse(link).query).get("STenderId")
+    return values[0] if values else None
+
+
+async def fetch_sections_http(client: httpx.AsyncClient, link: str) -> Optional[Dict[str, str]]:
+    """
+    Fetch a tender detail page (and its tab partials when a section is not
+    rendered inline) without a browser. Returns the visible text of each
+    section keyed by tab id, or None when the request failed. Raises
+    HostOverloadedError on 429/5xx and timeouts so the scheduler backs off.
+    """
+    archive = get_page_archive()
+    fetched_at = datetime.now()
+    tender_id = tender_id_from_link(link)
+    try:
+        response = await client.get(link)
+        if response.status_code in OVERLOAD_STATUSES:
+            raise HostOverloadedError(response.status_code, link)
+        response.raise_for_status()
+        if archive and tender_id:
+            await archive.aput(KIND_DETAIL, tender_id, link, response.text, fetched_at)
+        tree = HTMLParser(response.text)
+        sections = {"d-1": section_text(tree, "d-1"), "d-2": section_text(tree, "d-2")}
+
+        if "آخر موعد" not in sections["d-2"]:
+            template = SCRAPER_CONFIG["detail_tab_urls"].get("d-2")
+            if tender_id and template:
+                partial = await client.get(urljoin(link, template.format(tender_id=tender_id)))
+                if partial.status_code in OVERLOAD_STATUSES:
+                    raise HostOverloadedError(partial.status_code, str(partial.url))
+                partial.raise_for_status()
+                if archive:
+                    await archive.aput(KIND_TAB_D2, tender_id, str(partial.url), partial.text, fetched_at)
+                sections["d-2"] = section_text(HTMLParser(partial.text), "d-2")
+        return sections
+    except httpx.TimeoutException as e:
+        raise HostOverloadedError(None, link) from e
+    except httpx.HTTPError as e:
+        logger.warning(f"⚠️ HTTP fetch failed for {link}: {e}")
+        return None
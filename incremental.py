@@ -0,0 +1,70 @@
+import hashlib
+import logging
+import logging.config
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from config import LOGGING_CONFIG, INCREMENTAL_CONFIG
+
+logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger("etimad.incremental")
+
+# Active tenders only: closed ones never come back in the search results
+TENDER_STATE_QUERY = """
+    SELECT link, card_fingerprint, last_detail_fetch_at, last_submission_date
+    FROM tenders
+    WHERE card_fingerprint IS NOT NULL
+      AND (last_submission_date IS NULL OR last_submission_date >= NOW())
+"""
+
+MARK_SKIPPED_SQL = """
+    UPDATE tenders
+    SET last_seen_at = %s, detail_skip_count = detail_skip_count + 1
+    WHERE link = %s
+"""
+
+
+def card_fingerprint(card_text: str) -> str:
+    """Stable hash of a search card's visible text (whitespace-insensitive)."""
+    normalized = " ".join(card_text.split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+class TenderStateIndex:
+    """
+    Snapshot of the stored per-tender fingerprints, loaded once per run, that
+    decides whether a search card needs its detail page fetched again.
+    """
+
+    def __init__(self, refetch_after: timedelta = None, deadline_window: timedelta = None):
+        self.refetch_after = refetch_after or timedelta(hours=INCREMENTAL_CONFIG["refetch_after_hours"])
+        self.deadline_window = deadline_window or timedelta(hours=INCREMENTAL_CONFIG["deadline_window_hours"])
+        self._state: Dict[str, Dict] = {}
+
+    async def load(self, db) -> "TenderStateIndex":
+        rows = await db.fetch_all(TENDER_STATE_QUERY, dictionary=True)
+        self._state = {row["link"]: row for row in rows}
+        logger.info(f"Loaded fetch state for {len(self._state)} active tenders")
+        return self
+
+    def should_fetch(self, record: Dict, now: Optional[datetime] = None) -> Tuple[bool, str]:
+        now = now or datetime.now()
+        state = self._state.get(record.get("Link"))
+        if state is None:
+            return True, "new"
+        if state["card_fingerprint"] != record.get("Fingerprint"):
+            return True, "changed"
+        fetched_at = state["last_detail_fetch_at"]
+        if fetched_at is None or now - fetched_at >= self.refetch_after:
+            return True, "stale"
+        deadline = state["last_submission_date"]
+        if deadline is not None and deadline - now <= self.deadline_window:
+            return True, "deadline"
+        return False, "unchanged"
+
+
+async def mark_skipped(db, links: List[str], seen_at: Optional[datetime] = None) -> None:
+    """Record that unchanged tenders were still listed, without touching their details."""
+    if not links:
+        return
+    seen_at = seen_at or datetime.now()
+    await db.execute_many(MARK_SKIPPED_SQL, [(seen_at, link) for link in links])
@@ -0,0 +1,253 @@
+"""
+Durable run journal for the scraping pipeline (local SQLite file).
+
+Every link discovered by the searches, every completed detail fetch (with its
+result) and every persisted or skipped link is recorded as it happens, so a
+run that dies halfway can be resumed: links already saved are left alone,
+fetched-but-unsaved results are written straight to the DB and only the
+remaining links are fetched again.
+
+Per-link events are buffered and committed together every
+JOURNAL_CONFIG["flush_events"] events or ["flush_seconds"] seconds (the
+orchestrator also flushes off the event loop after each DB batch); run-level
+changes and reads flush first. A crash loses at most the unflushed events,
+whose links are simply fetched or saved again on resume.
+
+    python orchestrator.py --resume <run_id>     # or --resume latest
+    python journal.py                            # list recent runs
+"""
+import json
+import logging
+import logging.config
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from config import JOURNAL_CONFIG, LOGGING_CONFIG
+
+logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger("etimad.journal")
+
+JOURNAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    status TEXT NOT NULL DEFAULT 'running',
+    discovery_done INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS run_links (
+    run_id TEXT NOT NULL,
+    link TEXT NOT NULL,
+    record TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    result TEXT,
+    PRIMARY KEY (run_id, link)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS run_link_keywords (
+    run_id TEXT NOT NULL,
+    link TEXT NOT NULL,
+    keyword_id INTEGER NOT NULL,
+    PRIMARY KEY (run_id, link, keyword_id)
+) WITHOUT ROWID;
+"""
+
+# Link states, in pipeline order
+QUEUED = "queued"
+SKIPPED = "skipped"
+FETCHED = "fetched"
+SAVED = "saved"
+
+# datetime values in fetch results that must survive the JSON round trip
+_DATETIME_KEYS = ("DetailFetchedAt",)
+
+
+def _encode_result(result: Dict) -> str:
+    return json.dumps(result, ensure_ascii=False, default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v))
+
+
+def _decode_result(text: str) -> Dict:
+    result = json.loads(text)
+    for key in _DATETIME_KEYS:
+        if isinstance(result.get(key), str):
+            result[key] = datetime.fromisoformat(result[key])
+    return result
+
+
+class ResumeState(NamedTuple):
+    """What an interrupted run still has to do."""
+    records: List[Dict]                 # Every discovered card record (to rebuild the link registry)
+    keyword_pairs: List[tuple]          # (link, keyword_id) seen so far
+    pending: List[Dict]                 # Records still waiting for a detail fetch
+    unsaved_results: List[Dict]         # Fetched results that never reached the DB
+    discovery_done: bool
+
+
+class RunJournal:
+    """Append-mostly SQLite journal; one instance per process, safe to call from the event loop thread."""
+
+    def __init__(self, path: str = None):
+        self.path = path or JOURNAL_CONFIG["path"]
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pending: List[Tuple[str, List[tuple]]] = []
+        self._pending_events = 0
+        self._last_flush = time.monotonic()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            # WAL + NORMAL: commits don't fsync, a crash loses at most the last few events
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(JOURNAL_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _flush_locked(self) -> None:
+        pending, self._pending, self._pending_events = self._pending, [], 0
+        self._last_flush = time.monotonic()
+        if not pending:
+            return
+        # Consecutive events of one kind go out as a single executemany, in order
+        merged: List[Tuple[str, List[tuple]]] = []
+        for sql, params in pending:
+            if merged and merged[-1][0] == sql:
+                merged[-1][1].extend(params)
+            else:
+                merged.append((sql, list(params)))
+        for sql, params in merged:
+            self.conn.executemany(sql, params)
+        self.conn.commit()
+
+    def flush(self) -> None:
+        """Commit buffered link events; cheap when there are none."""
+        with self._lock:
+            self._flush_locked()
+
+    def _record(self, sql: str, params_list: List[tuple]) -> None:
+        """Buffer a per-link event; commits once enough events or time have accumulated."""
+        with self._lock:
+            self._pending.append((sql, params_list))
+            self._pending_events += len(params_list)
+            if (self._pending_events >= JOURNAL_CONFIG["flush_events"]
+                    or time.monotonic() - self._last_flush >= JOURNAL_CONFIG["flush_seconds"]):
+                self._flush_locked()
+
+    def _write(self, sql: str, params_list: Iterable) -> None:
+        with self._lock:
+            self._flush_locked()
+            self.conn.executemany(sql, params_list)
+            self.conn.commit()
+
+    def start_run(self, run_id: str = None, resumed: bool = False) -> str:
+        """Open a run; a caller-chosen id that isn't being resumed (e.g. a cleared DAG run) starts over."""
+        run_id = run_id or f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+        if not resumed:
+            for table in ("run_link_keywords", "run_links", "runs"):
+                self._write(f"DELETE FROM {table} WHERE run_id = ?", [(run_id,)])
+        self._write("INSERT OR IGNORE INTO runs (run_id, started_at) VALUES (?, ?)",
+                    [(run_id, datetime.now().isoformat())])
+        self._write("UPDATE runs SET status = 'running', finished_at = NULL WHERE run_id = ?", [(run_id,)])
+        return run_id
+
+    def finish_run(self, run_id: str, status: str) -> None:
+        self._write("UPDATE runs SET status = ?, finished_at = ? WHERE run_id = ?",
+                    [(status, datetime.now().isoformat(), run_id)])
+
+    def mark_discovery_done(self, run_id: str) -> None:
+        self._write("UPDATE runs SET discovery_done = 1 WHERE run_id = ?", [(run_id,)])
+
+    def discovered(self, run_id: str, record: Dict, first_seen: bool) -> None:
+        if first_seen:
+            self._record("INSERT OR IGNORE INTO run_links (run_id, link, record) VALUES (?, ?, ?)",
+                         [(run_id, record["Link"], json.dumps(record, ensure_ascii=False))])
+        if record.get("KeyWordID") is not None:
+            self._record("INSERT OR IGNORE INTO run_link_keywords VALUES (?, ?, ?)",
+                         [(run_id, record["Link"], record["KeyWordID"])])
+
+    def skipped(self, run_id: str, links: List[str]) -> None:
+        self._record("UPDATE run_links SET state = 'skipped' WHERE run_id = ? AND link = ?",
+                     [(run_id, link) for link in links])
+
+    def fetched(self, run_id: str, link: str, result: Dict) -> None:
+        self._record("UPDATE run_links SET state = 'fetched', result = ? WHERE run_id = ? AND link = ?",
+                     [(_encode_result(result), run_id, link)])
+
+    def saved(self, run_id: str, links: List[str]) -> None:
+        # The result blob is only needed until the tender is in the DB
+        self._record("UPDATE run_links SET state = 'saved', result = NULL WHERE run_id = ? AND link = ?",
+                     [(run_id, link) for link in links])
+
+    def resume_state(self, run_id: str) -> ResumeState:
+        with self._lock:
+            self._flush_locked()
+            run = self.conn.execute("SELECT discovery_done FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            if run is None:
+                raise ValueError(f"Unknown run id: {run_id}")
+            rows = self.conn.execute("SELECT record, state, result FROM run_links WHERE run_id = ?",
+                                     (run_id,)).fetchall()
+            pairs = self.conn.execute("SELECT link, keyword_id FROM run_link_keywords WHERE run_id = ?",
+                                      (run_id,)).fetchall()
+        records, pending, unsaved = [], [], []
+        for record_text, state, result_text in rows:
+            record = json.loads(record_text)
+            records.append(record)
+            if state == QUEUED:
+                pending.append(record)
+            elif state == FETCHED and result_text:
+                unsaved.append(_decode_result(result_text))
+        return ResumeState(records, [tuple(pair) for pair in pairs], pending, unsaved, bool(run[0]))
+
+    def status(self, run_id: str) -> Optional[str]:
+        """'running', 'success' or 'failed'; None for a run the journal doesn't know."""
+        with self._lock:
+            self._flush_locked()
+            row = self.conn.execute("SELECT status FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return row[0] if row else None
+
+    def latest_unfinished(self) -> Optional[str]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT run_id FROM runs WHERE status != 'success' ORDER BY started_at DESC LIMIT 1"
+            ).fetchone()
+        return row[0] if row else None
+
+    def runs(self, limit: int = 20) -> List[Dict]:
+        with self._lock:
+            self._flush_locked()
+            rows = self.conn.execute(
+                """SELECT r.run_id, r.started_at, r.finished_at, r.status, r.discovery_done,
+                          COUNT(l.link), SUM(l.state = 'saved'), SUM(l.state = 'fetched'), SUM(l.state = 'queued')
+                   FROM runs r LEFT JOIN run_links l ON l.run_id = r.run_id
+                   GROUP BY r.run_id ORDER BY r.started_at DESC LIMIT ?""", (limit,)
+            ).fetchall()
+        keys = ("run_id", "started_at", "finished_at", "status", "discovery_done",
+                "links", "saved", "fetched", "queued")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def prune(self, keep_days: int = None) -> None:
+        """Drop successful runs older than `keep_days`; unfinished runs stay resumable."""
+        cutoff = (datetime.now() - timedelta(days=keep_days or JOURNAL_CONFIG["keep_days"])).isoformat()
+        with self._lock:
+            old = [row[0] for row in self.conn.execute(
+                "SELECT run_id FROM runs WHERE status = 'success' AND started_at < ?", (cutoff,))]
+            for table in ("run_link_keywords", "run_links", "runs"):
+                self.conn.executemany(f"DELETE FROM {table} WHERE run_id = ?", [(run_id,) for run_id in old])
+            self.conn.commit()
+
+    def close(self) -> None:
+        self.flush()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+if __name__ == "__main__":
+    for run in RunJournal().runs():
+        print(f"{run['run_id']}  {run['status']:<8} started {run['started_at'][:19]}  "
+              f"links={run['links']} saved={run['saved'] or 0} fetched={run['fetched'] or 0} "
+              f"queued={run['queued'] or 0} discovery_done={bool(run['discovery_done'])}")
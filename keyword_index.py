@@ -0,0 +1,123 @@
+import time
+import logging
+import logging.config
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from config import LOGGING_CONFIG, KEYWORD_INDEX_CONFIG
+
+logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger("etimad.keyword_index")
+
+KEYWORD_INDEX_QUERY = """
+    SELECT
+        eck.id AS keyword_id,
+        eck.keyword_ar,
+        eck.keyword_en,
+        ec.id AS classification_id,
+        ec.name_ar AS classification_name_ar,
+        ec.name_en AS classification_name_en
+    FROM
+        etimad_classification_keywords AS eck
+    JOIN
+        etimad_classifications AS ec ON eck.classification_id = ec.id
+    ORDER BY
+        ec.name_en, eck.keyword_en
+"""
+
+# Cheap fingerprint of both tables, used to skip reloads when nothing changed. Counts catch
+# deletes; the CRC32 sums over every column the index reads catch inserts and in-place
+# updates (a renamed keyword, a keyword moved to another classification)
+KEYWORD_VERSION_QUERY = """
+    SELECT
+        (SELECT COUNT(*) FROM etimad_classification_keywords) AS keyword_count,
+        (SELECT CAST(COALESCE(SUM(CRC32(CONCAT_WS('|', id, keyword_ar, keyword_en, classification_id))), 0)
+                AS UNSIGNED) FROM etimad_classification_keywords) AS keyword_checksum,
+        (SELECT COUNT(*) FROM etimad_classifications) AS classification_count,
+        (SELECT CAST(COALESCE(SUM(CRC32(CONCAT_WS('|', id, name_ar, name_en))), 0)
+                AS UNSIGNED) FROM etimad_classifications) AS classification_checksum
+"""
+
+
+class KeywordEntry(NamedTuple):
+    keyword_id: int
+    keyword_ar: Optional[str]
+    keyword_en: Optional[str]
+    classification_id: int
+    classification_name_ar: Optional[str]
+    classification_name_en: Optional[str]
+
+
+class KeywordIndex:
+    """
+    In-memory keyword_ar/keyword_en -> KeywordEntry index built from a single
+    join. After `ttl` seconds the next access runs the version query and
+    reloads only if the taxonomy tables changed.
+    """
+
+    def __init__(self, ttl: float = None):
+        self.ttl = KEYWORD_INDEX_CONFIG["ttl"] if ttl is None else ttl
+        self.entries: List[KeywordEntry] = []
+        self._by_keyword: Dict[str, KeywordEntry] = {}
+        self.version: Optional[Tuple] = None
+        self.loaded_at: Optional[float] = None
+
+    def load_rows(self, rows: List[Dict], version: Tuple) -> None:
+        entries = [KeywordEntry(**{field: row[field] for field in KeywordEntry._fields}) for row in rows]
+        by_keyword = {}
+        for entry in entries:
+            # First match wins, like the LIMIT 1 lookup this replaces
+            for key in (entry.keyword_en, entry.keyword_ar):
+                if key:
+                    by_keyword.setdefault(key.strip(), entry)
+        self.entries = entries
+        self._by_keyword = by_keyword
+        self.version = version
+        self.loaded_at = time.monotonic()
+        logger.info(f"Keyword index loaded: {len(entries)} keywords")
+
+    def is_stale(self) -> bool:
+        return self.loaded_at is None or time.monotonic() - self.loaded_at >= self.ttl
+
+    @staticmethod
+    def version_of(rows: List[Dict]) -> Tuple:
+        row = rows[0] if rows else {}
+        return tuple(row.get(k) for k in ("keyword_count", "keyword_checksum",
+                                          "classification_count", "classification_checksum"))
+
+    def refresh(self, db) -> "KeywordIndex":
+        """Reload from a blocking DatabaseManager if stale and changed."""
+        if not self.is_stale():
+            return self
+        version = self.version_of(db.fetch_all(KEYWORD_VERSION_QUERY, dictionary=True))
+        if version == self.version:
+            self.loaded_at = time.monotonic()
+            return self
+        self.load_rows(db.fetch_all(KEYWORD_INDEX_QUERY, dictionary=True), version)
+        return self
+
+    async def arefresh(self, db) -> "KeywordIndex":
+        """Same as refresh() for the awaitable managers in async_db."""
+        if not self.is_stale():
+            return self
+        version = self.version_of(await db.fetch_all(KEYWORD_VERSION_QUERY, dictionary=True))
+        if version == self.version:
+            self.loaded_at = time.monotonic()
+            return self
+        self.load_rows(await db.fetch_all(KEYWORD_INDEX_QUERY, dictionary=True), version)
+        return self
+
+    def rows(self) -> List[Dict]:
+        """Index contents as plain rows, the inverse of load_rows() (used for on-disk caching)."""
+        return [entry._asdict() for entry in self.entries]
+
+    def lookup(self, keyword: str) -> Optional[KeywordEntry]:
+        return self._by_keyword.get(keyword.strip()) if keyword else None
+
+    def main_to_sub(self) -> Dict[str, List[str]]:
+        """classification name_ar -> [keyword_ar], the shape of main_to_sub.json."""
+        data: Dict[str, List[str]] = {}
+        for entry in self.entries:
+            data.setdefault(entry.classification_name_ar, []).append(entry.keyword_ar)
+        return data
+
+
+keyword_index = KeywordIndex()
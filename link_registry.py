@@ -0,0 +1,39 @@
+from typing import Dict, List, Optional, Tuple
+
+
+class LinkRegistry:
+    """
+    Run-wide registry of tender links shared by all keyword searches.
+
+    `register()` returns True only the first time a link is seen, so the link
+    is queued for detail extraction exactly once, while every keyword that
+    matched it is accumulated for the tender<->keyword table.
+    """
+
+    def __init__(self):
+        self._keywords: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keywords)
+
+    def __contains__(self, link: str) -> bool:
+        return link in self._keywords
+
+    def register(self, record: Dict) -> bool:
+        link = record.get("Link")
+        if not link:
+            return False
+        keyword_id = record.get("KeyWordID")
+        first_seen = link not in self._keywords
+        keyword_ids = self._keywords.setdefault(link, [])
+        if keyword_id is not None and keyword_id not in keyword_ids:
+            keyword_ids.append(keyword_id)
+        return first_seen
+
+    def keyword_ids(self, link: str) -> List[int]:
+        """Keywords seen so far for a link, in discovery order."""
+        return list(self._keywords.get(link, []))
+
+    def pairs(self, links: Optional[List[str]] = None) -> List[Tuple[str, int]]:
+        links = self._keywords.keys() if links is None else links
+        return [(link, keyword_id) for link in links for keyword_id in self._keywords.get(link, [])]
@@ -0,0 +1,260 @@
+"""
+Non-blocking logging for the scraper and a cursor-based tail for the dashboard.
+
+LOGGING_CONFIG's "file" handler is built by queued_handler(): loggers only
+enqueue records, and one listener thread per process writes them to a
+size-rotated log file (rotated files are gzip-compressed), to the console and
+into a LogBuffer. The buffer keeps the latest records with increasing
+sequence numbers, so every dashboard session can follow the log from its own
+cursor without touching the file.
+
+Every module applies LOGGING_CONFIG at import, which rebuilds the handlers;
+the listener and buffer are shared per log file, so that only costs a new
+QueueHandler in front of them.
+
+Several processes append to the same log file (the dashboard, main.py or
+Airflow tasks, forked backfill workers), but only one of them rotates it: the
+first to take the lock on "<log file>.lock", which it holds until it exits.
+The others write through a WatchedFileHandler, which reopens the file once
+the owner has rotated it. If the owner exits, rotation resumes with the next
+process that starts.
+"""
+import asyncio
+import atexit
+import gzip
+import logging
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, WatchedFileHandler
+from typing import IO, Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Pause between moving a full log aside and compressing it. It runs on the listener thread,
+# so loggers never wait for it; their records queue up meanwhile
+ROTATION_GRACE_SECONDS = 0.5
+
+
+class CompressedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler whose backups are gzip files (etimad_scraper.log.1.gz, .2.gz, ...)."""
+
+    def __init__(self, filename: str, maxBytes: int = 0, backupCount: int = 0, encoding: str = "utf-8"):
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount, encoding=encoding)
+        self.namer = lambda name: f"{name}.gz"
+        self.rotator = self._compress
+
+    @staticmethod
+    def _compress(source: str, dest: str) -> None:
+        # Move the file aside first and give processes appending through WatchedFileHandler a
+        # moment to notice the rename; lines they write to the old file until then are kept
+        rotated = f"{source}.rotating"
+        os.replace(source, rotated)
+        time.sleep(ROTATION_GRACE_SECONDS)
+        with open(rotated, "rb") as src, gzip.open(dest, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(rotated)
+
+
+def _claim_rotation(filename: str) -> Optional[IO]:
+    """Take the log file's rotation lock without blocking; the open lock file, or None if another process holds it."""
+    lock_file = open(f"{filename}.lock", "a+b")
+    try:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+class LogBuffer(logging.Handler):
+    """Ring buffer of the latest records as dicts, numbered so readers can resume from a cursor."""
+
+    def __init__(self, capacity: int = 5000):
+        super().__init__()
+        self.entries: deque = deque(maxlen=capacity)
+        self.seq = 0
+        self._lock = threading.Lock()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        with self._lock:
+            self.seq += 1
+            self.entries.append({
+                "seq": self.seq,
+                "time": record.created,
+                "level": record.levelname,
+                "logger": record.name,
+                "message": getattr(record, "raw_message", record.getMessage()),
+                "text": record.getMessage(),    # The formatted line, as written to the file
+            })
+
+    def tail(self, cursor: int = 0, limit: int = 500) -> Tuple[List[Dict], int]:
+        """Up to `limit` records after `cursor` (oldest first) and the cursor to pass next time.
+
+        A cursor older than the buffer resumes at the oldest record still held; the
+        records in between are gone, which the caller can detect from the first seq.
+        """
+        with self._lock:
+            if cursor >= self.seq or not self.entries:
+                return [], self.seq
+            first = self.entries[0]["seq"]
+            start = max(cursor + 1 - first, 0)
+            end = min(start + limit, len(self.entries))
+            selected = [self.entries[i] for i in range(start, end)]
+        return selected, selected[-1]["seq"]
+
+    def latest(self, limit: int) -> Tuple[List[Dict], int]:
+        """The newest `limit` records, for a session that starts following now."""
+        with self._lock:
+            return list(self.entries)[-limit:], self.seq
+
+
+class _Pipeline:
+    def __init__(self, filename: str, max_bytes: int, backup_count: int, encoding: str,
+                 console: bool, buffer_size: int):
+        self.pid = os.getpid()
+        self.queue: queue.Queue = queue.Queue()
+        self.buffer = LogBuffer(buffer_size)
+        # Kept open for the life of the process: closing it would hand rotation to another process
+        self.rotation_lock = _claim_rotation(filename)
+        if self.rotation_lock:
+            file_handler = CompressedRotatingFileHandler(filename, max_bytes, backup_count, encoding)
+        else:
+            file_handler = WatchedFileHandler(filename, encoding=encoding)
+        handlers = [file_handler, self.buffer]
+        if console:
+            handlers.append(logging.StreamHandler(sys.stdout))
+        self.listener = QueueListener(self.queue, *handlers)
+        self.listener.start()
+        atexit.register(self.listener.stop)     # Drains the queue before the interpreter exits
+
+
+_pipelines: Dict[str, _Pipeline] = {}
+_pipelines_lock = threading.Lock()
+
+
+def _pipeline(filename: str, **options) -> _Pipeline:
+    key = os.path.abspath(filename)
+    with _pipelines_lock:
+        pipeline = _pipelines.get(key)
+        # A forked worker inherits the queue but not the listener thread; give it its own
+        if pipeline is None or pipeline.pid != os.getpid():
+            pipeline = _pipelines[key] = _Pipeline(filename, **options)
+        return pipeline
+
+
+class _QueuedHandler(QueueHandler):
+    def __init__(self, filename: str, options: Dict):
+        self.filename = filename
+        self.options = options
+        self.pipeline = _pipeline(filename, **options)
+        super().__init__(self.pipeline.queue)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # prepare() replaces msg with the formatted line; keep the bare message for structured readers
+        record.raw_message = record.getMessage()
+        return super().prepare(record)
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.pipeline.pid != os.getpid():
+            self.pipeline = _pipeline(self.filename, **self.options)
+            self.queue = self.pipeline.queue
+        self.queue.put_nowait(record)
+
+
+def queued_handler(filename: str, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5,
+                   encoding: str = "utf-8", console: bool = True, buffer_size: int = 5000) -> QueueHandler:
+    """dictConfig factory ("()") for the queued file + console + buffer handler."""
+    return _QueuedHandler(filename, dict(max_bytes=max_bytes, backup_count=backup_count, encoding=encoding,
+                                         console=console, buffer_size=buffer_size))
+
+
+def get_log_buffer(filename: str) -> Optional[LogBuffer]:
+    """This process's buffer for `filename`, or None if no handler writes to it."""
+    pipeline = _pipelines.get(os.path.abspath(filename))
+    return pipeline.buffer if pipeline and pipeline.pid == os.getpid() else None
+
+
+class FileCursor(NamedTuple):
+    """Position in a log file written by any process: the file's inode and the byte offset read up to."""
+    inode: int
+    offset: int
+
+
+def read_file_since(filename: str, cursor: Optional[FileCursor], max_bytes: int) -> Tuple[str, Optional[FileCursor]]:
+    """
+    Complete lines appended to `filename` after `cursor`, and the cursor to
+    pass next time. Without a cursor, reading starts `max_bytes` before the
+    end; a changed inode or a shorter file means the log was rotated, so
+    reading restarts at its beginning. At most `max_bytes` are returned; a
+    reader further behind skips ahead to the newest lines.
+    """
+    try:
+        with open(filename, "rb") as f:
+            stat = os.fstat(f.fileno())
+            if cursor is None or cursor.inode != stat.st_ino or cursor.offset > stat.st_size:
+                start = 0
+            else:
+                start = cursor.offset
+            skipped = stat.st_size - start > max_bytes
+            if skipped:
+                start = stat.st_size - max_bytes
+            f.seek(start)
+            data = f.read(stat.st_size - start)
+    except OSError:
+        return "", cursor
+    if skipped:
+        # Resume at a line boundary; the partial line before it was cut off
+        data = data[data.find(b"\n") + 1:]
+        start = stat.st_size - len(data)
+    # A line still being written is picked up complete on the next read
+    data = data[:data.rfind(b"\n") + 1]
+    return data.decode("utf-8", errors="replace").rstrip("\n"), FileCursor(stat.st_ino, start + len(data))
+
+
+def format_entries(entries: List[Dict]) -> str:
+    return "\n".join(entry["text"] for entry in entries)
+
+
+async def afollow(buffer: LogBuffer, cursor: int, duration: float, poll_interval: float = 1.0,
+                  limit: int = 500):
+    """
+    Yield (new records, cursor) as records are logged, for up to `duration`
+    seconds. Idle followers only compare sequence numbers between sleeps, so
+    any number of sessions can follow without holding a thread each.
+    """
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        await asyncio.sleep(poll_interval)
+        if buffer.seq > cursor:
+            entries, cursor = buffer.tail(cursor, limit)
+            if entries:
+                yield entries, cursor
+
+
+async def afollow_file(filename: str, cursor: Optional[FileCursor], duration: float, poll_interval: float = 1.0,
+                       max_bytes: int = 64 * 1024):
+    """afollow() for the log file itself, which also carries records logged by other processes."""
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        await asyncio.sleep(poll_interval)
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            continue
+        if cursor is None or (stat.st_ino, stat.st_size) != tuple(cursor):
+            text, cursor = read_file_since(filename, cursor, max_bytes)
+            if text:
+                yield text, cursor
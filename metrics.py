@@ -0,0 +1,197 @@
+"""
+Process-wide counters, gauges and histograms for the scraping stages,
+exposed in the Prometheus text format on METRICS_CONFIG["port"], plus
+optional OpenTelemetry spans per tender.
+
+Everything is a no-op while METRICS_CONFIG["enabled"] is false: each
+recording call returns after one attribute check, and tender spans fall
+back to a null context unless OTel is enabled and installed.
+"""
+import bisect
+import logging
+import logging.config
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List, Optional, Tuple
+from config import LOGGING_CONFIG, METRICS_CONFIG
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # Optional dependency
+    otel_trace = None
+
+logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger("etimad.metrics")
+
+# Upper bounds in seconds; the last bucket catches everything slower
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60]
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.metrics: List["_Metric"] = []
+
+    def register(self, metric: "_Metric") -> "_Metric":
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry(METRICS_CONFIG["enabled"])
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, labels: Dict) -> Tuple:
+        return tuple(labels.get(name, "") for name in self.labels)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        if not registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(self.labels, key)} {value}" for key, value in self.values.items()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        if not registry.enabled:
+            return
+        with self._lock:
+            self.values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: List[float] = None):
+        super().__init__(name, help, labels)
+        self.buckets = buckets or LATENCY_BUCKETS
+        # label values -> [per-bucket counts..., +Inf count], sum
+        self.values: Dict[Tuple, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        if not registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self.values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels):
+        if not registry.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total) in self.values.items():
+                running = 0
+                for bound, count in zip(self.buckets + ["+Inf"], counts):
+                    running += count
+                    le = f'le="{bound}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {running}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total[0]}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {running}")
+        return lines
+
+
+# Stage metrics shared by extract_metadata, extract_details, db and orchestrator
+STEP_SECONDS = Histogram("etimad_step_seconds", "Browser/HTTP step latency (navigation, tab load, search paging).", ("step",))
+PARSE_SECONDS = Histogram("etimad_parse_seconds", "Section text to fields parse time per tender.", ("path",),
+                          buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1])
+DB_WRITE_SECONDS = Histogram("etimad_db_write_seconds", "Duration of one bulk upsert transaction.", ("backend",))
+DB_ROWS = Counter("etimad_db_rows_total", "Tender rows written by bulk upserts.", ("backend",))
+TENDERS = Counter("etimad_tenders_total", "Detail extractions by path and outcome.", ("path", "outcome"))
+RETRIES = Counter("etimad_retries_total", "Retried operations by stage and reason.", ("stage", "reason"))
+QUEUE_DEPTH = Gauge("etimad_queue_depth", "Items waiting in a pipeline queue.", ("queue",))
+CONCURRENCY_LIMIT = Gauge("etimad_concurrency_limit", "Current adaptive detail concurrency limit.")
+FUNCTION_SECONDS = Histogram("etimad_function_seconds", "Duration of functions wrapped by log_execution_time.", ("function",))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_response(404)
+            self.end_headers()
+            return
+        payload = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def start_metrics_server(port: int = None) -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics on a daemon thread (once per process); None while metrics are disabled."""
+    global _server
+    if not registry.enabled:
+        return None
+    if _server is None:
+        _server = ThreadingHTTPServer(("0.0.0.0", port or METRICS_CONFIG["port"]), _MetricsHandler)
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, daemon=True).start()
+        logger.info(f"📈 Metrics endpoint on :{_server.server_address[1]}/metrics")
+    return _server
+
+
+def tender_span(link: str):
+    """OpenTelemetry span around one tender's extraction, or a null context."""
+    if not METRICS_CONFIG["otel_enabled"] or otel_trace is None:
+        return nullcontext()
+    return otel_trace.get_tracer("etimad.scraper").start_as_current_span("tender", attributes={"tender.link": link})
@@ -1,10 +1,24 @@
+import argparse
 import asyncio
-from typing import List, Dict
+import time
+from typing import Dict, List
 from tqdm import tqdm
 from db import db_manager
-from extract_metadata import extract_all_metadata
-from extract_details import extract_all_details
-from config import LOGGING_CONFIG, SCRAPER_CONFIG
+from extract_metadata import discover_metadata
+from extract_details import extract_tender
+from http_details import create_http_client
+from browser_pool import BrowserPool
+from link_registry import LinkRegistry
+from concurrency import WorkQueueScheduler
+from readiness import step_latency
+from metrics import registry as metrics_registry, start_metrics_server, QUEUE_DEPTH, CONCURRENCY_LIMIT
+from journal import RunJournal, ResumeState
+from cache import bump_data_version
+from utils import log_execution_time
+from async_db import get_async_db, close_async_db
+from incremental import TenderStateIndex, mark_skipped
+from config import (LOGGING_CONFIG, SCRAPER_CONFIG, PIPELINE_CONFIG, INCREMENTAL_CONFIG, ADAPTIVE_CONCURRENCY_CONFIG,
+                    METRICS_CONFIG)
 import logging
 import logging.config
 
@@ -12,44 +26,247 @@ logging.config.dictConfig(LOGGING_CONFIG)
 logger = logging.getLogger("etimad.orchestrator")
 
 class ScraperOrchestrator:
+    """
+    Runs the scraper as a staged asyncio pipeline:
+
+        metadata searches --(detail_queue)--> detail scheduler --(persist_queue)--> DB writers
+
+    The detail stage is an adaptive (AIMD) work-queue scheduler; the other
+    stages have fixed limits. Each stage has its own concurrency limit and the bounded queues between
+    them provide backpressure, so tenders are saved while searches are still
+    running and memory stays flat regardless of the result count.
+    """
+
     def __init__(self):
         self.db = db_manager
         self.db.initialize_table()
+        self.journal = RunJournal()
+        self.run_id = None
 
     def normalize_tender_keys(self, tender: Dict[str, str]) -> Dict[str, str]:
         return {k.replace(" ", "_"): v for k, v in tender.items()}
 
-    async def run_pipeline(self) -> None:
-        try:
-            logger.info("Starting metadata collection phase")
-            metadata = await extract_all_metadata()
-
-            if not metadata:
-                logger.warning("No metadata found - aborting pipeline")
-                return
+    async def _produce_links(self, pool: BrowserPool, detail_queue: asyncio.Queue, registry: LinkRegistry,
+                             stats: Dict, keywords: List[str] = None, resume: ResumeState = None) -> int:
+        if resume:
+            # Links discovered before the interruption that still need their details
+            for record in resume.pending:
+                stats["fetched"] += 1
+                await detail_queue.put(record)
+            if resume.discovery_done:
+                logger.info(f"Resumed run {self.run_id}: searches already complete, "
+                            f"{len(resume.pending)} links left to fetch")
+                return len(registry)
 
-            logger.info("Starting detail extraction phase")
-            details = await extract_all_details(metadata)
+        skipped_links = []
+        state = None
+        if INCREMENTAL_CONFIG["enabled"]:
+            state = await TenderStateIndex().load(await get_async_db())
 
-            logger.info("Starting data persistence phase")
-            success_count = 0
-            for tender in tqdm(details, desc="Saving tenders"):
-                if not tender:
-                    logger.warning("Empty tender skipped")
+        async for record in discover_metadata(pool, PIPELINE_CONFIG["metadata_concurrency"], keywords):
+            # Queue each link once, on first sight; later keyword hits are only accumulated
+            first_seen = registry.register(record)
+            self.journal.discovered(self.run_id, record, first_seen)
+            if not first_seen:
+                continue
+            link = record["Link"]
+            if state:
+                fetch, reason = state.should_fetch(record)
+                if not fetch:
+                    skipped_links.append(link)
                     continue
+                logger.debug(f"Queueing {link} ({reason})")
+            stats["fetched"] += 1
+            await detail_queue.put(record)
+
+        stats["skipped"] += len(skipped_links)
+        await mark_skipped(await get_async_db(), skipped_links)
+        self.journal.skipped(self.run_id, skipped_links)
+        self.journal.mark_discovery_done(self.run_id)
+        logger.info(f"Total unique tenders found: {len(registry)} "
+                    f"({stats['fetched']} queued for details, {stats['skipped']} unchanged)")
+        return len(registry)
+
+    async def _report_scheduler(self, scheduler: WorkQueueScheduler, detail_queue: asyncio.Queue,
+                                persist_queue: asyncio.Queue) -> None:
+        last_log = time.monotonic()
+        while True:
+            await asyncio.sleep(METRICS_CONFIG["sample_interval"] if metrics_registry.enabled
+                                else ADAPTIVE_CONCURRENCY_CONFIG["stats_interval"])
+            QUEUE_DEPTH.set(detail_queue.qsize(), queue="detail")
+            QUEUE_DEPTH.set(scheduler.queue_depth, queue="scheduler")
+            QUEUE_DEPTH.set(persist_queue.qsize(), queue="persist")
+            CONCURRENCY_LIMIT.set(scheduler.current_limit)
+            if time.monotonic() - last_log >= ADAPTIVE_CONCURRENCY_CONFIG["stats_interval"]:
+                last_log = time.monotonic()
+                logger.info(f"Detail stage: concurrency limit {scheduler.current_limit}, "
+                            f"{detail_queue.qsize() + scheduler.queue_depth} links waiting")
+
+    async def _next_batch(self, persist_queue: asyncio.Queue) -> tuple:
+        """Collect up to db_batch_size tenders, flushing early when the queue goes quiet."""
+        batch = []
+        finished = False
+        while len(batch) < PIPELINE_CONFIG["db_batch_size"]:
+            try:
+                timeout = PIPELINE_CONFIG["db_flush_interval"] if batch else None
+                tender = await asyncio.wait_for(persist_queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if tender is None:
+                finished = True
+                break
+            batch.append(tender)
+        return batch, finished
+
+    async def _db_writer(self, persist_queue: asyncio.Queue, registry: LinkRegistry, stats: Dict,
+                         progress: tqdm) -> None:
+        finished = False
+        while not finished:
+            batch, finished = await self._next_batch(persist_queue)
+            if not batch:
+                continue
+            stats["received"] += len(batch)
+            try:
+                for tender in batch:
+                    keyword_ids = registry.keyword_ids(tender["Link"])
+                    if keyword_ids:
+                        tender["keyword_ids"] = keyword_ids
+                normalized = [self.normalize_tender_keys(tender) for tender in batch]
+                db = await get_async_db()
+                saved = await db.bulk_upsert_tenders(normalized, PIPELINE_CONFIG["db_batch_size"])
+                await db.bulk_link_tender_keywords(registry.pairs([tender["Link"] for tender in batch]))
+                self.journal.saved(self.run_id, [tender["Link"] for tender in batch if "Error" not in tender])
+                # Commit the batch's journal events in a worker thread instead of on the event loop
+                await asyncio.to_thread(self.journal.flush)
+                bump_data_version()
+                if not stats["saved"] and saved:
+                    logger.info(f"First tenders saved after {time.monotonic() - stats['started']:.1f}s")
+                stats["saved"] += saved
+            except Exception as e:
+                logger.error(f"Failed to save batch of {len(batch)} tenders. Error: {e}")
+            progress.update(len(batch))
+
+    def _resume(self, run_id: str, registry: LinkRegistry) -> ResumeState:
+        """Rebuild the link registry of an interrupted run and return its remaining work."""
+        if run_id == "latest":
+            run_id = self.journal.latest_unfinished()
+            if run_id is None:
+                logger.info("No unfinished run to resume, starting a new one")
+                return None
+        status = self.journal.status(run_id)
+        if status in (None, "success"):
+            # e.g. an Airflow retry of a try that died before journaling, or a cleared successful DAG run
+            logger.info(f"Run {run_id} has nothing to resume ({status or 'not in the journal'}), starting a new run")
+            return None
+        resume = self.journal.resume_state(run_id)
+        for record in resume.records:
+            registry.register(record)
+        for link, keyword_id in resume.keyword_pairs:
+            registry.register({"Link": link, "KeyWordID": keyword_id})
+        self.run_id = run_id
+        logger.info(f"Resuming run {run_id}: {len(resume.records)} links known, {len(resume.pending)} to fetch, "
+                    f"{len(resume.unsaved_results)} fetched but unsaved")
+        return resume
+
+    @log_execution_time
+    async def run_pipeline(self, keywords: List[str] = None, resume_run_id: str = None, run_id: str = None) -> Dict:
+        """
+        Run one scrape over `keywords` (default: the whole taxonomy); returns the
+        run stats. With `resume_run_id` (or "latest") an interrupted run is
+        continued from its journal instead of starting over. `run_id` names a
+        new run (default: timestamp-based), so a scheduler can resume exactly
+        the run it started.
+        """
+        start_metrics_server()
+        detail_queue: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_CONFIG["detail_queue_size"])
+        persist_queue: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_CONFIG["persist_queue_size"])
+        registry = LinkRegistry()
+        stats = {"received": 0, "saved": 0, "fetched": 0, "skipped": 0, "started": time.monotonic()}
+        self.journal.prune()
+        resume = self._resume(resume_run_id, registry) if resume_run_id else None
+        self.run_id = self.journal.start_run(self.run_id if resume else run_id, resumed=resume is not None)
+        logger.info(f"Run id: {self.run_id}")
+        http_client = create_http_client() if SCRAPER_CONFIG["detail_fetch_mode"] == "http" else None
+        tasks = []
+        found = 0
+
+        try:
+            async with BrowserPool() as pool:
                 try:
-                    normalized = self.normalize_tender_keys(tender)
-                    self.db.upsert_tender(normalized)
-                    success_count += 1
-                except Exception as e:
-                    logger.error(f"Failed to save tender: {tender.get('رقم المنافسة', 'UNKNOWN')}. Error: {e}")
+                    with tqdm(desc="Saving tenders") as progress:
+                        logger.info("Starting streaming pipeline")
+                        producer = asyncio.create_task(
+                            self._produce_links(pool, detail_queue, registry, stats, keywords, resume)
+                        )
+                        async def forward(item: Dict, result: Dict):
+                            if result:
+                                if "Error" not in result:
+                                    self.journal.fetched(self.run_id, item["Link"], result)
+                                await persist_queue.put(result)
+
+                        scheduler = WorkQueueScheduler(
+                            lambda item: extract_tender(item, pool, http_client), on_result=forward
+                        )
+                        details = asyncio.create_task(scheduler.run(detail_queue))
+                        reporter = asyncio.create_task(self._report_scheduler(scheduler, detail_queue, persist_queue))
+                        writers = [
+                            asyncio.create_task(self._db_writer(persist_queue, registry, stats, progress))
+                            for _ in range(PIPELINE_CONFIG["db_writers"])
+                        ]
+                        tasks = [producer, details, reporter, *writers]
+
+                        if resume:
+                            # Results fetched before the interruption only need to be written
+                            for result in resume.unsaved_results:
+                                await persist_queue.put(result)
+
+                        found = await producer
+                        if not found:
+                            logger.warning("No metadata found")
+
+                        # Drain each stage in order: one sentinel per downstream worker
+                        await detail_queue.put(None)
+                        await details
+                        reporter.cancel()
+                        for _ in writers:
+                            await persist_queue.put(None)
+                        await asyncio.gather(*writers)
+                finally:
+                    for task in tasks:
+                        if not task.done():
+                            task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
 
-            logger.info(f"✅ Pipeline completed. Successfully saved {success_count}/{len(details)} tenders")
+            logger.info(f"✅ Pipeline completed. Successfully saved {stats['saved']}/{stats['received']} tenders")
+            logger.info(f"Step latencies:\n{step_latency.summary()}")
+            db = await get_async_db()
+            # Keywords that matched after a tender was written (or tenders skipped as unchanged)
+            await db.bulk_link_tender_keywords(registry.pairs())
+            await db.log_scraping(
+                count=found,
+                status="success",
+                fetched_count=stats["fetched"],
+                skipped_count=stats["skipped"],
+                note="Pipeline run summary"
+            )
+            bump_data_version()
+            self.journal.finish_run(self.run_id, "success")
+            return stats
 
-        except Exception as e:
+        except BaseException as e:
             logger.error(f"Pipeline failed: {str(e)}")
+            self.journal.finish_run(self.run_id, "failed")
+            logger.info(f"Resume with: python orchestrator.py --resume {self.run_id}")
             raise
+        finally:
+            if http_client:
+                await http_client.aclose()
+            await close_async_db()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Etimad scraping pipeline")
+    parser.add_argument("--resume", metavar="RUN_ID",
+                        help="Continue an interrupted run from its journal ('latest' = most recent unfinished run)")
+    args = parser.parse_args()
     orchestrator = ScraperOrchestrator()
-    asyncio.run(orchestrator.run_pipeline())
+    asyncio.run(orchestrator.run_pipeline(resume_run_id=args.resume))
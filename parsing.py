@@ -0,0 +1,146 @@
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional
+
+SECTION_1_FIELDS = [
+    "اسم المنافسة", "رقم المنافسة", "الرقم المرجعي", "الغرض من المنافسة",
+    "قيمة وثائق المنافسة", "حالة المنافسة", "مدة العقد",
+    "هل التأمين من متطلبات المنافسة", "نوع المنافسة", "الجهة الحكوميه"
+]
+
+SECTION_2_FIELDS = [
+    "آخر موعد لإستلام الإستفسارات", "آخر موعد لتقديم العروض", "تاريخ فتح العروض",
+    "تاريخ فحص العروض", "فترة التوقف", "التاريخ المتوقع للترسية",
+    "تاريخ بدء الأعمال / الخدمات", "بداية إرسال الأسئلة و الاستفسارات",
+    "اقصى مدة للاجابة على الاستفسارات", "مكان فتح العرض"
+]
+
+REQUIRED_FIELDS = ["رقم المنافسة", "اسم المنافسة", "الجهة الحكوميه"]
+
+DATE_FIELDS = frozenset([
+    "آخر موعد لإستلام الإستفسارات", "آخر موعد لتقديم العروض", "تاريخ فتح العروض",
+    "تاريخ فحص العروض", "التاريخ المتوقع للترسية", "تاريخ بدء الأعمال / الخدمات",
+    "بداية إرسال الأسئلة و الاستفسارات"
+])
+
+DECIMAL_FIELDS = frozenset(["قيمة وثائق المنافسة"])
+
+NONE_VALUE = "لا يوجد"
+FREE_VALUE = "مجانا"
+
+# Etimad mixes Arabic-Indic and Latin digits and uses Arabic AM/PM markers
+_DIGITS = str.maketrans("٠١٢٣٤٥٦٧٨٩٫٬", "0123456789.,")
+_DATE_RE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+_TIME_RE = re.compile(r"(\d{1,2}):(\d{2})\s*(AM|PM|ص|م)?", re.IGNORECASE)
+_NON_NUMERIC_RE = re.compile(r"[^\d.]")
+_PM_MARKERS = frozenset(["PM", "م"])
+
+# Hijri years on Etimad are 14xx; anything at or above this is the Gregorian date
+_MIN_GREGORIAN_YEAR = 1900
+
+
+@lru_cache(maxsize=8192)
+def parse_arabic_datetime(value: str) -> Optional[datetime]:
+    """
+    Extract the Gregorian date and time (if any) from an Etimad value such as
+    "27/07/2025 02/02/1447 09:59 AM". The Hijri date between the two is
+    skipped; returns None for 'لا يوجد', Hijri-only or unparsable values. Memoized, since the same
+    handful of deadlines repeat across thousands of tenders.
+    """
+    if not value or not isinstance(value, str):
+        return None
+    value = value.translate(_DIGITS).strip()
+    if value == NONE_VALUE:
+        return None
+
+    for match in _DATE_RE.finditer(value):
+        day, month, year = (int(g) for g in match.groups())
+        if year < _MIN_GREGORIAN_YEAR:
+            continue
+        hour = minute = 0
+        time_match = _TIME_RE.search(value, match.end())
+        if time_match:
+            hour, minute = int(time_match.group(1)), int(time_match.group(2))
+            marker = time_match.group(3)
+            if marker:
+                if hour > 12:
+                    return None
+                hour = hour % 12 + (12 if marker.upper() in _PM_MARKERS else 0)
+        try:
+            return datetime(year, month, day, hour, minute)
+        except ValueError:
+            return None
+    return None
+
+
+def parse_decimal(value: Any) -> Optional[float]:
+    """
+    Convert a value to a DECIMAL-compatible float. Empty and 'مجانا' are 0.0,
+    anything without digits is None.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not value or not isinstance(value, str):
+        return 0.0
+    value = value.translate(_DIGITS).strip()
+    if value == FREE_VALUE:
+        return 0.0
+    cleaned = _NON_NUMERIC_RE.sub("", value)
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
+
+
+FIELD_PARSERS: Dict[str, Callable[[str], Any]] = {
+    **{key: parse_arabic_datetime for key in DATE_FIELDS},
+    **{key: parse_decimal for key in DECIMAL_FIELDS},
+}
+
+
+@lru_cache(maxsize=None)
+def _key_set(keys: tuple) -> FrozenSet[str]:
+    return frozenset(keys)
+
+
+def extract_fields(raw_text: str, keys: Iterable[str], typed: bool = False) -> Dict[str, Any]:
+    """
+    Single pass over section text laid out as alternating "label" / "value"
+    lines. Labels are matched against a frozen set; with `typed`, date and
+    decimal fields are converted on the way (see FIELD_PARSERS).
+    """
+    key_set = keys if isinstance(keys, frozenset) else _key_set(tuple(keys))
+    result = {}
+    lines = iter(raw_text.strip().splitlines())
+    for line in lines:
+        key = line.strip()
+        if key not in key_set:
+            continue
+        value = next(lines, None)
+        if value is None:
+            break
+        value = value.strip()
+        if typed and key in FIELD_PARSERS:
+            value = FIELD_PARSERS[key](value)
+        result[key] = value
+    return result
+
+
+SECTION_1_KEYS = frozenset(SECTION_1_FIELDS)
+SECTION_2_KEYS = frozenset(SECTION_2_FIELDS)
+
+
+def parse_sections(sections: Dict[str, str], typed: bool = False) -> Dict[str, Any]:
+    """Fields of both detail tabs ({"d-1": text, "d-2": text}) in one dict."""
+    fields = extract_fields(sections.get("d-1", ""), SECTION_1_KEYS, typed)
+    fields.update(extract_fields(sections.get("d-2", ""), SECTION_2_KEYS, typed))
+    return fields
+
+
+def is_valid_tender(tender: Dict[str, Any]) -> bool:
+    """A tender is trusted only if it carries the core fields and at least one date field."""
+    return (
+        all(tender.get(field) for field in REQUIRED_FIELDS)
+        and any(field in tender for field in SECTION_2_FIELDS)
+    )
@@ -0,0 +1,197 @@
+"""
+Read-side queries for the dashboard: filtered tender listings and the
+scraping history, paginated by keyset (WHERE (sort_key, id) < last seen)
+instead of OFFSET, so page N costs the same as page 1 on a large table.
+
+Every filter maps onto a composite index created by
+DatabaseManager.initialize_table (see db.QUERY_INDEXES); rows come
+back as typed NamedTuples straight from the driver's column conversion.
+"""
+import logging
+import logging.config
+from datetime import datetime
+from decimal import Decimal
+from typing import List, NamedTuple, Optional, Tuple
+from config import LOGGING_CONFIG
+from db import db_manager, DatabaseManager
+
+logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger("etimad.queries")
+
+# Sort orders: name -> (sort column or None for id only, descending)
+TENDER_ORDERS = {
+    "latest": (None, True),
+    "deadline": ("last_submission_date", False),
+}
+
+MAX_PAGE_SIZE = 500
+
+
+class TenderRow(NamedTuple):
+    id: int
+    link: str
+    tender_name: str
+    tender_number: str
+    government_entity: str
+    status: str
+    tender_type: Optional[str]
+    document_value: Optional[Decimal]
+    last_submission_date: Optional[datetime]
+    opening_date: Optional[datetime]
+    last_seen_at: Optional[datetime]
+    created_at: Optional[datetime]
+
+
+class ScrapingLogRow(NamedTuple):
+    id: int
+    classification: Optional[str]
+    keyword: Optional[str]
+    tender_count: int
+    page_count: Optional[int]
+    fetched_count: Optional[int]
+    skipped_count: Optional[int]
+    status: str
+    error_message: Optional[str]
+    created_at: Optional[datetime]
+
+
+class TenderFilters(NamedTuple):
+    government_entity: Optional[str] = None
+    status: Optional[str] = None
+    deadline_from: Optional[datetime] = None
+    deadline_to: Optional[datetime] = None
+    classification_id: Optional[int] = None
+    keyword_id: Optional[int] = None
+
+
+class Page(NamedTuple):
+    rows: List[NamedTuple]
+    next_cursor: Optional[Tuple]        # Pass back as `after` for the next page; None on the last page
+
+
+TENDER_COLUMNS = ", ".join(f"t.{field}" for field in TenderRow._fields)
+
+SCRAPING_LOG_QUERY = """
+    SELECT l.id, c.name_ar AS classification, k.keyword_ar AS keyword, l.tender_count, l.page_count,
+           l.fetched_count, l.skipped_count, l.status, l.error_message, l.created_at
+    FROM scraping_logs AS l
+    LEFT JOIN etimad_classification_keywords AS k ON k.id = l.key_word_id
+    LEFT JOIN etimad_classifications AS c ON c.id = COALESCE(l.classification_id, k.classification_id)
+"""
+
+
+def _clamp(limit: int) -> int:
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def filter_clauses(filters: TenderFilters) -> Tuple[List[str], List]:
+    """WHERE conditions (on alias `t`) and params for `filters`; shared with search.py."""
+    where, params = [], []
+    if filters.government_entity:
+        where.append("t.government_entity = %s")
+        params.append(filters.government_entity)
+    if filters.status:
+        where.append("t.status = %s")
+        params.append(filters.status)
+    if filters.deadline_from:
+        where.append("t.last_submission_date >= %s")
+        params.append(filters.deadline_from)
+    if filters.deadline_to:
+        where.append("t.last_submission_date < %s")
+        params.append(filters.deadline_to)
+    if filters.keyword_id is not None:
+        where.append("t.id IN (SELECT tk.tender_id FROM tender_keywords AS tk WHERE tk.keyword_id = %s)")
+        params.append(filters.keyword_id)
+    if filters.classification_id is not None:
+        where.append("""t.id IN (SELECT tk.tender_id FROM tender_keywords AS tk
+                        JOIN etimad_classification_keywords AS k ON k.id = tk.keyword_id
+                        WHERE k.classification_id = %s)""")
+        params.append(filters.classification_id)
+    return where, params
+
+
+def build_tender_query(filters: TenderFilters, order: str = "latest", after: Tuple = None,
+                       limit: int = 100) -> Tuple[str, List]:
+    """SQL + params for one page of tenders; `after` is the previous page's next_cursor."""
+    if order not in TENDER_ORDERS:
+        raise ValueError(f"Unknown tender order: {order}")
+    sort_column, descending = TENDER_ORDERS[order]
+    where, params = filter_clauses(filters)
+
+    direction = "DESC" if descending else "ASC"
+    comparison = "<" if descending else ">"
+    if sort_column:
+        # Rows without a deadline can't be placed in deadline order
+        where.append(f"t.{sort_column} IS NOT NULL")
+        if after:
+            where.append(f"(t.{sort_column}, t.id) {comparison} (%s, %s)")
+            params.extend(after)
+        order_by = f"t.{sort_column} {direction}, t.id {direction}"
+    else:
+        if after:
+            where.append(f"t.id {comparison} %s")
+            params.append(after[0])
+        order_by = f"t.id {direction}"
+
+    sql = f"SELECT {TENDER_COLUMNS} FROM tenders AS t"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    # One extra row tells whether another page exists without a COUNT(*)
+    sql += f" ORDER BY {order_by} LIMIT %s"
+    params.append(_clamp(limit) + 1)
+    return sql, params
+
+
+class TenderQueries:
+    """Blocking read API over DatabaseManager; safe to share between Gradio worker threads."""
+
+    def __init__(self, db: DatabaseManager = db_manager):
+        self.db = db
+
+    def _page(self, sql: str, params: List, row_type, limit: int, cursor_of) -> Page:
+        limit = _clamp(limit)
+        rows = [row_type(*row) for row in self.db.fetch_all(sql, params)]
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return Page(rows, cursor_of(rows[-1]))
+        return Page(rows, None)
+
+    def tenders(self, filters: TenderFilters = TenderFilters(), order: str = "latest",
+                after: Tuple = None, limit: int = 100) -> Page:
+        sql, params = build_tender_query(filters, order, after, limit)
+        sort_column = TENDER_ORDERS[order][0]
+        if sort_column:
+            cursor_of = lambda row: (getattr(row, sort_column), row.id)
+        else:
+            cursor_of = lambda row: (row.id,)
+        return self._page(sql, params, TenderRow, limit, cursor_of)
+
+    def tender_by_link(self, link: str) -> Optional[TenderRow]:
+        rows = self.db.fetch_all(f"SELECT {TENDER_COLUMNS} FROM tenders AS t WHERE t.link = %s LIMIT 1", (link,))
+        return TenderRow(*rows[0]) if rows else None
+
+    def scraping_history(self, status: str = None, after: Tuple = None, limit: int = 50) -> Page:
+        where, params = [], []
+        if status:
+            where.append("l.status = %s")
+            params.append(status)
+        if after:
+            where.append("l.id < %s")
+            params.append(after[0])
+        sql = SCRAPING_LOG_QUERY
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY l.id DESC LIMIT %s"
+        params.append(_clamp(limit) + 1)
+        return self._page(sql, params, ScrapingLogRow, limit, lambda row: (row.id,))
+
+    def distinct_values(self, column: str, limit: int = 200) -> List[str]:
+        """Values of an indexed low-cardinality column (status, government_entity) for filter dropdowns."""
+        if column not in ("status", "government_entity"):
+            raise ValueError(f"No filter index on tenders.{column}")
+        # Loose index scan over the (column, id) index
+        rows = self.db.fetch_all(f"SELECT DISTINCT {column} FROM tenders ORDER BY {column} LIMIT %s", (limit,))
+        return [row[0] for row in rows if row[0]]
+
+
+tender_queries = TenderQueries()
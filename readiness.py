@@ -0,0 +1,114 @@
+import bisect
+import time
+import logging
+import logging.config
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+from playwright.async_api import Page, Response, TimeoutError as PlaywrightTimeoutError
+from config import LOGGING_CONFIG, READINESS_CONFIG
+from metrics import LATENCY_BUCKETS, STEP_SECONDS
+
+logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger("etimad.readiness")
+
+class LatencyHistogram:
+    """Fixed-bucket histogram with approximate percentiles (bucket upper bound)."""
+
+    def __init__(self, buckets: List[float] = None):
+        self.buckets = buckets or LATENCY_BUCKETS
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        running = 0
+        for i, n in enumerate(self.counts):
+            running += n
+            if running >= target:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+
+class StepLatencies:
+    """Per-step latency histograms for the scraping flows (search.*, detail.*)."""
+
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    def record(self, step: str, seconds: float) -> None:
+        self.histograms.setdefault(step, LatencyHistogram()).record(seconds)
+        STEP_SECONDS.observe(seconds, step=step)
+
+    @asynccontextmanager
+    async def timed(self, step: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(step, time.perf_counter() - start)
+
+    def summary(self) -> str:
+        lines = []
+        for step, h in sorted(self.histograms.items()):
+            mean = h.total / h.count if h.count else 0.0
+            lines.append(f"{step:<22} n={h.count:<6} mean={mean:6.2f}s "
+                         f"p50<={h.percentile(0.5):g}s p95<={h.percentile(0.95):g}s")
+        return "\n".join(lines)
+
+
+step_latency = StepLatencies()
+
+
+async def wait_for_count_settled(page: Page, selector: str, quiet_ms: int = None, timeout: int = None) -> int:
+    """
+    Resolve once the number of elements matching `selector` has not changed
+    for `quiet_ms` (or for the longer `empty_quiet_ms` while nothing matches),
+    i.e. the result list finished rendering. Returns the settled count.
+    """
+    quiet_ms = READINESS_CONFIG["settle_quiet_ms"] if quiet_ms is None else quiet_ms
+    timeout = READINESS_CONFIG["settle_timeout_ms"] if timeout is None else timeout
+    handle = await page.wait_for_function(
+        """([selector, quietMs, emptyQuietMs]) => {
+            const count = document.querySelectorAll(selector).length;
+            const state = window.__etimadSettle || (window.__etimadSettle = {});
+            const now = performance.now();
+            if (state[selector] === undefined || state[selector].count !== count) {
+                state[selector] = {count: count, since: now};
+                return false;
+            }
+            const stableFor = now - state[selector].since;
+            return stableFor >= (count > 0 ? quietMs : emptyQuietMs) ? {count: count} : false;
+        }""",
+        arg=[selector, quiet_ms, READINESS_CONFIG["empty_quiet_ms"]],
+        timeout=timeout,
+        polling=READINESS_CONFIG["poll_ms"],
+    )
+    settled = await handle.json_value()
+    # Reset so the next wait on this page (e.g. after paging) starts fresh
+    await page.evaluate("(selector) => { if (window.__etimadSettle) delete window.__etimadSettle[selector]; }", selector)
+    return settled["count"]
+
+
+async def click_and_wait_for_response(page: Page, selector: str, url_pattern: str,
+                                      timeout: int = None) -> Optional[Response]:
+    """
+    Click `selector` and wait for the XHR whose URL contains `url_pattern`.
+    Returns None (instead of failing) when no such response arrives, so the
+    caller can fall back to a DOM condition.
+    """
+    timeout = READINESS_CONFIG["response_timeout_ms"] if timeout is None else timeout
+    try:
+        async with page.expect_response(lambda r: url_pattern in r.url, timeout=timeout) as info:
+            await page.click(selector)
+        return await info.value
+    except PlaywrightTimeoutError:
+        logger.debug(f"No response matching '{url_pattern}' after clicking {selector}")
+        return None
@@ -0,0 +1,105 @@
+import logging
+import logging.config
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from playwright.async_api import BrowserContext, Route, Error as PlaywrightError
+from config import LOGGING_CONFIG, SCRAPE_PROFILE_CONFIG
+
+logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger("etimad.scrape_profile")
+
+NO_ANIMATIONS_SCRIPT = """
+(() => {
+    const style = document.createElement('style');
+    style.textContent = '*, *::before, *::after { animation: none !important; transition: none !important; scroll-behavior: auto !important; }';
+    document.addEventListener('DOMContentLoaded', () => document.head.appendChild(style));
+})();
+"""
+
+CACHEABLE_RESOURCE_TYPES = {"script", "stylesheet"}
+
+
+class StaticAssetCache:
+    """Process-wide LRU of static responses so recycled contexts don't re-download the same bundles."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, url: str) -> Optional[Dict]:
+        entry = self._entries.get(url)
+        if entry is not None:
+            self._entries.move_to_end(url)
+            self.hits += 1
+        else:
+            self.misses += 1
+        return entry
+
+    def put(self, url: str, entry: Dict) -> None:
+        self._entries[url] = entry
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class ScrapeProfile:
+    """
+    Browser launch and context settings for scraping: headless, no GPU,
+    no animations, and request interception that aborts resource types and
+    URL patterns the extractors never read.
+    """
+
+    def __init__(self, config: Dict = None):
+        config = {**SCRAPE_PROFILE_CONFIG, **(config or {})}
+        self.headless: bool = config["headless"]
+        self.launch_args: List[str] = list(config["launch_args"])
+        self.blocked_resource_types = set(config["blocked_resource_types"])
+        self.blocked_url_patterns: List[str] = list(config["blocked_url_patterns"])
+        self.disable_animations: bool = config["disable_animations"]
+        self.asset_cache = StaticAssetCache(config["static_cache_max_entries"]) if config["cache_static_assets"] else None
+        self.blocked_requests = 0
+
+    def launch_options(self) -> Dict:
+        return {"headless": self.headless, "args": self.launch_args}
+
+    def context_options(self) -> Dict:
+        return {"reduced_motion": "reduce"} if self.disable_animations else {}
+
+    def _is_blocked(self, url: str, resource_type: str) -> bool:
+        return resource_type in self.blocked_resource_types or any(p in url for p in self.blocked_url_patterns)
+
+    async def _handle_route(self, route: Route) -> None:
+        request = route.request
+        try:
+            if self._is_blocked(request.url, request.resource_type):
+                self.blocked_requests += 1
+                await route.abort()
+                return
+
+            if self.asset_cache is None or request.resource_type not in CACHEABLE_RESOURCE_TYPES or request.method != "GET":
+                await route.continue_()
+                return
+
+            cached = self.asset_cache.get(request.url)
+            if cached is None:
+                response = await route.fetch()
+                if response.status != 200:
+                    await route.fulfill(response=response)
+                    return
+                cached = {"status": response.status, "headers": response.headers, "body": await response.body()}
+                self.asset_cache.put(request.url, cached)
+            await route.fulfill(status=cached["status"], headers=cached["headers"], body=cached["body"])
+        except PlaywrightError as e:
+            # The page may have navigated away or closed while the request was in flight
+            logger.debug(f"Route handling skipped for {request.url}: {e}")
+
+    async def apply(self, context: BrowserContext) -> None:
+        if self.disable_animations:
+            await context.add_init_script(NO_ANIMATIONS_SCRIPT)
+        if self.blocked_resource_types or self.blocked_url_patterns or self.asset_cache is not None:
+            await context.route("**/*", self._handle_route)
+
+
+default_profile = ScrapeProfile()
@@ -0,0 +1,105 @@
+"""
+Ranked Arabic search over tender names and purposes.
+
+Both sides go through arabic.tokenize (alef/yaa/taa-marbuta folding,
+diacritic stripping, light stemming): map_tender stores the tokens of every
+upserted tender in tenders.search_text, and queries are tokenized the same
+way before MATCH ... AGAINST on its FULLTEXT index (ngram parser by
+default, see SEARCH_CONFIG). Rows written before the column existed are
+filled by `python search.py reindex`.
+
+    python search.py "صيانة المستشفيات" --limit 20
+    python search.py reindex [--rebuild]
+"""
+import argparse
+import logging
+import logging.config
+import time
+from typing import List, NamedTuple, Tuple
+from arabic import tokenize, search_document
+from config import LOGGING_CONFIG, SEARCH_CONFIG
+from db import db_manager, DatabaseManager
+from queries import TenderFilters, TenderRow, TENDER_COLUMNS, filter_clauses
+
+logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger("etimad.search")
+
+# ngram_token_size defaults to 2; shorter tokens can never match
+MIN_TOKEN_LENGTH = 2
+
+
+class SearchHit(NamedTuple):
+    score: float
+    tender: TenderRow
+
+
+def build_match_expression(text: str) -> str:
+    """Boolean-mode expression requiring every distinct query token as a phrase."""
+    tokens = [token for token in dict.fromkeys(tokenize(text)) if len(token) >= MIN_TOKEN_LENGTH]
+    # Tokens are word characters only, so quoting them needs no escaping
+    return " ".join(f'+"{token}"' for token in tokens)
+
+
+def build_search_query(expression: str, filters: TenderFilters, limit: int) -> Tuple[str, List]:
+    where, params = filter_clauses(filters)
+    match = "MATCH(t.search_text) AGAINST (%s IN BOOLEAN MODE)"
+    sql = f"""
+        SELECT {match} AS score, {TENDER_COLUMNS}
+        FROM tenders AS t
+        WHERE {" AND ".join([match] + where)}
+        ORDER BY score DESC, t.id DESC
+        LIMIT %s
+    """
+    return sql, [expression, expression] + params + [limit]
+
+
+class TenderSearch:
+    def __init__(self, db: DatabaseManager = db_manager):
+        self.db = db
+
+    def search(self, text: str, filters: TenderFilters = TenderFilters(), limit: int = None) -> List[SearchHit]:
+        """Best matches first; empty when the query has no searchable tokens."""
+        expression = build_match_expression(text)
+        if not expression:
+            return []
+        sql, params = build_search_query(expression, filters, limit or SEARCH_CONFIG["max_results"])
+        start = time.perf_counter()
+        rows = self.db.fetch_all(sql, params)
+        logger.debug(f"Search {expression!r}: {len(rows)} hits in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return [SearchHit(float(row[0]), TenderRow(*row[1:])) for row in rows]
+
+    def reindex(self, rebuild: bool = False, batch_size: int = None) -> int:
+        """Fill search_text for tenders missing it (or every tender with `rebuild`), in id order."""
+        batch_size = batch_size or SEARCH_CONFIG["reindex_batch_size"]
+        condition = "" if rebuild else "AND search_text IS NULL"
+        last_id, updated = 0, 0
+        while True:
+            rows = self.db.fetch_all(
+                f"SELECT id, tender_name, purpose FROM tenders WHERE id > %s {condition} ORDER BY id LIMIT %s",
+                (last_id, batch_size))
+            if not rows:
+                break
+            self.db.execute_many("UPDATE tenders SET search_text = %s WHERE id = %s",
+                                 [(search_document(name, purpose), tender_id) for tender_id, name, purpose in rows])
+            last_id = rows[-1][0]
+            updated += len(rows)
+            logger.info(f"Reindexed {updated} tenders (up to id {last_id})")
+        return updated
+
+
+tender_search = TenderSearch()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("query", help='Search text, or "reindex"')
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--rebuild", action="store_true", help="With reindex: recompute every row")
+    args = parser.parse_args()
+
+    if args.query == "reindex":
+        db_manager.initialize_table()
+        print(f"Reindexed {tender_search.reindex(rebuild=args.rebuild)} tenders")
+    else:
+        for hit in tender_search.search(args.query, limit=args.limit):
+            print(f"{hit.score:8.3f}  {hit.tender.tender_number:<20} {hit.tender.tender_name}")
@@ -0,0 +1,74 @@
+import json
+import os
+import threading
+import logging
+import logging.config
+from typing import Dict, List
+from config import LOGGING_CONFIG, TAXONOMY_CONFIG
+from db import db_manager
+from keyword_index import keyword_index, KeywordIndex, KEYWORD_INDEX_QUERY, KEYWORD_VERSION_QUERY
+
+logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger("etimad.taxonomy")
+
+
+class TaxonomyProvider:
+    """
+    Lazily loads the classification -> keywords taxonomy on first use.
+
+    The keyword index rows are cached on disk together with the taxonomy
+    version (see KEYWORD_VERSION_QUERY). A warm start costs one version
+    query; the join only runs when the tables changed or the cache is
+    missing. Nothing touches the database at import time.
+    """
+
+    def __init__(self, index: KeywordIndex = keyword_index, cache_path: str = None):
+        self.index = index
+        self.cache_path = cache_path or TAXONOMY_CONFIG["cache_path"]
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _read_cache(self) -> Dict:
+        if not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable taxonomy cache {self.cache_path}: {e}")
+            return {}
+
+    def _write_cache(self) -> None:
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": list(self.index.version), "rows": self.index.rows()}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
+
+    def load(self) -> KeywordIndex:
+        if self._loaded and not self.index.is_stale():
+            return self.index
+        with self._lock:
+            if self._loaded and not self.index.is_stale():
+                return self.index
+            if not self._loaded:
+                version = self.index.version_of(db_manager.fetch_all(KEYWORD_VERSION_QUERY, dictionary=True))
+                cache = self._read_cache()
+                if cache and tuple(cache.get("version", ())) == version:
+                    self.index.load_rows(cache["rows"], version)
+                    logger.debug("Taxonomy served from disk cache")
+                else:
+                    self.index.load_rows(db_manager.fetch_all(KEYWORD_INDEX_QUERY, dictionary=True), version)
+                    self._write_cache()
+                self._loaded = True
+            else:
+                previous = self.index.version
+                self.index.refresh(db_manager)
+                if self.index.version != previous:
+                    self._write_cache()
+        return self.index
+
+    def main_to_sub(self) -> Dict[str, List[str]]:
+        return self.load().main_to_sub()
+
+
+taxonomy = TaxonomyProvider()
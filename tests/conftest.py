@@ -0,0 +1,11 @@
+import logging
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def etimad_logs_to_caplog(monkeypatch):
+    """Route the "etimad" loggers to pytest (caplog) instead of the repo's etimad_scraper.log."""
+    logger = logging.getLogger("etimad")
+    monkeypatch.setattr(logger, "handlers", [])
+    monkeypatch.setattr(logger, "propagate", True)
@@ -0,0 +1,57 @@
+import pytest
+
+from arabic import light_stem, normalize, search_document, tokenize
+from benchmarks.bench_search import QUERIES
+
+# Expected tokens for every benchmark query (bench_search.QUERIES)
+BENCHMARK_TOKENS = {
+    "صيانة المستشفيات": ["صيان", "مستشف"],
+    "توريد اجهزة الحاسب": ["توريد", "اجهز", "حاسب"],
+    "المدارس": ["مدارس"],
+    "شبكة مياه": ["شبك", "ميا"],
+    "الجسر": ["جسر"],
+    "تأهيل المباني": ["تاهيل", "مبان"],
+    "مختبر": ["مختبر"],
+    "انظمة مراقبة الرياض": ["انظم", "مراقب", "رياض"],
+    "نظافه الحدائق": ["نظاف", "حدايق"],
+    "محطة كهرباء": ["محط", "كهرباء"],
+}
+
+ARTICLES = {"ال", "وال", "بال", "كال", "فال", "لل", "و"}
+
+
+def test_benchmark_queries_are_covered():
+    assert set(BENCHMARK_TOKENS) == set(QUERIES)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_tokenize_benchmark_queries(query):
+    tokens = tokenize(query)
+    assert tokens == BENCHMARK_TOKENS[query]
+    assert not ARTICLES & set(tokens)
+
+
+@pytest.mark.parametrize("text, variant", [
+    ("المستشفيات", "مستشفى"),
+    ("للمستشفيات", "مستشفى"),
+    ("الحاسب الآلي", "حاسب آلي"),
+    ("الأنظمة", "انظمه"),
+    ("والمباني", "مباني"),
+    ("صيانة", "صيانه"),
+    ("مُختبَر", "مختبر"),
+])
+def test_spelling_and_affix_variants_match(text, variant):
+    assert tokenize(text) == tokenize(variant)
+
+
+def test_article_is_never_the_stem():
+    assert light_stem(normalize("الآلي")) == "الي"
+    assert light_stem("الي") == "الي"
+
+
+def test_latin_and_digits_pass_through():
+    assert tokenize("SAP نظام ٢٠٢٥") == ["sap", "نظام", "2025"]
+
+
+def test_search_document_joins_fields():
+    assert search_document("صيانة المستشفيات", None, "الجسر") == "صيان مستشف جسر"
@@ -0,0 +1,56 @@
+import threading
+from datetime import datetime
+
+from archive import KIND_DETAIL, KIND_TAB_D2, PageArchive, iter_archived_pages
+
+
+def run_with_timeout(func, timeout=10):
+    """Run `func` in a thread so a lock-ordering bug fails the test instead of hanging it."""
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("value", func()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "archive call did not return (deadlock?)"
+    return result["value"]
+
+
+def test_fresh_archive_put_snapshot_stats(tmp_path):
+    archive = PageArchive(root=str(tmp_path), level=3)
+    fetched_at = datetime(2025, 8, 1, 12, 0)
+
+    digest = run_with_timeout(lambda: archive.put(KIND_DETAIL, "123", "https://example/1", "<html>x</html>", fetched_at))
+    html = run_with_timeout(lambda: archive.snapshot("123", KIND_DETAIL, fetched_at.isoformat(timespec="microseconds")))
+    stats = run_with_timeout(archive.stats)
+
+    assert len(digest) == 64
+    assert html == "<html>x</html>"
+    assert stats["snapshots"] == 1 and stats["blobs"] == 1
+    archive.close()
+
+
+def test_stats_on_fresh_archive(tmp_path):
+    archive = PageArchive(root=str(tmp_path))
+    assert run_with_timeout(archive.stats) == {"snapshots": 0, "blobs": 0, "raw_bytes": 0, "stored_bytes": 0}
+    archive.close()
+
+
+def test_identical_pages_share_a_blob(tmp_path):
+    archive = PageArchive(root=str(tmp_path))
+    first = archive.put(KIND_DETAIL, "1", "u1", "<same/>", datetime(2025, 8, 1))
+    second = archive.put(KIND_DETAIL, "2", "u2", "<same/>", datetime(2025, 8, 2))
+    assert first == second
+    assert archive.stats()["blobs"] == 1
+    archive.close()
+
+
+def test_iter_archived_pages_pairs_latest_detail_with_its_tab(tmp_path):
+    archive = PageArchive(root=str(tmp_path))
+    old, new = datetime(2025, 8, 1), datetime(2025, 8, 2)
+    archive.put(KIND_DETAIL, "7", "u", "<old/>", old)
+    archive.put(KIND_DETAIL, "7", "u", "<new/>", new)
+    archive.put(KIND_TAB_D2, "7", "u", "<tab/>", new)
+
+    pages = list(iter_archived_pages(archive))
+
+    assert pages == [("STenderId=7.html", b"<new/>", b"<tab/>")]
+    archive.close()
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+import async_db
+from async_db import AsyncDatabaseManager, close_async_db, get_async_db
+from config import DB_CONFIG
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    """aiomysql-backed manager whose pool creation only records calls (no MySQL needed)."""
+    calls = {"create": 0, "seen_without_pool": 0}
+
+    async def create_pool(**kwargs):
+        calls["create"] += 1
+        await asyncio.sleep(0.01)
+        return object()
+
+    async def close(self):
+        self.pool = None
+
+    monkeypatch.setattr(async_db.aiomysql, "create_pool", create_pool)
+    monkeypatch.setattr(AsyncDatabaseManager, "close", close)
+    monkeypatch.setitem(DB_CONFIG, "async_backend", "aiomysql")
+    monkeypatch.setattr(async_db, "_async_db", None)
+    return calls
+
+
+def test_concurrent_callers_share_one_initialised_manager(fake_pool):
+    async def caller():
+        db = await get_async_db()
+        if db.pool is None:
+            fake_pool["seen_without_pool"] += 1
+        return db
+
+    async def main():
+        managers = await asyncio.gather(*(caller() for _ in range(5)))
+        await close_async_db()
+        return managers
+
+    managers = asyncio.run(main())
+
+    assert fake_pool["create"] == 1
+    assert fake_pool["seen_without_pool"] == 0
+    assert all(db is managers[0] for db in managers)
+    assert async_db._async_db is None
+
+
+def test_failed_init_is_not_published(fake_pool, monkeypatch):
+    async def create_pool(**kwargs):
+        raise async_db.aiomysql.OperationalError("Can't connect to MySQL server")
+
+    monkeypatch.setattr(async_db.aiomysql, "create_pool", create_pool)
+    with pytest.raises(async_db.aiomysql.OperationalError):
+        asyncio.run(get_async_db())
+    assert async_db._async_db is None
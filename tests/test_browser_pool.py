@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+import browser_pool
+from browser_pool import BrowserPool, close_browser_pool, get_browser_pool, pool_or_shared
+
+
+@pytest.fixture
+def fake_launch(monkeypatch):
+    """BrowserPool whose start/close only record calls (no Chromium needed)."""
+    calls = {"start": 0, "close": 0}
+
+    async def start(self):
+        calls["start"] += 1
+        await asyncio.sleep(0.01)
+        self.loop = asyncio.get_running_loop()
+        self.started = True
+        return self
+
+    async def close(self):
+        if self.started:
+            calls["close"] += 1
+            self.started = False
+
+    monkeypatch.setattr(BrowserPool, "start", start)
+    monkeypatch.setattr(BrowserPool, "close", close)
+    monkeypatch.setattr(browser_pool, "_shared_pool", None)
+    return calls
+
+
+def test_concurrent_callers_share_one_started_pool(fake_launch):
+    async def main():
+        pools = await asyncio.gather(*(get_browser_pool() for _ in range(5)))
+        await close_browser_pool()
+        return pools
+
+    pools = asyncio.run(main())
+
+    assert fake_launch["start"] == 1
+    assert all(pool is pools[0] for pool in pools)
+    assert fake_launch["close"] == 1
+
+
+def test_entry_points_close_the_shared_pool_they_opened(fake_launch):
+    async def main():
+        async with pool_or_shared() as pool:
+            assert pool.started
+        return pool
+
+    pool = asyncio.run(main())
+
+    assert not pool.started
+    assert browser_pool._shared_pool is None
+
+
+def test_entry_points_leave_a_passed_pool_open(fake_launch):
+    async def main():
+        own = await BrowserPool().start()
+        async with pool_or_shared(own) as pool:
+            assert pool is own
+        return own
+
+    assert asyncio.run(main()).started
+    assert fake_launch["close"] == 0
@@ -0,0 +1,79 @@
+import threading
+import time
+
+from cache import LocalBackend, QueryCache
+
+
+def test_concurrent_misses_share_one_load():
+    cache = QueryCache(LocalBackend(maxsize=16), ttl=60)
+    calls = []
+    release = threading.Event()
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return "rows"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("key", loader)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == ["rows"] * 8
+    assert len(calls) == 1
+    assert cache._loading == {}
+
+
+class HookedBackend(LocalBackend):
+    def __init__(self):
+        super().__init__(maxsize=16)
+        self.on_get = None
+
+    def get(self, key, version):
+        if self.on_get:
+            self.on_get()
+        return super().get(key, version)
+
+
+def test_waiters_do_not_retire_a_newer_load():
+    backend = HookedBackend()
+    cache = QueryCache(backend, ttl=60)
+    first_started, first_release = threading.Event(), threading.Event()
+    newer_lock = threading.Lock()
+
+    def slow_loader():
+        first_started.set()
+        first_release.wait(5)
+        return 1
+
+    def register_newer_load():
+        # Runs once the waiter holds the first load's lock: a new load has registered meanwhile
+        backend.on_get = None
+        with cache._loading_lock:
+            cache._loading["key"] = newer_lock
+
+    owner = threading.Thread(target=lambda: cache.get_or_load("key", slow_loader))
+    owner.start()
+    first_started.wait(5)
+    waiter = threading.Thread(target=lambda: cache.get_or_load("key", lambda: 2))
+    waiter.start()
+    time.sleep(0.05)
+    backend.on_get = register_newer_load
+    first_release.set()
+    owner.join(5)
+    waiter.join(5)
+
+    assert cache._loading.get("key") is newer_lock
+
+
+def test_bump_invalidates():
+    cache = QueryCache(LocalBackend(maxsize=16), ttl=60)
+    assert cache.get_or_load("key", lambda: 1) == 1
+    assert cache.get_or_load("key", lambda: 2) == 1
+    cache.backend.bump()
+    assert cache.get_or_load("key", lambda: 3) == 3
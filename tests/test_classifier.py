@@ -0,0 +1,67 @@
+from classifier import AhoCorasick, KeywordClassifier
+from keyword_index import KeywordIndex
+
+
+def index(*keywords):
+    """KeywordIndex over (keyword_id, keyword_ar, keyword_en) rows, all in one classification."""
+    rows = [dict(keyword_id=keyword_id, keyword_ar=ar, keyword_en=en, classification_id=1,
+                 classification_name_ar="صيانة", classification_name_en="Maintenance")
+            for keyword_id, ar, en in keywords]
+    keyword_index = KeywordIndex()
+    keyword_index.load_rows(rows, version=())
+    return keyword_index
+
+
+def test_automaton_reports_overlapping_and_nested_patterns():
+    automaton = AhoCorasick()
+    for pattern in ("he", "she", "his", "hers"):
+        automaton.add(pattern, pattern)
+
+    assert sorted(automaton.find("ushers")) == ["he", "hers", "she"]
+
+
+def test_pattern_that_is_a_prefix_of_another():
+    automaton = AhoCorasick()
+    automaton.add("ab", "short")
+    automaton.add("abc", "long")
+
+    assert list(automaton.find("abc")) == ["short", "long"]
+    assert list(automaton.find("abd")) == ["short"]
+
+
+def test_adjacent_keywords_share_the_space_between_them():
+    classifier = KeywordClassifier(["صيانة", "المباني"])
+
+    assert classifier.classify("صيانة المباني الحكومية") == [("صيانة", None), ("المباني", None)]
+
+
+def test_keyword_that_is_a_prefix_of_another_keyword():
+    classifier = KeywordClassifier(["صيانة", "صيانة المباني"])
+
+    assert classifier.classify("صيانة المباني") == [("صيانة", None), ("صيانة المباني", None)]
+    assert classifier.classify("صيانة الطرق") == [("صيانة", None)]
+
+
+def test_keyword_does_not_match_inside_a_longer_word():
+    classifier = KeywordClassifier(["حاسب"])
+
+    assert classifier.classify("محاسبة") == []
+
+
+def test_arabic_normalization_applies_to_keywords_and_titles():
+    classifier = KeywordClassifier(["الأنظمة", "مستشفى"])
+
+    assert classifier.classify("تطوير انظمه المستشفيات") == [("الأنظمة", None), ("مستشفى", None)]
+    assert classifier.classify("تطوير الأَنْظِمَة") == [("الأنظمة", None)]
+
+
+def test_keyword_ids_are_deduplicated():
+    classifier = KeywordClassifier(["مختبر"], index((7, "مختبر", "laboratory")))
+
+    assert classifier.classify("مختبر laboratory ومختبر") == [("مختبر", 7)]
+
+
+def test_keywords_missing_from_the_index_match_without_an_id():
+    classifier = KeywordClassifier(["مختبر", "الجسر"], index((7, "مختبر", None)))
+
+    assert classifier.classify("الجسر والمختبر") == [("الجسر", None), ("مختبر", 7)]
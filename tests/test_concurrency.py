@@ -0,0 +1,44 @@
+import asyncio
+
+from concurrency import AdaptiveLimiter, HostOverloadedError, WorkQueueScheduler
+
+
+def limiter(**overrides):
+    settings = dict(initial=2, minimum=1, maximum=8, latency_target=5, decrease_factor=0.5, cooldown=0)
+    settings.update(overrides)
+    return AdaptiveLimiter(**settings)
+
+
+def run(handler, items, **limiter_overrides):
+    scheduler = WorkQueueScheduler(handler, limiter(**limiter_overrides), max_retries=1)
+
+    async def main():
+        source = asyncio.Queue()
+        for item in items:
+            source.put_nowait(item)
+        source.put_nowait(None)
+        await scheduler.run(source)
+
+    asyncio.run(main())
+    return scheduler
+
+
+def test_healthy_results_raise_the_limit():
+    async def handler(item):
+        return {"Link": item}
+
+    assert run(handler, range(6)).current_limit > 2
+
+
+def test_error_results_are_not_healthy():
+    async def handler(item):
+        return {"Link": item, "Error": "Element not found"}
+
+    assert run(handler, range(6)).current_limit == 2
+
+
+def test_timeouts_back_off_whatever_the_message():
+    async def handler(item):
+        raise HostOverloadedError(None, item)
+
+    assert run(handler, ["https://etimad.test/1"], initial=4).current_limit < 4
@@ -0,0 +1,67 @@
+import pytest
+from mysql.connector import DataError, OperationalError, ProgrammingError
+
+from db import DatabaseManager
+
+
+def tender(number, **overrides):
+    row = {"tender_number": number, "link": f"https://tenders/{number}", "tender_name": "صيانة",
+           "status": "معتمدة", "government_entity": "وزارة الصحة"}
+    row.update(overrides)
+    return row
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """DatabaseManager whose upserts succeed unless the batch contains a row named "bad"."""
+    manager = DatabaseManager()
+    attempts = []
+
+    def upsert(rows):
+        attempts.append(len(rows))
+        if any(row["tender_name"] == "bad" for row in rows):
+            raise DataError("Data too long for column 'tender_name'")
+        return len(rows)
+
+    monkeypatch.setattr(manager, "_upsert_batch", upsert)
+    manager.attempts = attempts
+    yield manager
+    del manager.attempts
+
+
+def test_bad_row_only_costs_itself(db, caplog):
+    rows = [tender(str(i)) for i in range(8)]
+    rows[5]["tender_name"] = "bad"
+
+    assert db.bulk_write_rows(rows, batch_size=8) == 7
+    assert db.attempts[0] == 8
+    assert [r.levelname for r in caplog.records if r.name == "etimad.db"].count("ERROR") == 1
+
+
+def test_rows_missing_required_columns_are_skipped(db):
+    rows = [tender("1"), tender("2", status=None), tender("3", government_entity=""), tender("", tender_name="x")]
+
+    assert db.bulk_write_rows(rows) == 1
+    assert db.attempts == [1]
+
+
+def test_connection_errors_are_raised(db, monkeypatch):
+    def upsert(rows):
+        raise OperationalError("Lost connection to MySQL server")
+
+    monkeypatch.setattr(db, "_upsert_batch", upsert)
+    with pytest.raises(OperationalError):
+        db.bulk_write_rows([tender("1"), tender("2")])
+
+
+def test_schema_errors_are_raised_without_splitting(db, monkeypatch):
+    attempts = []
+
+    def upsert(rows):
+        attempts.append(len(rows))
+        raise ProgrammingError("1054 (42S22): Unknown column 'search_text' in 'field list'")
+
+    monkeypatch.setattr(db, "_upsert_batch", upsert)
+    with pytest.raises(ProgrammingError):
+        db.bulk_write_rows([tender(str(i)) for i in range(4)], batch_size=4)
+    assert attempts == [4]
@@ -0,0 +1,86 @@
+"""
+The HTTP fast path (http_details.fetch_sections_http) must yield the same
+fields as the browser path, which parses each tab's innerText. The fixture
+site's tabs are one <div> per label and per value, so the browser's text is
+those divs' contents, one per line.
+"""
+import asyncio
+import re
+
+import httpx
+import pytest
+
+from benchmarks.fixture_server import (FixtureServer, SECTION_1_TEMPLATE, SECTION_2_BODY, deadline_for,
+                                       render_detail)
+from concurrency import HostOverloadedError
+from config import ARCHIVE_CONFIG
+from http_details import create_http_client, fetch_sections_http
+from parsing import is_valid_tender, parse_sections
+
+TENDER_ID = 900003
+
+
+@pytest.fixture(autouse=True)
+def no_archive(monkeypatch):
+    monkeypatch.setitem(ARCHIVE_CONFIG, "enabled", False)
+
+
+def browser_text(fragment: str) -> str:
+    return "\n".join(re.findall(r"<div>(.*?)</div>", fragment))
+
+
+def browser_fields(tender_id: int) -> dict:
+    return parse_sections({
+        "d-1": browser_text(SECTION_1_TEMPLATE.format(tender_id=tender_id)),
+        "d-2": browser_text(SECTION_2_BODY.format(deadline=deadline_for(tender_id))),
+    }, typed=True)
+
+
+async def fetch(link: str, client: httpx.AsyncClient = None):
+    async with client or create_http_client() as http:
+        return await fetch_sections_http(http, link)
+
+
+@pytest.mark.parametrize("lazy_tabs", [False, True], ids=["inline-tabs", "lazy-tabs"])
+def test_http_fields_match_browser_fields(lazy_tabs):
+    with FixtureServer(lazy_tabs=lazy_tabs) as server:
+        sections = asyncio.run(fetch(server.detail_url(TENDER_ID)))
+
+    fields = parse_sections(sections, typed=True)
+
+    assert fields == browser_fields(TENDER_ID)
+    assert is_valid_tender(fields)
+    assert fields["رقم المنافسة"] == str(TENDER_ID)
+    assert fields["آخر موعد لتقديم العروض"] is not None
+
+
+def test_overloaded_detail_page_raises():
+    with FixtureServer(error_rate=1.0) as server:
+        with pytest.raises(HostOverloadedError):
+            asyncio.run(fetch(server.detail_url(TENDER_ID)))
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_overloaded_tab_partial_raises(status):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/Tender/DetailsForVisitor":
+            return httpx.Response(200, text=render_detail(TENDER_ID, lazy_tabs=True))
+        return httpx.Response(status, text="overloaded")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with pytest.raises(HostOverloadedError):
+        asyncio.run(fetch(f"https://etimad.test/Tender/DetailsForVisitor?STenderId={TENDER_ID}", client))
+
+
+def test_other_http_errors_return_none():
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(404)))
+    assert asyncio.run(fetch(f"https://etimad.test/Tender/DetailsForVisitor?STenderId={TENDER_ID}", client)) is None
+
+
+def test_timeouts_raise_overloaded():
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with pytest.raises(HostOverloadedError):
+        asyncio.run(fetch(f"https://etimad.test/Tender/DetailsForVisitor?STenderId={TENDER_ID}", client))
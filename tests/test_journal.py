@@ -0,0 +1,72 @@
+import sqlite3
+
+from config import JOURNAL_CONFIG
+from journal import RunJournal
+
+
+def card(link, keyword_id=None):
+    return {"Link": link, "KeyWordID": keyword_id}
+
+
+def test_resume_state_tracks_link_progress(tmp_path):
+    journal = RunJournal(str(tmp_path / "journal.sqlite3"))
+    run_id = journal.start_run("airflow-manual__1")
+    for link in ("a", "b", "c"):
+        journal.discovered(run_id, card(link, 7), first_seen=True)
+    journal.mark_discovery_done(run_id)
+    journal.fetched(run_id, "b", {"Link": "b"})
+    journal.saved(run_id, ["c"])
+    journal.finish_run(run_id, "failed")
+
+    state = journal.resume_state(run_id)
+
+    assert [record["Link"] for record in state.pending] == ["a"]
+    assert state.unsaved_results == [{"Link": "b"}]
+    assert sorted(state.keyword_pairs) == [("a", 7), ("b", 7), ("c", 7)]
+    assert state.discovery_done
+    journal.close()
+
+
+def test_restarting_a_named_run_clears_its_journal(tmp_path):
+    journal = RunJournal(str(tmp_path / "journal.sqlite3"))
+    run_id = journal.start_run("airflow-scheduled__2025-08-01")
+    journal.discovered(run_id, card("a"), first_seen=True)
+    journal.mark_discovery_done(run_id)
+    journal.finish_run(run_id, "success")
+    assert journal.status(run_id) == "success"
+
+    journal.start_run(run_id)
+
+    assert journal.status(run_id) == "running"
+    state = journal.resume_state(run_id)
+    assert state.records == [] and not state.discovery_done
+    journal.close()
+
+
+def test_status_of_unknown_run(tmp_path):
+    journal = RunJournal(str(tmp_path / "journal.sqlite3"))
+    assert journal.status("airflow-missing") is None
+    journal.close()
+
+
+def test_link_events_are_committed_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setitem(JOURNAL_CONFIG, "flush_events", 3)
+    monkeypatch.setitem(JOURNAL_CONFIG, "flush_seconds", 3600)
+    path = str(tmp_path / "journal.sqlite3")
+    journal = RunJournal(path)
+    run_id = journal.start_run()
+
+    def committed_links():
+        with sqlite3.connect(path) as reader:
+            return reader.execute("SELECT COUNT(*) FROM run_links").fetchone()[0]
+
+    journal.discovered(run_id, card("a"), first_seen=True)
+    journal.discovered(run_id, card("b"), first_seen=True)
+    assert committed_links() == 0
+    journal.discovered(run_id, card("c"), first_seen=True)
+    assert committed_links() == 3
+
+    journal.discovered(run_id, card("d"), first_seen=True)
+    journal.flush()
+    assert committed_links() == 4
+    journal.close()
@@ -0,0 +1,54 @@
+import os
+
+from log_stream import _claim_rotation, read_file_since
+
+
+def test_reads_only_complete_new_lines(tmp_path):
+    log = tmp_path / "scraper.log"
+    log.write_bytes(b"one\ntwo\nthr")
+
+    text, cursor = read_file_since(str(log), None, 1024)
+    assert text == "one\ntwo"
+
+    with open(log, "ab") as f:
+        f.write(b"ee\nfour\n")
+    text, cursor = read_file_since(str(log), cursor, 1024)
+    assert text == "three\nfour"
+    assert read_file_since(str(log), cursor, 1024) == ("", cursor)
+
+
+def test_restarts_after_rotation(tmp_path):
+    log = tmp_path / "scraper.log"
+    log.write_bytes(b"old line\n" * 10)
+    _, cursor = read_file_since(str(log), None, 1024)
+
+    os.replace(log, tmp_path / "scraper.log.1")
+    log.write_bytes(b"new line\n")
+    text, _ = read_file_since(str(log), cursor, 1024)
+    assert text == "new line"
+
+
+def test_caps_reads_at_a_line_boundary(tmp_path):
+    log = tmp_path / "scraper.log"
+    log.write_bytes(b"".join(f"line {i:03}\n".encode() for i in range(100)))
+
+    text, cursor = read_file_since(str(log), None, 50)
+    assert text.splitlines()[-1] == "line 099"
+    assert all(line.startswith("line ") and len(line) == 8 for line in text.splitlines())
+    assert cursor.offset == log.stat().st_size
+
+
+def test_missing_file(tmp_path):
+    assert read_file_since(str(tmp_path / "missing.log"), None, 1024) == ("", None)
+
+
+def test_only_one_process_claims_rotation(tmp_path):
+    log = str(tmp_path / "scraper.log")
+    owner = _claim_rotation(log)
+    assert owner is not None
+    # A second claimant (another process, or a forked worker) appends without rotating
+    assert _claim_rotation(log) is None
+    owner.close()
+    successor = _claim_rotation(log)
+    assert successor is not None
+    successor.close()
@@ -0,0 +1,17 @@
+from datetime import datetime
+
+import pytest
+
+from parsing import parse_arabic_datetime
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("27/07/2025 02/02/1447 09:59 AM", datetime(2025, 7, 27, 9, 59)),
+    ("27/07/2025 02/02/1447 09:59 PM", datetime(2025, 7, 27, 21, 59)),
+    ("٢٧/٠٧/٢٠٢٥ ٠٢/٠٢/١٤٤٧ ٠٩:٥٩ م", datetime(2025, 7, 27, 21, 59)),
+    ("27/07/2025", datetime(2025, 7, 27)),
+    ("02/02/1447", None),
+    ("لا يوجد", None),
+])
+def test_gregorian_date_keeps_the_time_after_the_hijri_date(value, expected):
+    assert parse_arabic_datetime(value) == expected
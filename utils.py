@@ -1,14 +1,22 @@
 import logging
 import logging.config
+import functools
+import time
 from config import LOGGING_CONFIG
 from typing import Optional, Dict, Any
-from datetime import datetime
 import asyncio
-from db import db_manager
+from taxonomy import taxonomy
+from metrics import FUNCTION_SECONDS
 import json
 
+_logging_configured = False
+
 def setup_logger(name: str = "etimad") -> logging.Logger:
-    logging.config.dictConfig(LOGGING_CONFIG)
+    """Return a logger, applying LOGGING_CONFIG only on the first call (dictConfig rebuilds every handler)."""
+    global _logging_configured
+    if not _logging_configured:
+        logging.config.dictConfig(LOGGING_CONFIG)
+        _logging_configured = True
     return logging.getLogger(name)
 
 def format_tender_data(tender: Dict[str, Any]) -> Dict[str, Any]:
@@ -27,69 +35,54 @@ def validate_tender(tender: Dict[str, Any]) -> bool:
     return all(field in tender for field in required_fields)
 
 def log_execution_time(func):
-    """Decorator to log function execution time"""
+    """Decorator to log function execution time (and record it in etimad_function_seconds)"""
+    logger = setup_logger("etimad.timing")
+    name = func.__qualname__
+
+    def finish(start: float, error: Optional[Exception] = None) -> None:
+        duration = time.perf_counter() - start
+        FUNCTION_SECONDS.observe(duration, function=name)
+        if error is None:
+            logger.info(f"Completed {name} in {duration:.2f}s")
+        else:
+            logger.error(f"Failed {name} after {duration:.2f}s: {str(error)}")
+
+    @functools.wraps(func)
     async def async_wrapper(*args, **kwargs):
-        start = datetime.now()
-        logger = setup_logger("etimad.timing")
-        logger.info(f"Starting {func.__name__}")
-        
+        start = time.perf_counter()
+        logger.info(f"Starting {name}")
         try:
             result = await func(*args, **kwargs)
-            duration = (datetime.now() - start).total_seconds()
-            logger.info(f"Completed {func.__name__} in {duration:.2f}s")
-            return result
         except Exception as e:
-            duration = (datetime.now() - start).total_seconds()
-            logger.error(f"Failed {func.__name__} after {duration:.2f}s: {str(e)}")
+            finish(start, e)
             raise
-    
+        finish(start)
+        return result
+
+    @functools.wraps(func)
     def sync_wrapper(*args, **kwargs):
-        start = datetime.now()
-        logger = setup_logger("etimad.timing")
-        logger.info(f"Starting {func.__name__}")
-        
+        start = time.perf_counter()
+        logger.info(f"Starting {name}")
         try:
             result = func(*args, **kwargs)
-            duration = (datetime.now() - start).total_seconds()
-            logger.info(f"Completed {func.__name__} in {duration:.2f}s")
-            return result
         except Exception as e:
-            duration = (datetime.now() - start).total_seconds()
-            logger.error(f"Failed {func.__name__} after {duration:.2f}s: {str(e)}")
+            finish(start, e)
             raise
-    
+        finish(start)
+        return result
+
     return async_wrapper if asyncio.iscoroutinefunction(func) else sync_wrapper
 
 
 def generate_main_to_sub_mapping(output_path="main_to_sub.json"):
     """
-    Fetches classification-keyword pairs from the database and saves them
+    Builds classification-keyword pairs from the cached taxonomy and saves them
     as a nested dictionary (classification -> [keywords]) to a JSON file.
 
     Args:
         output_path (str): File path to save the output JSON.
     """
-    query = """ 
-    SELECT 
-        eck.keyword_ar AS keyword_name_ar,
-        ec.name_ar AS classification_name_ar
-    FROM 
-        etimad_classification_keywords AS eck
-    JOIN 
-        etimad_classifications AS ec ON eck.classification_id = ec.id
-    ORDER BY 
-        ec.name_en, eck.keyword_en;
-    """
-
-    myresult = db_manager.fetch_all(query, dictionary=True)
-
-    data = {}
-    for row in myresult:
-        keyword = row["keyword_name_ar"]
-        classification = row["classification_name_ar"]
-        if classification not in data:
-            data[classification] = []
-        data[classification].append(keyword)
+    data = taxonomy.main_to_sub()
 
     with open(output_path, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=4)